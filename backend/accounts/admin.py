@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as DjangoUserAdmin
 
-from .models import User
+from .models import AdminMessage, AdminMessageReply, BackgroundJob, Counter, EmailOutbox, User
 
 
 @admin.register(User)
@@ -23,3 +23,36 @@ class UserAdmin(DjangoUserAdmin):
         }),
     )
     search_fields = ('email',)
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'attempts', 'next_attempt_at', 'sent_at', 'created_at')
+    list_filter = ('status',)
+    search_fields = ('subject', 'last_error')
+    # Bodies may carry one-time set-password links.
+    exclude = ('body',)
+
+
+@admin.register(AdminMessage)
+class AdminMessageAdmin(admin.ModelAdmin):
+    list_display = ('user', 'is_read', 'reply_count', 'created_at')
+    list_filter = ('is_read',)
+    list_select_related = ('user',)
+
+
+@admin.register(AdminMessageReply)
+class AdminMessageReplyAdmin(admin.ModelAdmin):
+    list_display = ('thread', 'author', 'created_at')
+    list_select_related = ('author',)
+
+
+@admin.register(Counter)
+class CounterAdmin(admin.ModelAdmin):
+    list_display = ('name', 'value', 'updated_at')
+
+
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'status', 'attempts', 'run_after', 'created_at', 'finished_at')
+    list_filter = ('status', 'kind')
@@ -0,0 +1,155 @@
+"""
+Signed access tokens and caller resolution.
+
+``patient_login``/``role_login`` hand out a token that already carries the user
+id, role, profile id and the user's ``token_version``. Resolving the caller
+from the ``Authorization: Bearer`` header is an HMAC check plus a lookup of
+the user's ``(is_active, token_version)``, cached per user for
+TOKEN_STATE_CACHE_TTL seconds. Requests that still identify themselves with a
+raw ``email`` parameter are resolved once and then served from a bounded
+in-process TTL cache.
+
+Revoking tokens: ``revoke_tokens(user_ids)`` bumps ``token_version``, so every
+token issued before it stops resolving. Deactivating or deleting a user has
+the same effect. Both take hold at once in the calling process and within
+TOKEN_STATE_CACHE_TTL in other workers.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.db.models import F
+
+from .caching import TTLCache
+
+TOKEN_SALT = 'accounts.access-token'
+
+_identity_cache = TTLCache(
+    maxsize=getattr(settings, 'IDENTITY_CACHE_SIZE', 4096),
+    ttl=getattr(settings, 'IDENTITY_CACHE_TTL', 60),
+)
+# user id -> (is_active, token_version); (False, None) for a user that no longer exists.
+_token_state_cache = TTLCache(
+    maxsize=getattr(settings, 'IDENTITY_CACHE_SIZE', 4096),
+    ttl=getattr(settings, 'TOKEN_STATE_CACHE_TTL', 30),
+)
+
+
+@dataclass(frozen=True)
+class Identity:
+    user_id: int
+    role: str
+    email: str
+    profile_id: Optional[int] = None
+
+
+def issue_token(user, profile_id=None):
+    """Return a signed token describing ``user`` and the id of their role profile."""
+    payload = {
+        'u': user.id,
+        'r': user.role,
+        'e': user.email,
+        'p': profile_id,
+        'v': user.token_version,
+    }
+    return signing.dumps(payload, salt=TOKEN_SALT, compress=True)
+
+
+def _identity_from_token(token):
+    try:
+        payload = signing.loads(
+            token,
+            salt=TOKEN_SALT,
+            max_age=getattr(settings, 'ACCESS_TOKEN_MAX_AGE', 12 * 60 * 60),
+        )
+    except signing.BadSignature:
+        return None
+    is_active, version = _token_state(payload['u'])
+    if not is_active or payload.get('v', 0) != version:
+        return None
+    return Identity(user_id=payload['u'], role=payload['r'], email=payload['e'], profile_id=payload.get('p'))
+
+
+def _token_state(user_id):
+    state = _token_state_cache.get(user_id)
+    if state is None:
+        row = get_user_model().objects.filter(pk=user_id).values_list('is_active', 'token_version').first()
+        state = tuple(row) if row else (False, None)
+        _token_state_cache.set(user_id, state)
+    return state
+
+
+def revoke_tokens(user_ids):
+    """Invalidate every token issued so far to ``user_ids``."""
+    user_ids = list(user_ids)
+    get_user_model().objects.filter(pk__in=user_ids).update(token_version=F('token_version') + 1)
+    forget_token_state(user_ids)
+
+
+def forget_token_state(user_ids):
+    """Drop cached token checks (call after deactivating or deleting users)."""
+    for user_id in user_ids:
+        _token_state_cache.pop(user_id)
+
+
+def identity_from_token(token):
+    """The identity carried by a raw access token (e.g. an EventSource ``token`` parameter), or None."""
+    return _identity_from_token(token) if token else None
+
+
+def _bearer_token(request):
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    scheme, _, token = header.partition(' ')
+    if scheme.lower() != 'bearer' or not token.strip():
+        return None
+    return token.strip()
+
+
+def _identity_from_email(email):
+    identity = _identity_cache.get(email)
+    if identity is not None:
+        return identity
+
+    row = (
+        get_user_model().objects.filter(email=email)
+        .values('id', 'role', 'email', 'patient_profile__id', 'doctor_profile__id')
+        .first()
+    )
+    if not row:
+        return None
+
+    profile_id = None
+    if row['role'] == 'patient':
+        profile_id = row['patient_profile__id']
+    elif row['role'] == 'doctor':
+        profile_id = row['doctor_profile__id']
+    identity = Identity(user_id=row['id'], role=row['role'], email=row['email'], profile_id=profile_id)
+    _identity_cache.set(email, identity)
+    return identity
+
+
+def forget_identity(email):
+    """Drop a cached email lookup (call after an email change or account deletion)."""
+    if email:
+        _identity_cache.pop(email)
+
+
+def resolve_identity(request, email=None):
+    """
+    Resolve the caller of ``request``.
+
+    A bearer token decides on its own: an invalid, expired or revoked one
+    resolves to ``None`` rather than falling back to ``email``, or revocation
+    would not hold for clients that send both. Without a token the legacy
+    ``email`` parameter passed by the view is looked up. Returns ``None`` when
+    the caller is unknown.
+    """
+    token = _bearer_token(request)
+    if token:
+        return _identity_from_token(token)
+    if email:
+        return _identity_from_email(email)
+    return None
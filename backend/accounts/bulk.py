@@ -0,0 +1,107 @@
+"""Bulk admin operations on patient/doctor accounts."""
+
+import logging
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+
+from doctors.models import Appointment, ConsultationRequest, Prescription
+from .auth import forget_identity, forget_token_state
+from .jobs import enqueue_job
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+# Rows that hang off a profile and are removed by the cascade when its user is deleted.
+CASCADE_MODELS = (ConsultationRequest, Appointment, Prescription)
+
+
+def parse_user_ids(raw):
+    """Validate a ``user_ids`` list; returns (ids, error message)."""
+    max_ids = getattr(settings, 'ADMIN_BULK_MAX_IDS', 1000)
+    if not isinstance(raw, list) or not raw:
+        return None, 'user_ids must be a non-empty list.'
+    if len(raw) > max_ids:
+        return None, f'At most {max_ids} user_ids per request.'
+    try:
+        ids = list(dict.fromkeys(int(value) for value in raw))
+    except (TypeError, ValueError):
+        return None, 'user_ids must contain integers.'
+    return ids, None
+
+
+def set_active(role, user_ids, is_active):
+    """
+    Apply ``is_active`` to every matching user with a single UPDATE and return the
+    ids changed. Deactivation also revokes their access tokens.
+    """
+    users = User.objects.filter(id__in=user_ids, role=role)
+    found = list(users.values_list('id', flat=True))
+    if is_active:
+        users.update(is_active=True)
+    else:
+        # The new token_version keeps old tokens revoked if the users are reactivated later.
+        users.update(is_active=False, token_version=F('token_version') + 1)
+        forget_token_state(found)
+    return found
+
+
+def cascade_size(role, user_ids, stop_at=None):
+    """Approximate number of dependent rows a delete would cascade to (stops counting past ``stop_at``)."""
+    total = 0
+    for model in CASCADE_MODELS:
+        total += model.objects.filter(**{f'{role}__user_id__in': user_ids}).count()
+        if stop_at is not None and total > stop_at:
+            break
+    return total
+
+
+def delete_users(role, user_ids, chunk_size=None):
+    """
+    Delete users of ``role`` in chunks, one transaction per chunk.
+
+    Returns ``{user_id: 'deleted' | 'not_found' | 'error: ...'}`` keyed by string id.
+    """
+    chunk_size = chunk_size or getattr(settings, 'ADMIN_BULK_DELETE_CHUNK', 100)
+    results = {}
+    for start in range(0, len(user_ids), chunk_size):
+        chunk = user_ids[start:start + chunk_size]
+        try:
+            with transaction.atomic():
+                users = User.objects.filter(id__in=chunk, role=role)
+                found = dict(users.values_list('id', 'email'))
+                users.delete()
+        except Exception as exc:
+            logger.exception("Bulk delete chunk failed for %s ids %s", role, chunk)
+            results.update({str(user_id): f'error: {exc}' for user_id in chunk})
+            continue
+        for email in found.values():
+            forget_identity(email)
+        forget_token_state(found)
+        results.update({str(user_id): 'deleted' if user_id in found else 'not_found' for user_id in chunk})
+    return results
+
+
+def bulk_delete_job(payload):
+    """BackgroundJob handler for deletes too large to run inside a request."""
+    results = delete_users(payload['role'], payload['user_ids'])
+    return {
+        'results': results,
+        'deleted': sum(1 for value in results.values() if value == 'deleted'),
+    }
+
+
+def delete_or_enqueue(role, user_ids):
+    """
+    Delete inline when the cascade is small, otherwise queue a BackgroundJob.
+
+    Returns ``(results, job)``; exactly one of them is ``None``.
+    """
+    limit = getattr(settings, 'ADMIN_BULK_INLINE_CASCADE_LIMIT', 500)
+    if cascade_size(role, user_ids, stop_at=limit) > limit:
+        job = enqueue_job('accounts.bulk.bulk_delete_job', {'role': role, 'user_ids': user_ids})
+        return None, job
+    return delete_users(role, user_ids), None
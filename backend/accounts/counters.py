@@ -0,0 +1,58 @@
+"""
+Named counters stored in the ``Counter`` table.
+
+Write paths call ``increment`` inside their own transaction, which issues a
+single ``UPDATE ... SET value = value + n``; readers fetch any number of
+counters in one query with ``get_counters``. ``set_counter`` is used by the
+rebuild paths to correct drift from exact aggregates.
+"""
+
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import Counter
+
+INBOX_UNREAD = 'inbox_unread'
+PATIENTS = 'patients'
+DOCTORS = 'doctors'
+APPOINTMENTS = 'appointments'
+PENDING_CONSULTATIONS = 'consultations_pending'
+CONSULTATION_PAYMENTS = 'payments_consultation'
+CONSULTATION_REVENUE = 'revenue_consultation'
+PHARMACY_PAYMENTS = 'payments_pharmacy'
+PHARMACY_REVENUE = 'revenue_pharmacy'
+DIRECTORY_VERSION = 'directory_version'
+
+
+def increment(name, amount=1):
+    if not amount:
+        return
+    amount = Decimal(str(amount))
+    if Counter.objects.filter(name=name).update(value=F('value') + amount):
+        return
+    try:
+        with transaction.atomic():
+            Counter.objects.create(name=name, value=amount)
+    except IntegrityError:
+        # Another request created the row first; apply our delta to it.
+        Counter.objects.filter(name=name).update(value=F('value') + amount)
+
+
+def decrement(name, amount=1):
+    increment(name, -amount)
+
+
+def set_counter(name, value):
+    Counter.objects.update_or_create(name=name, defaults={'value': Decimal(str(value))})
+
+
+def get_counters(names):
+    """Return ``{name: Decimal}`` for ``names``; missing counters read as zero."""
+    values = dict(Counter.objects.filter(name__in=list(names)).values_list('name', 'value'))
+    return {name: values.get(name, Decimal('0')) for name in names}
+
+
+def get_counter(name):
+    return get_counters([name])[name]
@@ -0,0 +1,103 @@
+"""
+Admin dashboard totals.
+
+The totals live in the ``Counter`` table and are kept current by the signal
+handlers in ``accounts.signals`` (plus explicit increments on bulk paths that
+bypass signals), so reading the dashboard is one small query regardless of
+table sizes. ``rebuild_counters`` recomputes them from the source tables and is
+run periodically by ``manage.py rebuild_counters`` to correct any drift.
+"""
+
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from doctors.models import Appointment, ConsultationRequest, DoctorProfile
+from patients.models import PatientProfile
+from payments.models import Payment
+
+from .counters import (
+    APPOINTMENTS,
+    CONSULTATION_PAYMENTS,
+    CONSULTATION_REVENUE,
+    DOCTORS,
+    INBOX_UNREAD,
+    PATIENTS,
+    PENDING_CONSULTATIONS,
+    PHARMACY_PAYMENTS,
+    PHARMACY_REVENUE,
+    get_counters,
+    set_counter,
+)
+from .models import AdminMessage
+
+DASHBOARD_COUNTERS = (
+    PATIENTS,
+    DOCTORS,
+    APPOINTMENTS,
+    PENDING_CONSULTATIONS,
+    CONSULTATION_PAYMENTS,
+    CONSULTATION_REVENUE,
+    PHARMACY_PAYMENTS,
+    PHARMACY_REVENUE,
+    INBOX_UNREAD,
+)
+
+PAYMENT_COUNTERS = {
+    'consultation': (CONSULTATION_PAYMENTS, CONSULTATION_REVENUE),
+    'pharmacy': (PHARMACY_PAYMENTS, PHARMACY_REVENUE),
+}
+
+
+def dashboard_totals():
+    counters = get_counters(DASHBOARD_COUNTERS)
+    consultation_revenue = counters[CONSULTATION_REVENUE]
+    pharmacy_revenue = counters[PHARMACY_REVENUE]
+    return {
+        'total_patients': int(counters[PATIENTS]),
+        'total_doctors': int(counters[DOCTORS]),
+        'total_appointments': int(counters[APPOINTMENTS]),
+        'pending_consultations': int(counters[PENDING_CONSULTATIONS]),
+        'unread_messages': int(counters[INBOX_UNREAD]),
+        'consultations': {
+            'count': int(counters[CONSULTATION_PAYMENTS]),
+            'total_amount': float(consultation_revenue),
+        },
+        'pharmacy': {
+            'count': int(counters[PHARMACY_PAYMENTS]),
+            'total_amount': float(pharmacy_revenue),
+        },
+        'total_revenue': float(consultation_revenue + pharmacy_revenue),
+    }
+
+
+def compute_counters():
+    """Exact values for every dashboard counter, from the source tables."""
+    values = {
+        PATIENTS: PatientProfile.objects.count(),
+        DOCTORS: DoctorProfile.objects.count(),
+        APPOINTMENTS: Appointment.objects.count(),
+        PENDING_CONSULTATIONS: ConsultationRequest.objects.filter(status='pending').count(),
+        INBOX_UNREAD: AdminMessage.objects.filter(is_read=False).count(),
+    }
+    payments = Payment.objects.filter(status='success').aggregate(
+        consultation_count=Count('id', filter=Q(payment_type='consultation')),
+        consultation_total=Sum('amount', filter=Q(payment_type='consultation')),
+        pharmacy_count=Count('id', filter=Q(payment_type='pharmacy')),
+        pharmacy_total=Sum('amount', filter=Q(payment_type='pharmacy')),
+    )
+    for payment_type, (count_name, revenue_name) in PAYMENT_COUNTERS.items():
+        values[count_name] = payments[f'{payment_type}_count']
+        values[revenue_name] = payments[f'{payment_type}_total'] or Decimal('0')
+    return values
+
+
+def rebuild_counters():
+    """Overwrite the dashboard counters with exact values. Returns ``{name: (old, new)}``."""
+    with transaction.atomic():
+        before = get_counters(DASHBOARD_COUNTERS)
+        values = compute_counters()
+        for name, value in values.items():
+            set_counter(name, value)
+    return {name: (before[name], Decimal(str(value))) for name, value in values.items()}
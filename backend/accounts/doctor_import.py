@@ -0,0 +1,223 @@
+"""
+Bulk doctor onboarding from a CSV or JSON roster.
+
+Every row is validated before anything is written, departments are resolved
+with one query, passwords are hashed on a process pool (PBKDF2 is CPU bound
+and holds the GIL), and users/profiles are inserted with ``bulk_create`` in a
+single transaction together with their queued welcome emails.
+"""
+
+import csv
+import io
+import json
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import get_hasher
+from django.db import transaction
+
+from doctors.directory import bump_version as bump_directory_version
+from doctors.models import Department, DoctorProfile
+
+from .counters import DOCTORS, increment
+from .emails import doctor_welcome_message, smtp_sender
+from .outbox import enqueue_emails
+from .serializers import DoctorCreateSerializer
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+IMPORT_FIELDS = ('name', 'email', 'password', 'specialization', 'phone', 'department')
+
+
+class RosterError(ValueError):
+    """Raised when the roster itself cannot be read (bad encoding, not CSV/JSON, too many rows)."""
+
+
+def parse_rows(content, filename=''):
+    """
+    Parse a roster into a list of dicts. ``content`` is ``bytes``/``str`` (CSV or
+    JSON text) or an already-decoded list (JSON request body).
+    """
+    if isinstance(content, list):
+        rows = content
+    else:
+        if isinstance(content, bytes):
+            try:
+                content = content.decode('utf-8-sig')
+            except UnicodeDecodeError as exc:
+                raise RosterError('File must be UTF-8 encoded.') from exc
+        text = content.strip()
+        if filename.lower().endswith('.json') or text.startswith(('[', '{')):
+            try:
+                data = json.loads(text)
+            except ValueError as exc:
+                raise RosterError(f'Invalid JSON: {exc}') from exc
+            rows = data.get('doctors') if isinstance(data, dict) else data
+        else:
+            reader = csv.DictReader(io.StringIO(text))
+            missing = [field for field in IMPORT_FIELDS if field not in (reader.fieldnames or [])]
+            if missing:
+                raise RosterError(f"CSV header is missing columns: {', '.join(missing)}")
+            rows = list(reader)
+
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise RosterError('Expected a list of doctor objects.')
+    if not rows:
+        raise RosterError('The roster is empty.')
+    max_rows = getattr(settings, 'BULK_IMPORT_MAX_ROWS', 5000)
+    if len(rows) > max_rows:
+        raise RosterError(f'At most {max_rows} doctors can be imported at once.')
+    return rows
+
+
+def validate_rows(rows):
+    """
+    Validate every row up front. Returns ``(cleaned, errors)`` where ``errors`` is a
+    list of ``{'row': n, 'errors': {...}}`` (1-based, header excluded).
+    """
+    cleaned = []
+    errors = []
+    seen = {}
+    for number, row in enumerate(rows, start=1):
+        data = {
+            field: row[field].strip() if isinstance(row[field], str) else row[field]
+            for field in IMPORT_FIELDS if row.get(field) is not None
+        }
+        serializer = DoctorCreateSerializer(data=data)
+        if not serializer.is_valid():
+            errors.append({'row': number, 'errors': serializer.errors})
+            continue
+        item = dict(serializer.validated_data)
+        item['email'] = User.objects.normalize_email(item['email'])
+        key = item['email'].lower()
+        if key in seen:
+            errors.append({'row': number, 'errors': {'email': [f'Duplicate of row {seen[key]}.']}})
+            continue
+        seen[key] = number
+        item['row'] = number
+        cleaned.append(item)
+
+    # One query for every email in the file instead of one exists() per row.
+    existing = {
+        email.lower()
+        for email in User.objects.filter(email__in=[item['email'] for item in cleaned]).values_list('email', flat=True)
+    }
+    if existing:
+        for item in cleaned:
+            if item['email'].lower() in existing:
+                errors.append({'row': item['row'], 'errors': {'email': ['Email already exists.']}})
+        cleaned = [item for item in cleaned if item['email'].lower() not in existing]
+
+    errors.sort(key=lambda error: error['row'])
+    return cleaned, errors
+
+
+def _encode(args):
+    hasher, password = args
+    return hasher.encode(password, hasher.salt())
+
+
+def hash_passwords(passwords):
+    """
+    Hash ``passwords`` with the default hasher. Large batches are spread over a
+    process pool; the hasher instance is pickled so workers need no Django setup.
+    """
+    hasher = get_hasher()
+    jobs = [(hasher, password) for password in passwords]
+    processes = getattr(settings, 'BULK_IMPORT_HASH_PROCESSES', None)
+    if len(jobs) < getattr(settings, 'BULK_IMPORT_POOL_THRESHOLD', 8) or processes == 1:
+        return [_encode(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(_encode, jobs, chunksize=max(1, len(jobs) // 32)))
+
+
+def resolve_departments(names):
+    """Map department name -> Department, creating missing ones in one insert."""
+    names = {name for name in names if name}
+    if not names:
+        return {}
+    departments = {dept.name: dept for dept in Department.objects.filter(name__in=names)}
+    missing = names - departments.keys()
+    if missing:
+        Department.objects.bulk_create([Department(name=name) for name in missing], ignore_conflicts=True)
+        departments = {dept.name: dept for dept in Department.objects.filter(name__in=names)}
+    return departments
+
+
+def import_doctors(rows, *, send_emails=True, dry_run=False):
+    """
+    Validate and create doctors from parsed ``rows``. All-or-nothing: if any row
+    is invalid nothing is written. Returns a result dict.
+    """
+    cleaned, errors = validate_rows(rows)
+    result = {
+        'total': len(rows),
+        'valid': len(cleaned),
+        'errors': errors,
+        'created': 0,
+        'emails_queued': 0,
+        'email_error': None,
+        'dry_run': dry_run,
+    }
+    if errors or dry_run:
+        return result
+
+    from_email = None
+    if send_emails:
+        try:
+            from_email = smtp_sender()
+        except ValueError as exc:
+            result['email_error'] = str(exc)
+
+    batch_size = getattr(settings, 'BULK_IMPORT_BATCH_SIZE', 500)
+    password_hashes = hash_passwords([item['password'] for item in cleaned])
+
+    with transaction.atomic():
+        departments = resolve_departments(item['department'] for item in cleaned)
+        users = [
+            User(email=item['email'], password=encoded, role='doctor', is_active=True)
+            for item, encoded in zip(cleaned, password_hashes)
+        ]
+        User.objects.bulk_create(users, batch_size=batch_size)
+        # MySQL does not return primary keys from bulk inserts, so read them back by email.
+        user_ids = dict(User.objects.filter(email__in=[item['email'] for item in cleaned]).values_list('email', 'id'))
+        for user in users:
+            user.pk = user_ids[user.email]
+        DoctorProfile.objects.bulk_create(
+            [
+                DoctorProfile(
+                    user_id=user_ids[item['email']],
+                    full_name=item['name'],
+                    specialization=item['specialization'],
+                    phone=item['phone'],
+                    license_no='N/A',
+                    department=departments.get(item['department']),
+                )
+                for item in cleaned
+            ],
+            batch_size=batch_size,
+        )
+        # bulk_create skips post_save, so the dashboard counter and directory version are bumped here.
+        increment(DOCTORS, len(cleaned))
+        bump_directory_version()
+        if from_email:
+            messages = []
+            for item, user in zip(cleaned, users):
+                subject, body = doctor_welcome_message(doctor_name=item['name'], user=user)
+                messages.append({
+                    'subject': subject,
+                    'body': body,
+                    'to': [item['email']],
+                    'reply_to': [from_email],
+                    'from_email': from_email,
+                })
+            enqueue_emails(messages)
+            result['emails_queued'] = len(messages)
+
+    result['created'] = len(cleaned)
+    logger.info("Imported %s doctors (%s welcome emails queued)", result['created'], result['emails_queued'])
+    return result
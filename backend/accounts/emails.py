@@ -0,0 +1,67 @@
+"""Email content shared by single and bulk doctor onboarding."""
+
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+
+def smtp_sender():
+    """
+    Return the sender address, raising ValueError if SMTP is not configured
+    (the outbox worker would otherwise fail on every attempt).
+    """
+    # Prefer DEFAULT_FROM_EMAIL if you configured it, otherwise fall back to EMAIL_HOST_USER
+    from_email = getattr(settings, 'DEFAULT_FROM_EMAIL', None) or getattr(settings, 'EMAIL_HOST_USER', None)
+
+    # SMTP auth still typically depends on EMAIL_HOST_USER being present in settings
+    smtp_user = getattr(settings, 'EMAIL_HOST_USER', None)
+    smtp_password = getattr(settings, 'EMAIL_HOST_PASSWORD', None)
+
+    if not smtp_user:
+        raise ValueError(
+            "EMAIL_HOST_USER is not configured (SMTP username). "
+            "Check that your .env file exists and load_dotenv() can find it."
+        )
+
+    if not smtp_password:
+        raise ValueError(
+            "EMAIL_HOST_PASSWORD is not configured (SMTP app password). "
+            "Check that your .env file exists and load_dotenv() can find it."
+        )
+
+    if not from_email:
+        raise ValueError("DEFAULT_FROM_EMAIL/EMAIL_HOST_USER is not configured. Set a sender email.")
+
+    return from_email
+
+
+def set_password_url(user):
+    """
+    One-time link to the frontend's set-password page. The token is Django's password
+    reset token: it expires after PASSWORD_RESET_TIMEOUT and stops working once the
+    password changes, so the outbox never has to hold a password.
+    """
+    frontend_url = getattr(settings, 'FRONTEND_URL', 'http://localhost:5173')
+    uid = urlsafe_base64_encode(force_bytes(user.pk))
+    return f"{frontend_url.rstrip('/')}/set-password?uid={uid}&token={default_token_generator.make_token(user)}"
+
+
+def doctor_welcome_message(*, doctor_name, user):
+    """Return ``(subject, body)`` for the doctor welcome email (``user`` is the new doctor's account)."""
+    frontend_url = getattr(settings, 'FRONTEND_URL', 'http://localhost:5173')
+    login_url = f"{frontend_url.rstrip('/')}/role/login"
+
+    subject = "Welcome – Smart Telemedicine System (Doctor Account Created)"
+    message = (
+        f"Hello Dr. {doctor_name},\n\n"
+        "Your doctor account has been created in the Smart Telemedicine and Online Medicine Delivery System.\n\n"
+        f"Email: {user.email}\n\n"
+        "Choose your password with this link (it can be used once):\n"
+        f"{set_password_url(user)}\n\n"
+        f"Then sign in at: {login_url}\n\n"
+        "Regards,\n"
+        "Admin Team\n"
+        "Smart Telemedicine System"
+    )
+    return subject, message
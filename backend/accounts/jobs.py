@@ -0,0 +1,82 @@
+"""
+Database-backed background jobs.
+
+``enqueue_job`` stores the dotted path of a handler plus a JSON payload,
+normally inside the caller's transaction. The ``run_background_jobs`` command
+leases due jobs (same scheme as the email outbox), imports the handler and
+stores whatever JSON-serialisable value it returns as the job result.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_job(kind, payload=None):
+    """Queue ``kind`` (dotted path to ``handler(payload)``) and return the job row."""
+    return BackgroundJob.objects.create(kind=kind, payload=payload or {})
+
+
+def claim_jobs(limit=1, kinds=None):
+    now = timezone.now()
+    lease_until = now + timedelta(seconds=getattr(settings, 'BACKGROUND_JOB_LEASE_SECONDS', 600))
+    with transaction.atomic():
+        jobs = BackgroundJob.objects.select_for_update(skip_locked=True).filter(
+            status__in=['pending', 'running'],
+            run_after__lte=now,
+        )
+        if kinds:
+            jobs = jobs.filter(kind__in=kinds)
+        jobs = list(jobs.order_by('run_after', 'id')[:limit])
+        if jobs:
+            BackgroundJob.objects.filter(id__in=[job.id for job in jobs]).update(
+                status='running',
+                attempts=F('attempts') + 1,
+                run_after=lease_until,
+            )
+    for job in jobs:
+        job.attempts += 1
+    return jobs
+
+
+def run_job(job):
+    max_attempts = getattr(settings, 'BACKGROUND_JOB_MAX_ATTEMPTS', 3)
+    try:
+        result = import_string(job.kind)(job.payload)
+    except Exception as exc:
+        logger.exception("Background job %s (%s) failed on attempt %s", job.id, job.kind, job.attempts)
+        retry = job.attempts < max_attempts
+        BackgroundJob.objects.filter(id=job.id).update(
+            status='pending' if retry else 'failed',
+            error=f"{type(exc).__name__}: {exc}",
+            run_after=timezone.now() + timedelta(seconds=60 * job.attempts),
+            finished_at=None if retry else timezone.now(),
+        )
+        return False
+    BackgroundJob.objects.filter(id=job.id).update(
+        status='done',
+        result=result,
+        error='',
+        finished_at=timezone.now(),
+    )
+    return True
+
+
+def run_pending_jobs(limit=10, kinds=None):
+    """Run up to ``limit`` due jobs. Returns ``(succeeded, failed)``."""
+    succeeded = failed = 0
+    for job in claim_jobs(limit, kinds):
+        if run_job(job):
+            succeeded += 1
+        else:
+            failed += 1
+    return succeeded, failed
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from accounts.models import SystemMarker
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the fixed admin and pharmacy users once. Run after migrate on deploy; "
+        "later runs are skipped via a marker row unless --force is given or the configured emails change."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Re-check the users even if the marker exists.')
+
+    def handle(self, *args, **options):
+        admin_email = getattr(settings, 'ADMIN_EMAIL', None)
+        admin_password = getattr(settings, 'ADMIN_PASSWORD', None)
+        pharmacy_email = getattr(settings, 'PHARMACY_EMAIL', None)
+        pharmacy_password = getattr(settings, 'PHARMACY_PASSWORD', None)
+
+        marker_key = f"ensure_system_users:{admin_email or ''}:{pharmacy_email or ''}"
+        if not options['force'] and SystemMarker.objects.filter(key=marker_key).exists():
+            self.stdout.write("System users already ensured; skipping.")
+            return
+
+        User = get_user_model()
+
+        if admin_email and admin_password and not User.objects.filter(email=admin_email).exists():
+            User.objects.create_superuser(email=admin_email, password=admin_password)
+            self.stdout.write(f"Created admin user {admin_email}.")
+
+        if pharmacy_email and pharmacy_password and not User.objects.filter(email=pharmacy_email).exists():
+            User.objects.create_user(
+                email=pharmacy_email,
+                password=pharmacy_password,
+                role='pharmacy',
+            )
+            self.stdout.write(f"Created pharmacy user {pharmacy_email}.")
+
+        SystemMarker.objects.get_or_create(key=marker_key)
+        self.stdout.write(self.style.SUCCESS("System users ensured."))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.doctor_import import RosterError, import_doctors, parse_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Create doctor accounts from a CSV (name,email,password,specialization,phone,department) "
+        "or JSON roster. Nothing is written unless every row is valid."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSON file to import.')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only.')
+        parser.add_argument('--no-email', action='store_true', help='Do not queue welcome emails.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        try:
+            with open(path, 'rb') as roster:
+                rows = parse_rows(roster.read(), path)
+        except OSError as exc:
+            raise CommandError(f"Cannot read {path}: {exc}")
+        except RosterError as exc:
+            raise CommandError(str(exc))
+
+        result = import_doctors(rows, send_emails=not options['no_email'], dry_run=options['dry_run'])
+        for error in result['errors']:
+            self.stderr.write(f"Row {error['row']}: {error['errors']}")
+        if result['errors']:
+            raise CommandError(f"{len(result['errors'])} invalid rows; nothing was imported.")
+
+        if result['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f"{result['valid']} rows are valid."))
+            return
+        if result['email_error']:
+            self.stderr.write(f"Welcome emails not queued: {result['email_error']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result['created']} doctors; {result['emails_queued']} welcome emails queued."
+        ))
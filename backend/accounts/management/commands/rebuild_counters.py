@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from accounts.dashboard import rebuild_counters
+from doctors.assignment import rebuild_pending_counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the admin dashboard counters from the source tables. "
+        "Schedule periodically (e.g. hourly cron) to correct drift from bulk updates or manual edits."
+    )
+
+    def handle(self, *args, **options):
+        for name, (old, new) in rebuild_counters().items():
+            marker = '' if old == new else f' (was {old})'
+            self.stdout.write(f"{name}: {new}{marker}")
+        self.stdout.write(f"doctor pending requests: {rebuild_pending_counts()} doctors corrected")
+        self.stdout.write(self.style.SUCCESS("Dashboard counters rebuilt."))
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.jobs import run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = "Run queued BackgroundJob rows (bulk deletes and other long admin operations)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10, help='Jobs claimed per iteration.')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to sleep when nothing is due.')
+        parser.add_argument('--kind', action='append', dest='kinds', help='Only run jobs of this kind (repeatable).')
+        parser.add_argument('--once', action='store_true', help='Run the currently due jobs and exit.')
+
+    def handle(self, *args, **options):
+        total_ok = total_failed = 0
+        try:
+            while True:
+                ok, failed = run_pending_jobs(options['batch_size'], options['kinds'])
+                total_ok += ok
+                total_failed += failed
+                if ok or failed:
+                    self.stdout.write(f"Jobs: succeeded={ok} failed={failed}")
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f"Job worker done: succeeded={total_ok} failed={total_failed}"))
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.outbox import deliver_batch
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbox emails in batches over one reused email connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='Messages per batch (default EMAIL_OUTBOX_BATCH_SIZE).')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to sleep when the outbox is empty.')
+        parser.add_argument('--once', action='store_true', help='Drain the currently due messages and exit.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        interval = options['interval']
+        total_sent = total_failed = 0
+
+        try:
+            while True:
+                sent, failed = deliver_batch(batch_size)
+                total_sent += sent
+                total_failed += failed
+                if sent or failed:
+                    self.stdout.write(f"Batch: sent={sent} failed={failed}")
+                    continue
+                if options['once']:
+                    break
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f"Outbox worker done: sent={total_sent} failed={total_failed}"))
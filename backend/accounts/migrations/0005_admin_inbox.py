@@ -0,0 +1,88 @@
+# Generated by Django 5.2.11 on 2026-10-17 10:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def seed_inbox_unread(apps, schema_editor):
+    AdminMessage = apps.get_model('accounts', 'AdminMessage')
+    Counter = apps.get_model('accounts', 'Counter')
+    Counter.objects.update_or_create(
+        name='inbox_unread',
+        defaults={'value': AdminMessage.objects.filter(is_read=False).count()},
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_systemmarker'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdminMessageReply',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('message', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Counter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('value', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='adminmessage',
+            name='is_read',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='adminmessage',
+            name='last_reply_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='adminmessage',
+            name='read_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='adminmessage',
+            name='reply_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='adminmessage',
+            index=models.Index(fields=['created_at', 'id'], name='adminmsg_inbox_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='adminmessage',
+            index=models.Index(fields=['is_read', 'created_at', 'id'], name='adminmsg_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='adminmessage',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='adminmsg_user_idx'),
+        ),
+        migrations.AddField(
+            model_name='adminmessagereply',
+            name='author',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='admin_replies', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='adminmessagereply',
+            name='thread',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='replies', to='accounts.adminmessage'),
+        ),
+        migrations.AddIndex(
+            model_name='adminmessagereply',
+            index=models.Index(fields=['thread', 'created_at', 'id'], name='adminreply_thread_idx'),
+        ),
+        migrations.RunPython(seed_inbox_unread, migrations.RunPython.noop),
+    ]
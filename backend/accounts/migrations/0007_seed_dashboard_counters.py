@@ -0,0 +1,44 @@
+from django.db import migrations
+from django.db.models import Count, Q, Sum
+
+
+def seed_dashboard_counters(apps, schema_editor):
+    Counter = apps.get_model('accounts', 'Counter')
+    PatientProfile = apps.get_model('patients', 'PatientProfile')
+    DoctorProfile = apps.get_model('doctors', 'DoctorProfile')
+    ConsultationRequest = apps.get_model('doctors', 'ConsultationRequest')
+    Appointment = apps.get_model('doctors', 'Appointment')
+    Payment = apps.get_model('payments', 'Payment')
+
+    payments = Payment.objects.filter(status='success').aggregate(
+        consultation_count=Count('id', filter=Q(payment_type='consultation')),
+        consultation_total=Sum('amount', filter=Q(payment_type='consultation')),
+        pharmacy_count=Count('id', filter=Q(payment_type='pharmacy')),
+        pharmacy_total=Sum('amount', filter=Q(payment_type='pharmacy')),
+    )
+    values = {
+        'patients': PatientProfile.objects.count(),
+        'doctors': DoctorProfile.objects.count(),
+        'appointments': Appointment.objects.count(),
+        'consultations_pending': ConsultationRequest.objects.filter(status='pending').count(),
+        'payments_consultation': payments['consultation_count'],
+        'revenue_consultation': payments['consultation_total'] or 0,
+        'payments_pharmacy': payments['pharmacy_count'],
+        'revenue_pharmacy': payments['pharmacy_total'] or 0,
+    }
+    for name, value in values.items():
+        Counter.objects.update_or_create(name=name, defaults={'value': value})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_backgroundjob'),
+        ('patients', '0003_directory_indexes'),
+        ('doctors', '0007_directory_indexes'),
+        ('payments', '0003_payment_description_payment_related_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_dashboard_counters, migrations.RunPython.noop),
+    ]
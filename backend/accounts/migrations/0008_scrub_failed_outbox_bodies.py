@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+def scrub_failed_bodies(apps, schema_editor):
+    # Welcome emails used to carry the doctor's password; failed rows kept it indefinitely.
+    EmailOutbox = apps.get_model('accounts', 'EmailOutbox')
+    EmailOutbox.objects.filter(status='failed').exclude(body='').update(body='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_seed_dashboard_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(scrub_failed_bodies, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,174 @@
+"""Transactional email outbox.
+
+Views call ``enqueue_email`` inside their own ``transaction.atomic()`` block so
+the message is committed (or rolled back) together with the data it describes.
+The ``send_queued_emails`` management command then calls ``deliver_batch`` to
+send due messages over a single reused backend connection.
+"""
+
+import logging
+import smtplib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def default_from_email():
+    return getattr(settings, 'DEFAULT_FROM_EMAIL', None) or getattr(settings, 'EMAIL_HOST_USER', None) or ''
+
+
+def enqueue_email(*, subject, body, to, reply_to=None, from_email=None):
+    """Store an email for background delivery and return the outbox row."""
+    if isinstance(to, str):
+        to = [to]
+    if isinstance(reply_to, str):
+        reply_to = [reply_to]
+    # Savepoint so a failed insert never poisons the caller's transaction.
+    with transaction.atomic():
+        return EmailOutbox.objects.create(
+            subject=subject[:255],
+            body=body,
+            from_email=from_email or default_from_email(),
+            to=list(to),
+            reply_to=list(reply_to or []),
+        )
+
+
+def enqueue_emails(messages):
+    """
+    Bulk variant of ``enqueue_email``: ``messages`` is an iterable of dicts with the
+    same keyword arguments. Rows are inserted with ``bulk_create``.
+    """
+    rows = []
+    for message in messages:
+        to = message['to']
+        reply_to = message.get('reply_to') or []
+        rows.append(EmailOutbox(
+            subject=message['subject'][:255],
+            body=message['body'],
+            from_email=message.get('from_email') or default_from_email(),
+            to=[to] if isinstance(to, str) else list(to),
+            reply_to=[reply_to] if isinstance(reply_to, str) else list(reply_to),
+        ))
+    return EmailOutbox.objects.bulk_create(rows, batch_size=500)
+
+
+def _retry_delay(attempts):
+    base = _setting('EMAIL_OUTBOX_RETRY_BASE_SECONDS', 60)
+    cap = _setting('EMAIL_OUTBOX_RETRY_MAX_SECONDS', 3600)
+    return timedelta(seconds=min(base * (2 ** max(attempts - 1, 0)), cap))
+
+
+def claim_batch(batch_size=None):
+    """
+    Lease up to ``batch_size`` due messages to this worker.
+
+    Claiming bumps ``attempts`` and pushes ``next_attempt_at`` past the lease so
+    concurrent workers skip these rows; a crashed worker's rows become due again
+    once the lease expires.
+    """
+    batch_size = batch_size or _setting('EMAIL_OUTBOX_BATCH_SIZE', 50)
+    now = timezone.now()
+    lease_until = now + timedelta(seconds=_setting('EMAIL_OUTBOX_LEASE_SECONDS', 300))
+
+    with transaction.atomic():
+        rows = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        if rows:
+            EmailOutbox.objects.filter(id__in=[row.id for row in rows]).update(
+                attempts=F('attempts') + 1,
+                next_attempt_at=lease_until,
+            )
+
+    for row in rows:
+        row.attempts += 1
+    return rows
+
+
+def _mark_sent(row):
+    # Bodies can hold one-time links (doctor welcome email), so they are not kept once delivered.
+    EmailOutbox.objects.filter(id=row.id).update(
+        status='sent',
+        sent_at=timezone.now(),
+        body='',
+        last_error='',
+    )
+
+
+def _mark_failed(row, exc):
+    max_attempts = _setting('EMAIL_OUTBOX_MAX_ATTEMPTS', 5)
+    error = f"{type(exc).__name__}: {exc}"
+    if isinstance(exc, smtplib.SMTPAuthenticationError):
+        error += (
+            " (Gmail rejected the username/password; use an App Password for EMAIL_HOST_PASSWORD"
+            " with 2-Step Verification enabled.)"
+        )
+    if row.attempts >= max_attempts:
+        # Nothing will send it any more; drop the body rather than keep its link around.
+        EmailOutbox.objects.filter(id=row.id).update(status='failed', body='', last_error=error)
+        logger.error("Giving up on outbox email %s after %s attempts: %s", row.id, row.attempts, error)
+        return
+    EmailOutbox.objects.filter(id=row.id).update(
+        next_attempt_at=timezone.now() + _retry_delay(row.attempts),
+        last_error=error,
+    )
+    logger.warning("Outbox email %s failed (attempt %s), will retry: %s", row.id, row.attempts, error)
+
+
+def deliver_batch(batch_size=None):
+    """Send one batch of due messages. Returns ``(sent, failed)`` counts."""
+    rows = claim_batch(batch_size)
+    if not rows:
+        return 0, 0
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as exc:
+        logger.exception("Could not open email connection for outbox batch")
+        for row in rows:
+            _mark_failed(row, exc)
+        return 0, len(rows)
+
+    sent = failed = 0
+    try:
+        for row in rows:
+            message = EmailMessage(
+                subject=row.subject,
+                body=row.body,
+                from_email=row.from_email or default_from_email(),
+                to=row.to,
+                reply_to=row.reply_to or None,
+                connection=connection,
+            )
+            try:
+                if message.send(fail_silently=False) != 1:
+                    raise RuntimeError("Email backend did not accept the message.")
+            except Exception as exc:
+                _mark_failed(row, exc)
+                failed += 1
+                # Drop a possibly broken SMTP session; the backend reopens it on the next send.
+                connection.close()
+                continue
+            _mark_sent(row)
+            sent += 1
+    finally:
+        connection.close()
+
+    logger.info("Outbox batch delivered: sent=%s failed=%s", sent, failed)
+    return sent, failed
@@ -30,6 +30,12 @@ class PatientRegisterSerializer(serializers.Serializer):
     password = serializers.CharField(write_only=True)
 
 
+class SetPasswordSerializer(serializers.Serializer):
+    uid = serializers.CharField()
+    token = serializers.CharField()
+    password = serializers.CharField(write_only=True)
+
+
 class DoctorCreateSerializer(serializers.Serializer):
     name = serializers.CharField(max_length=150)
     email = serializers.EmailField()
@@ -39,7 +45,7 @@ class DoctorCreateSerializer(serializers.Serializer):
     department = serializers.CharField(max_length=150)
 
 
-from .models import AdminMessage
+from .models import AdminMessage, AdminMessageReply
 
 
 class AdminMessageSerializer(serializers.ModelSerializer):
@@ -49,10 +55,16 @@ class AdminMessageSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = AdminMessage
-        fields = ['id', 'user_email', 'user_role', 'user_phone', 'message', 'created_at']
+        fields = [
+            'id', 'user_email', 'user_role', 'user_phone', 'message', 'created_at',
+            'is_read', 'read_at', 'reply_count', 'last_reply_at',
+        ]
 
     def get_user_phone(self, obj):
-        """Get phone number from the related profile based on user role."""
+        """
+        Get phone number from the related profile based on user role.
+        Querysets should select_related('user__patient_profile', 'user__doctor_profile').
+        """
         user = obj.user
         if user.role == 'patient':
             if hasattr(user, 'patient_profile'):
@@ -66,3 +78,22 @@ class AdminMessageSerializer(serializers.ModelSerializer):
 class AdminMessageCreateSerializer(serializers.Serializer):
     email = serializers.EmailField()
     message = serializers.CharField()
+
+
+class AdminMessageReplySerializer(serializers.ModelSerializer):
+    author_email = serializers.EmailField(source='author.email', read_only=True, default=None)
+
+    class Meta:
+        model = AdminMessageReply
+        fields = ['id', 'thread', 'author_email', 'message', 'created_at']
+
+
+class AdminMessageThreadSerializer(AdminMessageSerializer):
+    replies = AdminMessageReplySerializer(many=True, read_only=True)
+
+    class Meta(AdminMessageSerializer.Meta):
+        fields = AdminMessageSerializer.Meta.fields + ['replies']
+
+
+class AdminMessageReplyCreateSerializer(serializers.Serializer):
+    message = serializers.CharField()
@@ -0,0 +1,97 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from doctors.models import Appointment, ConsultationRequest, DoctorProfile
+from patients.models import PatientProfile
+from payments.models import Payment
+
+from .counters import (
+    APPOINTMENTS,
+    DOCTORS,
+    INBOX_UNREAD,
+    PATIENTS,
+    PENDING_CONSULTATIONS,
+    decrement,
+    increment,
+)
+from .dashboard import PAYMENT_COUNTERS
+from .models import AdminMessage
+
+# Dashboard counters follow row creation and deletion here; deletes include
+# cascades from user removal. bulk_create and queryset.update() bypass these
+# signals, so callers using them adjust the counters themselves.
+ROW_COUNTERS = {
+    PatientProfile: PATIENTS,
+    DoctorProfile: DOCTORS,
+    Appointment: APPOINTMENTS,
+}
+
+
+@receiver(post_delete, sender=AdminMessage)
+def _admin_message_deleted(sender, instance, **kwargs):
+    # Covers cascades from user deletion as well as direct deletes.
+    if not instance.is_read:
+        decrement(INBOX_UNREAD)
+
+
+def _row_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        increment(ROW_COUNTERS[sender])
+
+
+def _row_deleted(sender, instance, **kwargs):
+    decrement(ROW_COUNTERS[sender])
+
+
+for _model in ROW_COUNTERS:
+    post_save.connect(_row_saved, sender=_model, dispatch_uid=f'dashboard-save-{_model._meta.label}')
+    post_delete.connect(_row_deleted, sender=_model, dispatch_uid=f'dashboard-delete-{_model._meta.label}')
+
+
+@receiver(post_init, sender=ConsultationRequest)
+def _consultation_loaded(sender, instance, **kwargs):
+    # Remember the stored status so a save can tell a pending -> decided transition.
+    # Read from __dict__ so a deferred status field does not trigger a query.
+    instance._counted_status = instance.__dict__.get('status') if instance.pk else ''
+
+
+@receiver(post_save, sender=ConsultationRequest)
+def _consultation_saved(sender, instance, created, raw=False, **kwargs):
+    if raw or instance._counted_status is None or 'status' not in instance.__dict__:
+        return
+    was_pending = instance._counted_status == 'pending'
+    is_pending = instance.status == 'pending'
+    if is_pending and not was_pending:
+        increment(PENDING_CONSULTATIONS)
+    elif was_pending and not is_pending:
+        decrement(PENDING_CONSULTATIONS)
+    instance._counted_status = instance.status
+
+
+@receiver(post_delete, sender=ConsultationRequest)
+def _consultation_deleted(sender, instance, **kwargs):
+    if instance._counted_status == 'pending':
+        decrement(PENDING_CONSULTATIONS)
+
+
+def _payment_counters(instance):
+    if instance.status != 'success':
+        return None
+    return PAYMENT_COUNTERS.get(instance.payment_type)
+
+
+@receiver(post_save, sender=Payment)
+def _payment_saved(sender, instance, created, raw=False, **kwargs):
+    # Payments are written once by verify_payment and never change status afterwards.
+    counters = _payment_counters(instance) if created and not raw else None
+    if counters:
+        increment(counters[0])
+        increment(counters[1], instance.amount)
+
+
+@receiver(post_delete, sender=Payment)
+def _payment_deleted(sender, instance, **kwargs):
+    counters = _payment_counters(instance)
+    if counters:
+        decrement(counters[0])
+        decrement(counters[1], instance.amount)
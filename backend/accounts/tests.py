@@ -0,0 +1,169 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.mail.backends.base import BaseEmailBackend
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from . import auth
+from .auth import issue_token, resolve_identity, revoke_tokens
+from .bulk import delete_users, set_active
+from .models import EmailOutbox, User
+from .outbox import claim_batch, deliver_batch, enqueue_email
+from .throttle import SlidingWindowLimiter
+
+
+class FailingBackend(BaseEmailBackend):
+    def send_messages(self, messages):
+        raise ConnectionError('SMTP is down')
+
+
+class TokenRevocationTests(TestCase):
+    def setUp(self):
+        auth._token_state_cache.clear()
+        self.user = User.objects.create_user(email='pat@example.com', password='pw', role='patient')
+        self.factory = RequestFactory()
+
+    def resolve(self, token, email=None):
+        request = self.factory.get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        return resolve_identity(request, email)
+
+    def test_valid_token(self):
+        identity = self.resolve(issue_token(self.user, 7))
+        self.assertEqual((identity.user_id, identity.role, identity.profile_id), (self.user.id, 'patient', 7))
+
+    def test_revoke_tokens(self):
+        token = issue_token(self.user)
+        self.assertIsNotNone(self.resolve(token))
+        revoke_tokens([self.user.id])
+        self.assertIsNone(self.resolve(token))
+
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.resolve(issue_token(self.user)))
+
+    def test_revoked_token_does_not_fall_back_to_email(self):
+        token = issue_token(self.user)
+        revoke_tokens([self.user.id])
+        self.assertIsNone(self.resolve(token, email=self.user.email))
+        self.assertIsNone(self.resolve('not-a-token', email=self.user.email))
+
+    def test_deactivation_revokes_for_good(self):
+        token = issue_token(self.user)
+        self.assertIsNotNone(self.resolve(token))
+        set_active('patient', [self.user.id], False)
+        self.assertIsNone(self.resolve(token))
+
+        set_active('patient', [self.user.id], True)
+        self.assertIsNone(self.resolve(token))
+
+    def test_deleted_user(self):
+        token = issue_token(self.user)
+        self.assertIsNotNone(self.resolve(token))
+        delete_users('patient', [self.user.id])
+        self.assertIsNone(self.resolve(token))
+
+    def test_expired_token(self):
+        token = issue_token(self.user)
+        with override_settings(ACCESS_TOKEN_MAX_AGE=-1):
+            self.assertIsNone(self.resolve(token))
+
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    EMAIL_OUTBOX_LEASE_SECONDS=300,
+    EMAIL_OUTBOX_RETRY_BASE_SECONDS=60,
+    EMAIL_OUTBOX_RETRY_MAX_SECONDS=3600,
+    EMAIL_OUTBOX_MAX_ATTEMPTS=3,
+)
+class OutboxTests(TestCase):
+    def setUp(self):
+        self.row = enqueue_email(subject='Hello', body='Link: https://example.com/x', to='a@example.com')
+
+    def test_claim_leases_rows(self):
+        self.assertEqual([row.id for row in claim_batch()], [self.row.id])
+        # Leased: a second worker finds nothing due.
+        self.assertEqual(claim_batch(), [])
+
+        self.row.refresh_from_db()
+        self.assertEqual(self.row.attempts, 1)
+        self.assertGreater(self.row.next_attempt_at, timezone.now() + timedelta(seconds=290))
+
+        # A crashed worker's lease runs out and the row is claimed again.
+        EmailOutbox.objects.filter(pk=self.row.pk).update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+        claimed = claim_batch()
+        self.assertEqual([(row.id, row.attempts) for row in claimed], [(self.row.id, 2)])
+
+    def test_sent_clears_body(self):
+        self.assertEqual(deliver_batch(), (1, 0))
+        self.row.refresh_from_db()
+        self.assertEqual((self.row.status, self.row.body), ('sent', ''))
+        self.assertIsNotNone(self.row.sent_at)
+
+    @override_settings(EMAIL_BACKEND='accounts.tests.FailingBackend')
+    def test_failure_backs_off_then_gives_up(self):
+        delays = []
+        for _ in range(2):
+            before = timezone.now()
+            with self.assertLogs('accounts.outbox', 'WARNING'):
+                self.assertEqual(deliver_batch(), (0, 1))
+            self.row.refresh_from_db()
+            self.assertEqual(self.row.status, 'pending')
+            self.assertIn('SMTP is down', self.row.last_error)
+            delays.append(round((self.row.next_attempt_at - before).total_seconds()))
+            EmailOutbox.objects.filter(pk=self.row.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(delays, [60, 120])
+
+        with self.assertLogs('accounts.outbox', 'ERROR'):
+            self.assertEqual(deliver_batch(), (0, 1))
+        self.row.refresh_from_db()
+        self.assertEqual((self.row.status, self.row.attempts, self.row.body), ('failed', 3, ''))
+        self.assertEqual(claim_batch(), [])
+
+
+class SlidingWindowLimiterTests(SimpleTestCase):
+    def test_local_window(self):
+        limiter = SlidingWindowLimiter(limit=2, window=60)
+        with mock.patch('accounts.throttle.time.monotonic', return_value=1000.0) as clock:
+            self.assertEqual(limiter.hit('a'), (True, 0))
+            clock.return_value = 1010.0
+            self.assertEqual(limiter.hit('a'), (True, 0))
+            self.assertEqual(limiter.hit('a'), (False, 50))
+            # Other keys have their own window.
+            self.assertEqual(limiter.hit('b'), (True, 0))
+
+            # The first hit leaves the window; the second still counts.
+            clock.return_value = 1061.0
+            self.assertEqual(limiter.hit('a'), (True, 0))
+            self.assertEqual(limiter.hit('a')[0], False)
+
+            limiter.reset('a')
+            self.assertEqual(limiter.hit('a'), (True, 0))
+
+    @override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'throttle': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'throttle-tests'},
+    })
+    def test_shared_window(self):
+        limiter = SlidingWindowLimiter(limit=2, window=60, cache_alias='throttle', prefix='test')
+        with mock.patch('accounts.throttle.time.time', return_value=6000.0) as clock:
+            self.assertEqual(limiter.hit('a'), (True, 0))
+            self.assertEqual(limiter.hit('a'), (True, 0))
+            clock.return_value = 6015.0
+            self.assertEqual(limiter.hit('a'), (False, 45))
+
+            # Next bucket: the previous one still weighs (60 - 30) / 60 * 2 = 1 hit.
+            clock.return_value = 6090.0
+            self.assertEqual(limiter.hit('a'), (True, 0))
+            self.assertEqual(limiter.hit('a')[0], False)
+
+            # Two buckets later the old hits no longer count.
+            clock.return_value = 6200.0
+            self.assertEqual(limiter.hit('a'), (True, 0))
+
+    def test_max_keys(self):
+        limiter = SlidingWindowLimiter(limit=1, window=60, max_keys=2)
+        for key in ('a', 'b', 'c'):
+            limiter.hit(key)
+        # 'a' was evicted, so it starts a fresh window.
+        self.assertEqual(limiter.hit('a'), (True, 0))
+        self.assertEqual(limiter.hit('c')[0], False)
@@ -0,0 +1,202 @@
+"""
+Login protection for the PBKDF2 CPU budget.
+
+``check_login_throttle`` runs before the user lookup and password hash and
+rejects callers that exceed a sliding-window limit per email and per client IP.
+``verify_password_bounded`` runs the hash for the remaining attempts on a small
+worker pool so a burst of logins cannot occupy every request thread.
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import verify_password
+from django.core.cache import caches
+
+
+class HashPoolBusy(Exception):
+    """Raised when the password hashing pool has no free slot."""
+
+
+_stats_lock = threading.Lock()
+_stats = {
+    'attempts': 0,
+    'throttled_email': 0,
+    'throttled_ip': 0,
+    'hashes_avoided': 0,
+    'hashes_computed': 0,
+    'hash_pool_busy': 0,
+}
+
+
+def _bump(name, amount=1):
+    with _stats_lock:
+        _stats[name] += amount
+
+
+def login_stats():
+    """Snapshot of this process's login counters."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+class SlidingWindowLimiter:
+    """
+    Allow at most ``limit`` hits per key in any ``window`` seconds.
+
+    Without ``cache_alias`` hits are kept as an exact in-process log (bounded to
+    ``max_keys`` keys). With a shared Django cache (Redis/Memcached) the common
+    two-bucket sliding-window counter is used so every worker sees the same count.
+    """
+
+    def __init__(self, limit, window, cache_alias=None, prefix='throttle', max_keys=100_000):
+        self.limit = limit
+        self.window = window
+        self.cache_alias = cache_alias
+        self.prefix = prefix
+        self.max_keys = max_keys
+        self._hits = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key):
+        """Record an attempt. Returns ``(allowed, retry_after_seconds)``."""
+        if self.cache_alias:
+            return self._hit_shared(key)
+        return self._hit_local(key)
+
+    def reset(self, key):
+        if self.cache_alias:
+            bucket = int(time.time() // self.window)
+            caches[self.cache_alias].delete_many([self._bucket_key(key, bucket), self._bucket_key(key, bucket - 1)])
+            return
+        with self._lock:
+            self._hits.pop(key, None)
+
+    def _hit_local(self, key):
+        now = time.monotonic()
+        with self._lock:
+            hits = self._hits.get(key)
+            if hits is None:
+                hits = self._hits[key] = deque()
+                while len(self._hits) > self.max_keys:
+                    self._hits.popitem(last=False)
+            else:
+                self._hits.move_to_end(key)
+            while hits and hits[0] <= now - self.window:
+                hits.popleft()
+            if len(hits) >= self.limit:
+                return False, max(1, int(hits[0] + self.window - now))
+            hits.append(now)
+            return True, 0
+
+    def _bucket_key(self, key, bucket):
+        return f"{self.prefix}:{key}:{bucket}"
+
+    def _hit_shared(self, key):
+        cache = caches[self.cache_alias]
+        now = time.time()
+        bucket = int(now // self.window)
+        elapsed = now - bucket * self.window
+        current_key = self._bucket_key(key, bucket)
+        previous_key = self._bucket_key(key, bucket - 1)
+
+        counts = cache.get_many([current_key, previous_key])
+        estimated = counts.get(previous_key, 0) * (self.window - elapsed) / self.window + counts.get(current_key, 0)
+        if estimated >= self.limit:
+            return False, max(1, int(self.window - elapsed))
+
+        cache.add(current_key, 0, timeout=self.window * 2)
+        try:
+            cache.incr(current_key)
+        except ValueError:
+            cache.set(current_key, 1, timeout=self.window * 2)
+        return True, 0
+
+
+_email_limiter = SlidingWindowLimiter(
+    limit=getattr(settings, 'LOGIN_THROTTLE_EMAIL_LIMIT', 10),
+    window=getattr(settings, 'LOGIN_THROTTLE_WINDOW', 300),
+    cache_alias=getattr(settings, 'LOGIN_THROTTLE_CACHE_ALIAS', None),
+    prefix='login-email',
+)
+_ip_limiter = SlidingWindowLimiter(
+    limit=getattr(settings, 'LOGIN_THROTTLE_IP_LIMIT', 50),
+    window=getattr(settings, 'LOGIN_THROTTLE_WINDOW', 300),
+    cache_alias=getattr(settings, 'LOGIN_THROTTLE_CACHE_ALIAS', None),
+    prefix='login-ip',
+)
+
+
+def client_ip(request):
+    if getattr(settings, 'LOGIN_THROTTLE_TRUST_X_FORWARDED_FOR', False):
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+        if forwarded:
+            # The last hop is the one appended by our own proxy and cannot be spoofed by the client.
+            return forwarded.split(',')[-1].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def check_login_throttle(request, email):
+    """
+    Count a login attempt. Returns ``None`` when it may proceed, otherwise the
+    number of seconds the caller should wait.
+    """
+    _bump('attempts')
+    allowed, retry_after = _ip_limiter.hit(client_ip(request))
+    if not allowed:
+        _bump('throttled_ip')
+        _bump('hashes_avoided')
+        return retry_after
+    allowed, retry_after = _email_limiter.hit(email.strip().lower())
+    if not allowed:
+        _bump('throttled_email')
+        _bump('hashes_avoided')
+        return retry_after
+    return None
+
+
+def reset_login_throttle(email):
+    """Forget failed attempts for ``email`` after a successful login."""
+    _email_limiter.reset(email.strip().lower())
+
+
+_pool = None
+_pool_slots = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool, _pool_slots
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                workers = getattr(settings, 'LOGIN_HASH_WORKERS', 2)
+                _pool_slots = threading.BoundedSemaphore(workers + getattr(settings, 'LOGIN_HASH_QUEUE', 8))
+                _pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='login-hash')
+    return _pool, _pool_slots
+
+
+def verify_password_bounded(user, password):
+    """
+    ``user.check_password`` with the hash computed on the bounded login pool.
+
+    Raises ``HashPoolBusy`` if no slot frees up within LOGIN_HASH_WAIT_SECONDS.
+    """
+    pool, slots = _get_pool()
+    if not slots.acquire(timeout=getattr(settings, 'LOGIN_HASH_WAIT_SECONDS', 2)):
+        _bump('hash_pool_busy')
+        raise HashPoolBusy()
+    try:
+        is_correct, must_update = pool.submit(verify_password, password, user.password).result()
+    finally:
+        slots.release()
+    _bump('hashes_computed')
+
+    # Same upgrade path as AbstractBaseUser.check_password, kept on the request thread's DB connection.
+    if is_correct and must_update:
+        user.set_password(password)
+        user.save(update_fields=['password'])
+    return is_correct
@@ -3,6 +3,7 @@ from django.urls import path
 from .views import (
     patient_login,
     role_login,
+    set_password,
     patient_register,
     create_doctor,
     admin_patient_list,
@@ -11,7 +12,19 @@ from .views import (
     admin_doctor_list,
     admin_doctor_status,
     admin_doctor_delete,
+    admin_patient_bulk_status,
+    admin_patient_bulk_delete,
+    admin_doctor_bulk_status,
+    admin_doctor_bulk_delete,
+    admin_doctor_import,
+    admin_job_detail,
     admin_messages,
+    admin_message_read,
+    admin_messages_read_all,
+    admin_message_replies,
+    my_messages,
+    admin_dashboard,
+    admin_login_stats,
     test_email,
 )
 
@@ -19,14 +32,27 @@ urlpatterns = [
     path('patient-login/', patient_login, name='patient-login'),
     path('patient-register/', patient_register, name='patient-register'),
     path('role-login/', role_login, name='role-login'),
+    path('set-password/', set_password, name='set-password'),
     path('create-doctor/', create_doctor, name='create-doctor'),
     path('admin/patients/', admin_patient_list, name='admin-patient-list'),
     path('admin/patients/<int:user_id>/status/', admin_patient_status, name='admin-patient-status'),
     path('admin/patients/<int:user_id>/delete/', admin_patient_delete, name='admin-patient-delete'),
+    path('admin/patients/bulk-status/', admin_patient_bulk_status, name='admin-patient-bulk-status'),
+    path('admin/patients/bulk-delete/', admin_patient_bulk_delete, name='admin-patient-bulk-delete'),
     path('admin/doctors/', admin_doctor_list, name='admin-doctor-list'),
     path('admin/doctors/<int:user_id>/status/', admin_doctor_status, name='admin-doctor-status'),
     path('admin/doctors/<int:user_id>/delete/', admin_doctor_delete, name='admin-doctor-delete'),
+    path('admin/doctors/bulk-status/', admin_doctor_bulk_status, name='admin-doctor-bulk-status'),
+    path('admin/doctors/bulk-delete/', admin_doctor_bulk_delete, name='admin-doctor-bulk-delete'),
+    path('admin/doctors/import/', admin_doctor_import, name='admin-doctor-import'),
+    path('admin/jobs/<int:pk>/', admin_job_detail, name='admin-job-detail'),
     path('messages/', admin_messages, name='admin-messages'),
     path('admin/messages/', admin_messages, name='admin-messages-admin'),
+    path('admin/messages/read-all/', admin_messages_read_all, name='admin-messages-read-all'),
+    path('admin/messages/<int:pk>/read/', admin_message_read, name='admin-message-read'),
+    path('admin/messages/<int:pk>/replies/', admin_message_replies, name='admin-message-replies'),
+    path('messages/mine/', my_messages, name='my-messages'),
+    path('admin/dashboard/', admin_dashboard, name='admin-dashboard'),
+    path('admin/login-stats/', admin_login_stats, name='admin-login-stats'),
     path('test-email/', test_email, name='test-email'),
 ]
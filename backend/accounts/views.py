@@ -1,11 +1,18 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.auth.password_validation import validate_password
+from django.contrib.auth.tokens import default_token_generator
+from django.core.exceptions import ValidationError
+from django.utils.encoding import force_str
+from django.utils.http import urlsafe_base64_decode
 from django.db import transaction
+from django.db.models import F, Prefetch, Q
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
 import logging
-import smtplib
 
 from .serializers import (
     PatientLoginSerializer,
@@ -13,36 +20,72 @@ from .serializers import (
     UserSerializer,
     PatientRegisterSerializer,
     DoctorCreateSerializer,
+    SetPasswordSerializer,
     AdminMessageSerializer,
     AdminMessageCreateSerializer,
+    AdminMessageReplyCreateSerializer,
+    AdminMessageReplySerializer,
+    AdminMessageThreadSerializer,
 )
 from patients.models import PatientProfile
 from doctors.models import DoctorProfile
 from doctors.models import Department
-from .models import AdminMessage
+from telemedicine.pagination import CursorError, approximate_count, paginate_request, wants_page
+from .auth import issue_token, resolve_identity, revoke_tokens
+from .bulk import delete_or_enqueue, parse_user_ids, set_active
+from .dashboard import dashboard_totals
+from .doctor_import import RosterError, import_doctors, parse_rows
+from .counters import INBOX_UNREAD, decrement, get_counter, increment
+from .models import AdminMessage, AdminMessageReply, BackgroundJob
+from .emails import doctor_welcome_message, smtp_sender
+from .outbox import enqueue_email
+from .throttle import (
+    HashPoolBusy,
+    check_login_throttle,
+    login_stats,
+    reset_login_throttle,
+    verify_password_bounded,
+)
 
 User = get_user_model()
 
 logger = logging.getLogger(__name__)
 
-def _get_display_name(user):
+def _get_role_profile(user):
     if user.role == 'patient':
-        profile = PatientProfile.objects.filter(user=user).only('full_name').first()
-        if profile and profile.full_name:
-            return profile.full_name
+        return PatientProfile.objects.filter(user=user).only('id', 'full_name').first()
     if user.role == 'doctor':
-        profile = DoctorProfile.objects.filter(user=user).only('full_name').first()
-        if profile and profile.full_name:
-            return profile.full_name
+        return DoctorProfile.objects.filter(user=user).only('id', 'full_name').first()
+    return None
+
+def _get_display_name(user, profile=None):
+    if profile is None:
+        profile = _get_role_profile(user)
+    if profile and profile.full_name:
+        return profile.full_name
     return user.email
 
 def _login_payload(user):
+    profile = _get_role_profile(user)
     return {
         'message': 'Login successful',
         'user': UserSerializer(user).data,
-        'display_name': _get_display_name(user),
+        'display_name': _get_display_name(user, profile),
+        'token': issue_token(user, profile.id if profile else None),
+        'token_type': 'Bearer',
+        'expires_in': settings.ACCESS_TOKEN_MAX_AGE,
     }
 
+def _throttled_login_response(request, email):
+    retry_after = check_login_throttle(request, email)
+    if retry_after is None:
+        return None
+    return Response(
+        {'detail': 'Too many login attempts. Please try again later.', 'retry_after': retry_after},
+        status=status.HTTP_429_TOO_MANY_REQUESTS,
+        headers={'Retry-After': str(retry_after)},
+    )
+
 @api_view(['POST'])
 def patient_login(request):
     """Login for patients (email + password only)."""
@@ -53,13 +96,26 @@ def patient_login(request):
     email = serializer.validated_data['email']
     password = serializer.validated_data['password']
 
+    throttled = _throttled_login_response(request, email)
+    if throttled:
+        return throttled
+
     try:
         user = User.objects.get(email=email)
     except User.DoesNotExist:
         return Response({'detail': 'Email not found.'}, status=status.HTTP_404_NOT_FOUND)
 
-    if not user.check_password(password):
+    try:
+        password_ok = verify_password_bounded(user, password)
+    except HashPoolBusy:
+        return Response(
+            {'detail': 'Login service is busy. Please try again shortly.'},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={'Retry-After': '1'},
+        )
+    if not password_ok:
         return Response({'detail': 'Invalid password.'}, status=status.HTTP_400_BAD_REQUEST)
+    reset_login_throttle(email)
 
     if user.role != 'patient':
         return Response({'detail': 'Not a patient account.'}, status=status.HTTP_403_FORBIDDEN)
@@ -86,13 +142,26 @@ def role_login(request):
     password = serializer.validated_data['password']
     role = serializer.validated_data['role']
 
+    throttled = _throttled_login_response(request, email)
+    if throttled:
+        return throttled
+
     try:
         user = User.objects.get(email=email)
     except User.DoesNotExist:
         return Response({'detail': 'Email not found.'}, status=status.HTTP_404_NOT_FOUND)
 
-    if not user.check_password(password):
+    try:
+        password_ok = verify_password_bounded(user, password)
+    except HashPoolBusy:
+        return Response(
+            {'detail': 'Login service is busy. Please try again shortly.'},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={'Retry-After': '1'},
+        )
+    if not password_ok:
         return Response({'detail': 'Invalid password.'}, status=status.HTTP_400_BAD_REQUEST)
+    reset_login_throttle(email)
 
     if user.role != role:
         return Response({'detail': 'Selected role does not match.'}, status=status.HTTP_403_FORBIDDEN)
@@ -107,6 +176,44 @@ def role_login(request):
     return Response(_login_payload(user))
 
 
+@api_view(['GET'])
+def admin_dashboard(request):
+    """Totals for the admin dashboard, read from the maintained counters in one query."""
+    return Response(dashboard_totals())
+
+
+@api_view(['GET'])
+def admin_login_stats(request):
+    """Login throttle counters for this worker process (hashes avoided, pool pressure)."""
+    return Response(login_stats())
+
+
+@api_view(['POST'])
+def set_password(request):
+    """Set a password from the one-time link in the doctor welcome email (``uid``, ``token``, ``password``)."""
+    serializer = SetPasswordSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    data = serializer.validated_data
+    try:
+        user = User.objects.get(pk=force_str(urlsafe_base64_decode(data['uid'])))
+    except (TypeError, ValueError, OverflowError, User.DoesNotExist):
+        user = None
+    if user is None or not default_token_generator.check_token(user, data['token']):
+        return Response({'detail': 'This link is invalid or has expired.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        validate_password(data['password'], user)
+    except ValidationError as e:
+        return Response({'password': list(e.messages)}, status=status.HTTP_400_BAD_REQUEST)
+
+    user.set_password(data['password'])
+    user.save(update_fields=['password'])
+    revoke_tokens([user.id])
+    return Response({'detail': 'Password set. You can now sign in.'}, status=status.HTTP_200_OK)
+
+
 @api_view(['POST'])
 def patient_register(request):
     """Register a patient account."""
@@ -175,63 +282,123 @@ def create_doctor(request):
             department=department,
         )
 
-    email_sent = False
-    email_error = None
-    email_error_type = None
-    email_debug = None
-
-    try:
-        _send_doctor_welcome_email(
-            doctor_name=data['name'],
-            to_email=email,
-            raw_password=data['password'],
-        )
-        email_sent = True
-    except Exception as e:
-        email_error_type = type(e).__name__
-        if isinstance(e, smtplib.SMTPAuthenticationError):
-            email_error = (
-                "SMTP authentication failed (Gmail rejected the username/password). "
-                "If you're using Gmail, configure 2-Step Verification and use an App Password for EMAIL_HOST_PASSWORD."
-            )
-        else:
+        email_queued = False
+        email_error = None
+        email_error_type = None
+        email_debug = None
+
+        # Queued in the same transaction; the send_queued_emails worker delivers it.
+        try:
+            _send_doctor_welcome_email(doctor_name=data['name'], user=user)
+            email_queued = True
+        except Exception as e:
+            email_error_type = type(e).__name__
             email_error = str(e)
+            logger.exception("Doctor welcome email could not be queued", extra={
+                "to_email": email,
+                "email_debug": _safe_email_debug(),
+            })
 
-        # Full traceback in server logs (best place to see the real reason)
-        print(f"EMAIL ERROR: {e}") # Debugging
-        logger.exception("Doctor welcome email failed", extra={
-            "to_email": email,
-            "email_debug": _safe_email_debug(),
-        })
-
-        # Optional: return safe diagnostics to frontend for debugging (no secrets)
-        email_debug = _safe_email_debug()
+            # Optional: return safe diagnostics to frontend for debugging (no secrets)
+            email_debug = _safe_email_debug()
 
     return Response({
         'message': 'Doctor created successfully',
-        'email_sent': email_sent,
+        'email_queued': email_queued,
         'email_error': email_error,
         'email_error_type': email_error_type,
-        'email_debug': email_debug if not email_sent else None,
+        'email_debug': email_debug if not email_queued else None,
         'user': UserSerializer(user).data,
     }, status=status.HTTP_201_CREATED)
 
 
+ADMIN_LIST_PARAMS = ('q', 'is_active', 'department', 'sort')
+
+# Keyset orderings for the admin directories; each ends with the primary key so pages are stable.
+ADMIN_LIST_SORTS = {
+    'name': ('full_name', 'id'),
+    '-name': ('-full_name', '-id'),
+    'email': ('user__email', 'id'),
+    '-email': ('-user__email', '-id'),
+    'newest': ('-created_at', '-id'),
+    'oldest': ('created_at', 'id'),
+}
+
+
+def _parse_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in {'true', '1', 'yes'}
+    return bool(value)
+
+
+def _admin_directory_page(request, profiles, row):
+    """Filter, sort and keyset-paginate an admin directory queryset from the query string."""
+    q = request.GET.get('q', '').strip()
+    if q:
+        profiles = profiles.filter(
+            Q(full_name__istartswith=q) | Q(user__email__istartswith=q) | Q(phone__startswith=q)
+        )
+
+    is_active = request.GET.get('is_active', '').strip()
+    if is_active:
+        profiles = profiles.filter(user__is_active=_parse_bool(is_active))
+
+    sort = request.GET.get('sort') or 'newest'
+    ordering = ADMIN_LIST_SORTS.get(sort)
+    if ordering is None:
+        return Response(
+            {'detail': f"sort must be one of: {', '.join(ADMIN_LIST_SORTS)}."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        page, page_info = paginate_request(request, profiles, ordering)
+    except CursorError as e:
+        return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    count, count_is_estimate = approximate_count(profiles)
+    return Response({
+        'results': [row(profile) for profile in page],
+        'count': count,
+        'count_is_estimate': count_is_estimate,
+        **page_info,
+    })
+
+
+def _admin_patient_row(profile):
+    return {
+        'id': profile.user.id,
+        'profile_id': profile.id,
+        'name': profile.full_name,
+        'email': profile.user.email,
+        'phone': profile.phone,
+        'is_active': profile.user.is_active,
+    }
+
+
+def _admin_doctor_row(profile):
+    return {
+        'id': profile.user.id,
+        'profile_id': profile.id,
+        'name': profile.full_name,
+        'email': profile.user.email,
+        'phone': profile.phone,
+        'specialization': profile.specialization,
+        'department': profile.department.name if profile.department else '',
+        'is_active': profile.user.is_active,
+    }
+
+
 @api_view(['GET'])
 def admin_patient_list(request):
-    profiles = PatientProfile.objects.select_related('user').all()
-    data = [
-        {
-            'id': profile.user.id,
-            'profile_id': profile.id,
-            'name': profile.full_name,
-            'email': profile.user.email,
-            'phone': profile.phone,
-            'is_active': profile.user.is_active,
-        }
-        for profile in profiles
-    ]
-    return Response(data)
+    """
+    Patient directory. With any of q/is_active/sort/cursor/limit it returns a keyset
+    page ``{results, next_cursor, count}``; without them, the legacy full array.
+    """
+    profiles = PatientProfile.objects.select_related('user')
+    if not wants_page(request, ADMIN_LIST_PARAMS):
+        return Response([_admin_patient_row(profile) for profile in profiles])
+    return _admin_directory_page(request, profiles, _admin_patient_row)
 
 
 @api_view(['PATCH'])
@@ -245,30 +412,28 @@ def admin_patient_status(request, user_id):
     if is_active is None:
         return Response({'detail': 'is_active is required.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    if isinstance(is_active, str):
-        is_active = is_active.strip().lower() in {'true', '1', 'yes'}
-    user.is_active = bool(is_active)
-    user.save()
+    user.is_active = _parse_bool(is_active)
+    user.save(update_fields=['is_active'])
+    if not user.is_active:
+        revoke_tokens([user.id])
     return Response({'id': user.id, 'is_active': user.is_active})
 
 
 @api_view(['GET'])
 def admin_doctor_list(request):
-    profiles = DoctorProfile.objects.select_related('user', 'department').all()
-    data = [
-        {
-            'id': profile.user.id,
-            'profile_id': profile.id,
-            'name': profile.full_name,
-            'email': profile.user.email,
-            'phone': profile.phone,
-            'specialization': profile.specialization,
-            'department': profile.department.name if profile.department else '',
-            'is_active': profile.user.is_active,
-        }
-        for profile in profiles
-    ]
-    return Response(data)
+    """Doctor directory; same parameters as admin_patient_list plus ``department`` (id or name)."""
+    profiles = DoctorProfile.objects.select_related('user', 'department')
+    if not wants_page(request, ADMIN_LIST_PARAMS):
+        return Response([_admin_doctor_row(profile) for profile in profiles])
+
+    department = request.GET.get('department', '').strip()
+    if department:
+        if department.isdigit():
+            profiles = profiles.filter(department_id=int(department))
+        else:
+            department_id = Department.objects.filter(name=department).values_list('id', flat=True).first()
+            profiles = profiles.filter(department_id=department_id) if department_id else profiles.none()
+    return _admin_directory_page(request, profiles, _admin_doctor_row)
 
 
 @api_view(['PATCH'])
@@ -282,10 +447,10 @@ def admin_doctor_status(request, user_id):
     if is_active is None:
         return Response({'detail': 'is_active is required.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    if isinstance(is_active, str):
-        is_active = is_active.strip().lower() in {'true', '1', 'yes'}
-    user.is_active = bool(is_active)
-    user.save()
+    user.is_active = _parse_bool(is_active)
+    user.save(update_fields=['is_active'])
+    if not user.is_active:
+        revoke_tokens([user.id])
     return Response({'id': user.id, 'is_active': user.is_active})
 
 
@@ -297,9 +462,21 @@ def admin_patient_delete(request, user_id):
     except User.DoesNotExist:
         return Response({'detail': 'Patient not found.'}, status=status.HTTP_404_NOT_FOUND)
 
-    # Delete user (profile will cascade delete due to OneToOne relationship)
+    # Delete user (profile will cascade delete due to OneToOne relationship);
+    # large cascades are handed to the background job worker.
     user_email = user.email
-    user.delete()
+    results, job = delete_or_enqueue('patient', [user.id])
+    if job:
+        return Response(
+            {'detail': f'Deletion of patient {user_email} has been queued.', 'job_id': job.id},
+            status=status.HTTP_202_ACCEPTED,
+        )
+    outcome = results[str(user.id)]
+    if outcome == 'not_found':
+        return Response({'detail': 'Patient not found.'}, status=status.HTTP_404_NOT_FOUND)
+    if outcome != 'deleted':
+        return Response({'detail': f'Could not delete patient {user_email}.', 'error': outcome.removeprefix('error: ')},
+                        status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     return Response({'detail': f'Patient {user_email} deleted successfully.'}, status=status.HTTP_200_OK)
 
 
@@ -311,18 +488,164 @@ def admin_doctor_delete(request, user_id):
     except User.DoesNotExist:
         return Response({'detail': 'Doctor not found.'}, status=status.HTTP_404_NOT_FOUND)
 
-    # Delete user (profile will cascade delete due to OneToOne relationship)
+    # Delete user (profile will cascade delete due to OneToOne relationship);
+    # large cascades are handed to the background job worker.
     user_email = user.email
-    user.delete()
+    results, job = delete_or_enqueue('doctor', [user.id])
+    if job:
+        return Response(
+            {'detail': f'Deletion of doctor {user_email} has been queued.', 'job_id': job.id},
+            status=status.HTTP_202_ACCEPTED,
+        )
+    outcome = results[str(user.id)]
+    if outcome == 'not_found':
+        return Response({'detail': 'Doctor not found.'}, status=status.HTTP_404_NOT_FOUND)
+    if outcome != 'deleted':
+        return Response({'detail': f'Could not delete doctor {user_email}.', 'error': outcome.removeprefix('error: ')},
+                        status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     return Response({'detail': f'Doctor {user_email} deleted successfully.'}, status=status.HTTP_200_OK)
 
 
+def _bulk_status(request, role):
+    user_ids, error = parse_user_ids(request.data.get('user_ids'))
+    if error:
+        return Response({'detail': error}, status=status.HTTP_400_BAD_REQUEST)
+    is_active = request.data.get('is_active')
+    if is_active is None:
+        return Response({'detail': 'is_active is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    is_active = _parse_bool(is_active)
+    updated = set_active(role, user_ids, is_active)
+    updated_set = set(updated)
+    return Response({
+        'is_active': is_active,
+        'updated': updated,
+        'not_found': [user_id for user_id in user_ids if user_id not in updated_set],
+    })
+
+
+def _bulk_delete(request, role):
+    user_ids, error = parse_user_ids(request.data.get('user_ids'))
+    if error:
+        return Response({'detail': error}, status=status.HTTP_400_BAD_REQUEST)
+
+    results, job = delete_or_enqueue(role, user_ids)
+    if job:
+        return Response({'job_id': job.id, 'status': job.status}, status=status.HTTP_202_ACCEPTED)
+    return Response({
+        'results': results,
+        'deleted': sum(1 for value in results.values() if value == 'deleted'),
+    })
+
+
+@api_view(['POST'])
+def admin_patient_bulk_status(request):
+    """Block/unblock many patients: ``{"user_ids": [...], "is_active": false}``."""
+    return _bulk_status(request, 'patient')
+
+
+@api_view(['POST'])
+def admin_doctor_bulk_status(request):
+    return _bulk_status(request, 'doctor')
+
+
+@api_view(['POST'])
+def admin_patient_bulk_delete(request):
+    """
+    Delete many patients: ``{"user_ids": [...]}``. Small cascades are deleted in chunks
+    and reported per id; large ones return 202 with a job id to poll.
+    """
+    return _bulk_delete(request, 'patient')
+
+
+@api_view(['POST'])
+def admin_doctor_bulk_delete(request):
+    return _bulk_delete(request, 'doctor')
+
+
+@api_view(['POST'])
+def admin_doctor_import(request):
+    """
+    Onboard many doctors at once. Accepts a multipart ``file`` (CSV with columns
+    name,email,password,specialization,phone,department, or JSON) or a JSON body
+    ``{"doctors": [...]}`` or a bare JSON list of doctors, in which case the
+    options come from the query string. Nothing is created unless every row is
+    valid; ``dry_run=true`` only validates.
+    """
+    if isinstance(request.data, list):
+        doctors, options = request.data, request.query_params
+    elif isinstance(request.data, dict):
+        doctors, options = request.data.get('doctors'), request.data
+    else:
+        return Response({'detail': 'Expected a JSON object or a list of doctors.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    upload = request.FILES.get('file')
+    try:
+        if upload is not None:
+            rows = parse_rows(upload.read(), upload.name)
+        else:
+            rows = parse_rows(doctors)
+    except RosterError as exc:
+        return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    dry_run = _parse_bool(options.get('dry_run', False))
+    send_emails = _parse_bool(options.get('send_emails', True))
+    result = import_doctors(rows, send_emails=send_emails, dry_run=dry_run)
+    if result['errors']:
+        return Response({'detail': 'Some rows are invalid; nothing was imported.', **result},
+                        status=status.HTTP_400_BAD_REQUEST)
+    return Response(result, status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED)
+
+
+@api_view(['GET'])
+def admin_job_detail(request, pk):
+    try:
+        job = BackgroundJob.objects.get(pk=pk)
+    except BackgroundJob.DoesNotExist:
+        return Response({'detail': 'Job not found.'}, status=status.HTTP_404_NOT_FOUND)
+    return Response({
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'attempts': job.attempts,
+        'result': job.result,
+        'error': job.error,
+        'created_at': job.created_at,
+        'finished_at': job.finished_at,
+    })
+
+
+def _inbox_queryset():
+    # Reverse one-to-one joins let get_user_phone read the profile without a query per row.
+    return AdminMessage.objects.select_related('user', 'user__patient_profile', 'user__doctor_profile')
+
+
 @api_view(['GET', 'POST'])
 def admin_messages(request):
+    """
+    GET: admin inbox. With cursor/limit/unread it returns a keyset page plus
+    ``unread_count``; without them, the legacy full array.
+    POST: message from a user to the admin.
+    """
     if request.method == 'GET':
-        messages = AdminMessage.objects.select_related('user').order_by('-created_at')
-        serializer = AdminMessageSerializer(messages, many=True)
-        return Response(serializer.data)
+        messages = _inbox_queryset()
+        unread = request.GET.get('unread', '').strip()
+        if unread:
+            messages = messages.filter(is_read=not _parse_bool(unread))
+
+        if not wants_page(request, ('unread',)):
+            serializer = AdminMessageSerializer(messages.order_by('-created_at'), many=True)
+            return Response(serializer.data)
+
+        try:
+            page, page_info = paginate_request(request, messages, ('-created_at', '-id'))
+        except CursorError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'results': AdminMessageSerializer(page, many=True).data,
+            'unread_count': int(get_counter(INBOX_UNREAD)),
+            **page_info,
+        })
 
     serializer = AdminMessageCreateSerializer(data=request.data)
     if not serializer.is_valid():
@@ -336,9 +659,97 @@ def admin_messages(request):
     except User.DoesNotExist:
         return Response({'detail': 'User not found.'}, status=status.HTTP_404_NOT_FOUND)
 
-    message = AdminMessage.objects.create(user=user, message=message_text)
+    with transaction.atomic():
+        message = AdminMessage.objects.create(user=user, message=message_text)
+        increment(INBOX_UNREAD)
     return Response(AdminMessageSerializer(message).data, status=status.HTTP_201_CREATED)
 
+
+def _set_message_read(message_id, is_read):
+    """Flip read state with a conditional UPDATE so the unread counter moves exactly once."""
+    now = timezone.now()
+    with transaction.atomic():
+        if is_read:
+            changed = AdminMessage.objects.filter(pk=message_id, is_read=False).update(is_read=True, read_at=now)
+            if changed:
+                decrement(INBOX_UNREAD, changed)
+        else:
+            changed = AdminMessage.objects.filter(pk=message_id, is_read=True).update(is_read=False, read_at=None)
+            if changed:
+                increment(INBOX_UNREAD, changed)
+    return changed
+
+
+@api_view(['PATCH'])
+def admin_message_read(request, pk):
+    """Mark one inbox message read (default) or unread via ``is_read``."""
+    is_read = _parse_bool(request.data.get('is_read', True))
+    if not _set_message_read(pk, is_read) and not AdminMessage.objects.filter(pk=pk).exists():
+        return Response({'detail': 'Message not found.'}, status=status.HTTP_404_NOT_FOUND)
+    return Response({'id': pk, 'is_read': is_read, 'unread_count': int(get_counter(INBOX_UNREAD))})
+
+
+@api_view(['POST'])
+def admin_messages_read_all(request):
+    with transaction.atomic():
+        changed = AdminMessage.objects.filter(is_read=False).update(is_read=True, read_at=timezone.now())
+        decrement(INBOX_UNREAD, changed)
+    return Response({'marked_read': changed, 'unread_count': int(get_counter(INBOX_UNREAD))})
+
+
+@api_view(['GET', 'POST'])
+def admin_message_replies(request, pk):
+    """
+    GET: one keyset page of replies on a thread (a single query).
+    POST: admin reply; marks the thread read.
+    """
+    if request.method == 'GET':
+        replies = AdminMessageReply.objects.filter(thread_id=pk).select_related('author')
+        try:
+            page, page_info = paginate_request(request, replies, ('created_at', 'id'))
+        except CursorError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'results': AdminMessageReplySerializer(page, many=True).data, **page_info})
+
+    identity = resolve_identity(request, request.data.get('admin_email'))
+    if not identity or identity.role != 'admin':
+        return Response({'detail': 'Admin login is required to reply.'}, status=status.HTTP_403_FORBIDDEN)
+
+    serializer = AdminMessageReplyCreateSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    now = timezone.now()
+    with transaction.atomic():
+        if not AdminMessage.objects.filter(pk=pk).update(reply_count=F('reply_count') + 1, last_reply_at=now):
+            return Response({'detail': 'Message not found.'}, status=status.HTTP_404_NOT_FOUND)
+        reply = AdminMessageReply.objects.create(
+            thread_id=pk,
+            author_id=identity.user_id,
+            message=serializer.validated_data['message'],
+        )
+        _set_message_read(pk, True)
+    return Response(AdminMessageReplySerializer(reply).data, status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET'])
+def my_messages(request):
+    """The caller's own messages to the admin, with replies (two queries per page)."""
+    identity = resolve_identity(request, request.GET.get('email'))
+    if not identity:
+        return Response({'detail': 'Email is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    messages = (
+        _inbox_queryset()
+        .filter(user_id=identity.user_id)
+        .prefetch_related(Prefetch('replies', queryset=AdminMessageReply.objects.select_related('author').order_by('created_at', 'id')))
+    )
+    try:
+        page, page_info = paginate_request(request, messages, ('-created_at', '-id'))
+    except CursorError as e:
+        return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({'results': AdminMessageThreadSerializer(page, many=True).data, **page_info})
+
 @api_view(['POST'])
 def test_email(request):
     """Debug endpoint: send a test email to verify SMTP config works."""
@@ -387,71 +798,32 @@ def _safe_email_debug():
         "DEFAULT_FROM_EMAIL": getattr(settings, "DEFAULT_FROM_EMAIL", None),
     }
 
-def _send_doctor_welcome_email(*, doctor_name: str, to_email: str, raw_password: str) -> None:
+def _send_doctor_welcome_email(*, doctor_name: str, user) -> None:
     """
-    Sends email from the configured SMTP sender (EMAIL_HOST_USER).
-    Raises exception if configuration is missing or send fails.
+    Queues the welcome email in the outbox for the configured SMTP sender (EMAIL_HOST_USER).
+    Raises exception if configuration is missing; delivery happens in send_queued_emails.
     """
     from django.conf import settings
-    from django.core.mail import EmailMessage
-
-    # Prefer DEFAULT_FROM_EMAIL if you configured it, otherwise fall back to EMAIL_HOST_USER
-    from_email = getattr(settings, 'DEFAULT_FROM_EMAIL', None) or getattr(settings, 'EMAIL_HOST_USER', None)
 
-    # SMTP auth still typically depends on EMAIL_HOST_USER being present in settings
-    smtp_user = getattr(settings, 'EMAIL_HOST_USER', None)
-    smtp_password = getattr(settings, 'EMAIL_HOST_PASSWORD', None)
-
-    if not smtp_user:
-        raise ValueError(
-            "EMAIL_HOST_USER is not configured (SMTP username). "
-            "Check that your .env file exists and load_dotenv() can find it."
-        )
-
-    if not smtp_password:
-        raise ValueError(
-            "EMAIL_HOST_PASSWORD is not configured (SMTP app password). "
-            "Check that your .env file exists and load_dotenv() can find it."
-        )
-
-    if not from_email:
-        raise ValueError("DEFAULT_FROM_EMAIL/EMAIL_HOST_USER is not configured. Set a sender email.")
+    from_email = smtp_sender()
 
     logger.info(
-        "Attempting to send doctor welcome email: host=%s, port=%s, tls=%s, ssl=%s, user=%s, from=%s, to=%s",
+        "Queueing doctor welcome email: host=%s, port=%s, tls=%s, ssl=%s, user=%s, from=%s, to=%s",
         getattr(settings, 'EMAIL_HOST', None),
         getattr(settings, 'EMAIL_PORT', None),
         getattr(settings, 'EMAIL_USE_TLS', None),
         getattr(settings, 'EMAIL_USE_SSL', None),
-        smtp_user,
+        getattr(settings, 'EMAIL_HOST_USER', None),
         from_email,
-        to_email,
-    )
-
-    frontend_url = getattr(settings, 'FRONTEND_URL', 'http://localhost:5173')
-    login_url = f"{frontend_url.rstrip('/')}/role/login"
-
-    subject = "Welcome – Smart Telemedicine System (Doctor Account Created)"
-    message = (
-        f"Hello Dr. {doctor_name},\n\n"
-        "Your doctor account has been created in the Smart Telemedicine and Online Medicine Delivery System.\n\n"
-        "Login details:\n"
-        f"Email: {to_email}\n"
-        f"Password: {raw_password}\n\n"
-        f"Login URL: {login_url}\n\n"
-        "Regards,\n"
-        "Admin Team\n"
-        "Smart Telemedicine System"
+        user.email,
     )
 
-    email = EmailMessage(
+    subject, message = doctor_welcome_message(doctor_name=doctor_name, user=user)
+    queued = enqueue_email(
         subject=subject,
         body=message,
         from_email=from_email,
-        to=[to_email],
+        to=[user.email],
         reply_to=[from_email],
     )
-    sent = email.send(fail_silently=False)
-    logger.info("Email send result: %s", sent)
-    if sent != 1:
-        raise RuntimeError(f"Email backend returned sent={sent} (expected 1).")
+    logger.info("Doctor welcome email queued as outbox message %s", queued.id)
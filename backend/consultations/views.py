@@ -3,27 +3,35 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
 from doctors.models import Appointment
+from telemedicine.pagination import CursorError, paginate_request, wants_page
 from .serializers import AppointmentSerializer
 
 
+def _appointment_row(appointment):
+	return {
+		'id': appointment.id,
+		'patient_name': appointment.patient.full_name,
+		'doctor_name': appointment.doctor.full_name,
+		'department': appointment.department.name if appointment.department else '',
+		'appointment_date': appointment.appointment_date,
+		'appointment_time': appointment.appointment_time,
+		'status': appointment.status,
+		'created_at': appointment.created_at,
+	}
+
+
 @api_view(['GET', 'POST'])
 def appointment_list(request):
 	if request.method == 'GET':
-		appointments = Appointment.objects.select_related('patient', 'doctor', 'department').order_by('-created_at')
-		data = [
-			{
-				'id': appointment.id,
-				'patient_name': appointment.patient.full_name,
-				'doctor_name': appointment.doctor.full_name,
-				'department': appointment.department.name if appointment.department else '',
-				'appointment_date': appointment.appointment_date,
-				'appointment_time': appointment.appointment_time,
-				'status': appointment.status,
-				'created_at': appointment.created_at,
-			}
-			for appointment in appointments
-		]
-		return Response(data)
+		appointments = Appointment.objects.select_related('patient', 'doctor', 'department')
+		if not wants_page(request):
+			return Response([_appointment_row(appointment) for appointment in appointments.order_by('-created_at')])
+
+		try:
+			page, page_info = paginate_request(request, appointments, ('-created_at', '-id'))
+		except CursorError as e:
+			return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+		return Response({'results': [_appointment_row(appointment) for appointment in page], **page_info})
 
 	serializer = AppointmentSerializer(data=request.data)
 	if serializer.is_valid():
@@ -1,9 +1,16 @@
 from django.contrib import admin
 
-from .models import DoctorProfile
+from .models import DoctorAvailability, DoctorProfile
 
 
 @admin.register(DoctorProfile)
 class DoctorProfileAdmin(admin.ModelAdmin):
     list_display = ('full_name', 'specialization', 'phone')
     search_fields = ('full_name', 'specialization', 'phone')
+
+
+@admin.register(DoctorAvailability)
+class DoctorAvailabilityAdmin(admin.ModelAdmin):
+    list_display = ('doctor', 'weekday', 'start_time', 'end_time', 'slot_minutes')
+    list_filter = ('weekday',)
+    raw_id_fields = ('doctor',)
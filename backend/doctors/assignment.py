@@ -0,0 +1,99 @@
+"""
+Automatic doctor assignment for consultation requests.
+
+Each doctor's number of pending requests is kept on
+``DoctorProfile.pending_requests`` by ``doctors.signals`` with ``F()``
+updates, so choosing the least-loaded doctor is a read of the
+``doctor_queue_idx`` index rather than a COUNT over consultation requests.
+``claim_doctor`` takes the queue place with a compare-and-set update; when a
+concurrent request claims the same doctor first, it re-reads and tries
+again, so a burst of requests spreads across the department.
+"""
+
+import datetime
+
+from django.conf import settings
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .models import ConsultationRequest, DoctorProfile
+from .slots import free_slots
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _candidates(department):
+    """The least-loaded active doctors in ``department`` as ``[(id, pending_requests)]``."""
+    return list(
+        DoctorProfile.objects.filter(department=department, user__is_active=True)
+        .order_by('pending_requests', 'id')
+        .values_list('id', 'pending_requests')[:_setting('AUTO_ASSIGN_CANDIDATES', 10)]
+    )
+
+
+def _choose(candidates):
+    """
+    Pick from ``candidates`` (already ordered by load). With AUTO_ASSIGN_SLOT_DAYS
+    set, a doctor's load is divided by their free slots in that many days, so a
+    doctor with open time is preferred over an equally loaded one who is booked up.
+    """
+    days = _setting('AUTO_ASSIGN_SLOT_DAYS', 0)
+    if not days or len(candidates) == 1:
+        return candidates[0]
+
+    today = timezone.localdate()
+    slots = free_slots([doctor_id for doctor_id, _ in candidates], today, today + datetime.timedelta(days=days - 1))
+
+    def load(candidate):
+        doctor_id, pending = candidate
+        if doctor_id not in slots:
+            # No availability defined: the doctor takes requests at any time.
+            return pending + 1
+        return (pending + 1) / (len(slots[doctor_id]) + 1)
+
+    return min(candidates, key=load)
+
+
+def claim_doctor(department):
+    """
+    Reserve a pending-request place on the least-loaded active doctor of
+    ``department`` and return that doctor's id, or ``None`` if there is none.
+
+    The caller must save the new request with ``_queue_claimed = True`` so the
+    signal handler does not count it a second time.
+    """
+    for _ in range(_setting('AUTO_ASSIGN_RETRIES', 5)):
+        candidates = _candidates(department)
+        if not candidates:
+            return None
+        doctor_id, pending = _choose(candidates)
+        claimed = DoctorProfile.objects.filter(pk=doctor_id, pending_requests=pending).update(
+            pending_requests=F('pending_requests') + 1,
+        )
+        if claimed:
+            return doctor_id
+
+    # Heavy contention: take the last choice without the compare-and-set.
+    DoctorProfile.objects.filter(pk=doctor_id).update(pending_requests=F('pending_requests') + 1)
+    return doctor_id
+
+
+def rebuild_pending_counts():
+    """Recompute every doctor's ``pending_requests``. Returns the number of doctors corrected."""
+    actual = dict(
+        ConsultationRequest.objects.filter(status='pending')
+        .values('doctor_id')
+        .annotate(pending=Count('id'))
+        .order_by()
+        .values_list('doctor_id', 'pending')
+    )
+    corrected = 0
+    for doctor_id, stored in DoctorProfile.objects.values_list('id', 'pending_requests').iterator():
+        if actual.get(doctor_id, 0) != stored:
+            # Conditional so a concurrent F() update is not overwritten with a stale total.
+            corrected += DoctorProfile.objects.filter(pk=doctor_id, pending_requests=stored).update(
+                pending_requests=actual.get(doctor_id, 0),
+            )
+    return corrected
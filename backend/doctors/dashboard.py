@@ -0,0 +1,70 @@
+"""
+The doctor dashboard in three bounded queries.
+
+The counts come from one grouped query on the doctor's row. The pending
+count is the maintained ``pending_requests`` column. The appointment counts
+are conditional ``COUNT(... FILTER ...)`` aggregates over the doctor's
+appointments. The next appointments and the latest prescriptions are
+``LIMIT`` queries on the (doctor, date, time) and (doctor, created_at)
+indexes. The cost depends on the page size, not on how long the doctor's
+history is.
+"""
+
+from django.conf import settings
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import Appointment, DoctorProfile, Prescription
+
+
+def dashboard_limit(raw):
+    """Items per list for a ``limit`` parameter; raises ValueError if it is not an integer."""
+    limit = int(raw or 0) or settings.DOCTOR_DASHBOARD_ITEMS
+    return max(1, min(limit, settings.DOCTOR_DASHBOARD_MAX_ITEMS))
+
+
+def dashboard_counts(doctor_id, today):
+    """``{'pending_requests', 'today_appointments', 'upcoming_appointments'}``, or None for an unknown doctor."""
+    confirmed = Q(doctor_appointments__status='confirmed')
+    return (
+        DoctorProfile.objects.filter(pk=doctor_id)
+        .annotate(
+            today_appointments=Count('doctor_appointments', filter=confirmed & Q(doctor_appointments__appointment_date=today)),
+            upcoming_appointments=Count('doctor_appointments', filter=confirmed & Q(doctor_appointments__appointment_date__gt=today)),
+        )
+        .values('pending_requests', 'today_appointments', 'upcoming_appointments')
+        .first()
+    )
+
+
+def next_appointments(doctor_id, now, limit):
+    """The doctor's next ``limit`` confirmed appointments from ``now``, soonest first."""
+    today = now.date()
+    return (
+        Appointment.objects.filter(doctor_id=doctor_id, status='confirmed')
+        .filter(Q(appointment_date__gt=today) | Q(appointment_date=today, appointment_time__gte=now.time()))
+        .select_related('patient', 'department')
+        .order_by('appointment_date', 'appointment_time', 'id')[:limit]
+    )
+
+
+def recent_prescriptions(doctor_id, limit):
+    """The doctor's latest ``limit`` prescriptions, newest first."""
+    return (
+        Prescription.objects.filter(doctor_id=doctor_id)
+        .select_related('patient')
+        .order_by('-created_at', '-id')[:limit]
+    )
+
+
+def doctor_dashboard(doctor_id, limit):
+    """Counts, next appointments and recent prescriptions, or None for an unknown doctor."""
+    now = timezone.localtime()
+    counts = dashboard_counts(doctor_id, now.date())
+    if counts is None:
+        return None
+    return {
+        'counts': counts,
+        'next_appointments': next_appointments(doctor_id, now, limit),
+        'recent_prescriptions': recent_prescriptions(doctor_id, limit),
+    }
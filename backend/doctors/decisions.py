@@ -0,0 +1,150 @@
+"""
+Approving and rejecting consultation requests.
+
+A request only moves out of ``pending`` through a conditional ``UPDATE ...
+WHERE status = 'pending'``. A repeated click, a client retry or a
+concurrent doctor therefore finds the request already processed instead of
+creating a second appointment. ``decide_requests`` handles any number of
+requests in one transaction: one locking read, one UPDATE, one
+``bulk_create`` for the appointments. Because update() and bulk_create skip
+the model signals, it adjusts the dashboard, queue and patient summary
+counters itself.
+"""
+
+from collections import Counter as Tally
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from accounts.counters import APPOINTMENTS, PENDING_CONSULTATIONS, decrement, increment
+from patients.summary import adjust as adjust_summary
+from telemedicine.events import doctor_channel, patient_channel, publish_on_commit
+
+from .models import Appointment, ConsultationRequest, DoctorProfile
+from .signals import adjust_pending
+from .slots import SlotTaken, booked_slots
+
+APPROVE = 'approve'
+REJECT = 'reject'
+ACTIONS = {APPROVE: 'approved', REJECT: 'rejected'}
+
+
+def appointment_slot(consultation, appointment_date=None, appointment_time=None):
+    """
+    The ``(date, time)`` to book for ``consultation``: the explicit values, else the
+    patient's preferred date/time, else when the request was made.
+    """
+    requested_at = consultation.requested_at or timezone.now()
+    return (
+        appointment_date or consultation.preferred_date or requested_at.date(),
+        appointment_time or consultation.preferred_time or requested_at.time(),
+    )
+
+
+def decision_channels(consultation):
+    """Event channels told about a decision: the patient's and the doctor's other sessions."""
+    return [patient_channel(consultation.patient_id), doctor_channel(consultation.doctor_id)]
+
+
+def parse_request_ids(raw):
+    """Validate an ``ids`` list; returns (ids, error message)."""
+    max_ids = getattr(settings, 'BULK_DECISION_MAX_IDS', 500)
+    if not isinstance(raw, list) or not raw:
+        return None, 'ids must be a non-empty list.'
+    if len(raw) > max_ids:
+        return None, f'At most {max_ids} ids per request.'
+    try:
+        return list(dict.fromkeys(int(value) for value in raw)), None
+    except (TypeError, ValueError):
+        return None, 'ids must contain integers.'
+
+
+def _transition(ids, new_status):
+    """Conditionally move ``ids`` out of pending. Returns how many rows changed."""
+    if not ids:
+        return 0
+    return ConsultationRequest.objects.filter(id__in=ids, status='pending').update(status=new_status)
+
+
+def decide_requests(doctor_id, ids, action):
+    """
+    Approve or reject the doctor's pending requests among ``ids``. Returns a dict
+    of id lists: ``approved``/``rejected`` (changed now), ``already_processed``
+    (``[{'id', 'status'}]``), ``conflicts`` (approvals whose slot is taken, left
+    pending) and ``not_found``.
+    """
+    new_status = ACTIONS[action]
+    result = {new_status: [], 'already_processed': [], 'conflicts': [], 'not_found': []}
+
+    with transaction.atomic():
+        # Lock the rows so the UPDATE below changes exactly the ones read here.
+        rows = {
+            row.id: row
+            for row in ConsultationRequest.objects.select_for_update()
+            .filter(id__in=ids, doctor_id=doctor_id)
+            .only('id', 'patient_id', 'doctor_id', 'status', 'requested_at', 'preferred_date', 'preferred_time')
+        }
+        pending = []
+        for request_id in ids:
+            row = rows.get(request_id)
+            if row is None:
+                result['not_found'].append(request_id)
+            elif row.status != 'pending':
+                result['already_processed'].append({'id': request_id, 'status': row.status})
+            else:
+                pending.append(row)
+
+        appointments = []
+        if action == APPROVE and pending:
+            slots = {row.id: appointment_slot(row) for row in pending}
+            dates = [day for day, _ in slots.values()]
+            taken = {(day, time) for _, day, time in booked_slots([doctor_id], min(dates), max(dates))}
+            accepted = []
+            for row in pending:
+                if slots[row.id] in taken:
+                    day, time = slots[row.id]
+                    result['conflicts'].append({'id': row.id, 'date': day.isoformat(), 'time': time.strftime('%H:%M')})
+                    continue
+                taken.add(slots[row.id])
+                accepted.append(row)
+            pending = accepted
+
+            department_id = DoctorProfile.objects.filter(pk=doctor_id).values_list('department_id', flat=True).first()
+            appointments = [
+                Appointment(
+                    patient_id=row.patient_id,
+                    doctor_id=doctor_id,
+                    department_id=department_id,
+                    appointment_date=slots[row.id][0],
+                    appointment_time=slots[row.id][1],
+                    status='confirmed',
+                )
+                for row in pending
+            ]
+
+        changed = _transition([row.id for row in pending], new_status)
+        if appointments:
+            try:
+                with transaction.atomic():
+                    Appointment.objects.bulk_create(appointments)
+            except IntegrityError as exc:
+                # A slot was booked by another request after booked_slots() read them.
+                raise SlotTaken('A requested slot was booked meanwhile; please retry.') from exc
+
+        # update() and bulk_create() skip the signal handlers that keep these counters.
+        decrement(PENDING_CONSULTATIONS, changed)
+        adjust_pending(doctor_id, -changed)
+        if appointments:
+            increment(APPOINTMENTS, len(appointments))
+            for patient_id, booked in Tally(row.patient_id for row in pending).items():
+                adjust_summary(patient_id, confirmed_appointments=booked)
+
+        for row in pending:
+            data = {'id': row.id, 'status': new_status}
+            if action == APPROVE:
+                data.update(appointment_date=slots[row.id][0], appointment_time=slots[row.id][1])
+            publish_on_commit(decision_channels(row), f'consultation.{new_status}', data)
+
+    result[new_status] = [row.id for row in pending]
+    return result
@@ -0,0 +1,161 @@
+"""
+Versioned snapshot of the public doctor directory.
+
+Departments (with doctor counts) and doctor cards change rarely and are read
+on every page, so they are built once into a snapshot held in process memory.
+The ``directory_version`` counter is bumped in the same transaction as any
+change to a department or doctor (``doctors.signals`` and the bulk paths call
+``bump_version``). A request costs one primary-key read of the counter, and
+the snapshot is rebuilt only when the version moved. The version doubles as
+the ETag. With DIRECTORY_STATIC_ROOT set, each new version is also written
+out as JSON files by a background job so a CDN can serve them.
+"""
+
+import json
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from accounts.counters import DIRECTORY_VERSION, get_counter, increment
+
+from .models import Department, DoctorProfile
+from .serializers import DoctorProfileSerializer
+
+logger = logging.getLogger(__name__)
+
+STATIC_EXPORT_JOB = 'doctors.directory.write_static_snapshot'
+
+_lock = threading.Lock()
+_snapshot = None
+
+
+def bump_version():
+    """Mark the directory as changed; call inside the transaction that changes it."""
+    increment(DIRECTORY_VERSION)
+    if getattr(settings, 'DIRECTORY_STATIC_ROOT', None):
+        from accounts.jobs import enqueue_job
+
+        transaction.on_commit(lambda: enqueue_job(STATIC_EXPORT_JOB))
+
+
+def current_version():
+    return int(get_counter(DIRECTORY_VERSION))
+
+
+def _card(profile):
+    return {
+        'id': profile['id'],
+        'full_name': profile['full_name'],
+        'specialization': profile['specialization'],
+        'department': profile['department'],
+        'department_name': profile['department_name'],
+        'experience_years': profile['experience_years'],
+        'phone': profile['phone'],
+        'profile_image': profile['profile_image'],
+        'profile_image_thumbnail': profile['profile_image_thumbnail'],
+    }
+
+
+def build_snapshot(version):
+    """Build the directory for ``version`` with two queries."""
+    departments = [
+        {'id': dept.id, 'name': dept.name, 'doctor_count': dept.doctor_count}
+        for dept in Department.objects.annotate(doctor_count=Count('doctors')).order_by('name')
+    ]
+    profiles = DoctorProfileSerializer(
+        DoctorProfile.objects.select_related('user', 'department').order_by('full_name', 'id'),
+        many=True,
+    ).data
+    profiles = [dict(profile) for profile in profiles]
+    cards = [_card(profile) for profile in profiles]
+
+    by_department = {}
+    for card in cards:
+        by_department.setdefault(card['department'], []).append(card)
+
+    return {
+        'version': version,
+        'etag': f'"directory-{version}"',
+        'generated_at': timezone.now(),
+        'departments': departments,
+        'doctors': cards,
+        'profiles': profiles,
+        'counts': {'departments': len(departments), 'doctors': len(cards)},
+        'by_department': by_department,
+        'department_ids': {dept['name'].casefold(): dept['id'] for dept in departments},
+    }
+
+
+def get_snapshot():
+    """The snapshot for the current version, rebuilt at most once per version per process."""
+    global _snapshot
+    version = current_version()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot['version'] == version:
+        return snapshot
+    with _lock:
+        if _snapshot is None or _snapshot['version'] != version:
+            _snapshot = build_snapshot(version)
+        return _snapshot
+
+
+def public_directory(snapshot):
+    """The part of ``snapshot`` published by the directory endpoint and static export."""
+    return {
+        'version': snapshot['version'],
+        'generated_at': snapshot['generated_at'],
+        'departments': snapshot['departments'],
+        'doctors': snapshot['doctors'],
+        'counts': snapshot['counts'],
+    }
+
+
+def department_doctors(snapshot, department_id=None, department_name=None):
+    """Doctor cards for a department looked up by id and/or case-insensitive name."""
+    if department_name:
+        name_id = snapshot['department_ids'].get(department_name.casefold())
+        if name_id is None or (department_id and str(name_id) != str(department_id)):
+            return []
+        department_id = name_id
+    try:
+        department_id = int(department_id)
+    except (TypeError, ValueError):
+        return []
+    return snapshot['by_department'].get(department_id, [])
+
+
+def _write_json(path, data):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as fileobj:
+        json.dump(data, fileobj, cls=DjangoJSONEncoder, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def write_static_snapshot(payload=None, root=None):
+    """
+    Background job: write ``directory.json`` plus per-department files under
+    DIRECTORY_STATIC_ROOT. Files are replaced atomically, and
+    ``directory-v<version>.json`` is kept so long-cached URLs stay valid.
+    """
+    root = root or getattr(settings, 'DIRECTORY_STATIC_ROOT', None)
+    if not root:
+        return {'skipped': 'DIRECTORY_STATIC_ROOT is not set'}
+    snapshot = get_snapshot()
+    os.makedirs(os.path.join(root, 'departments'), exist_ok=True)
+
+    directory = public_directory(snapshot)
+    _write_json(os.path.join(root, f"directory-v{snapshot['version']}.json"), directory)
+    _write_json(os.path.join(root, 'directory.json'), directory)
+    for dept in snapshot['departments']:
+        _write_json(
+            os.path.join(root, 'departments', f"{dept['id']}.json"),
+            snapshot['by_department'].get(dept['id'], []),
+        )
+    logger.info("Wrote directory snapshot v%s to %s", snapshot['version'], root)
+    return {'version': snapshot['version'], 'root': str(root)}
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from doctors.directory import write_static_snapshot
+
+
+class Command(BaseCommand):
+    help = "Write the doctor directory snapshot as static JSON files (default: DIRECTORY_STATIC_ROOT)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Directory to write to instead of DIRECTORY_STATIC_ROOT.')
+
+    def handle(self, *args, **options):
+        root = options['output'] or getattr(settings, 'DIRECTORY_STATIC_ROOT', None)
+        if not root:
+            raise CommandError('Pass --output or set DIRECTORY_STATIC_ROOT.')
+        result = write_static_snapshot(root=root)
+        self.stdout.write(self.style.SUCCESS(f"Directory v{result['version']} written to {result['root']}."))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from accounts.jobs import enqueue_job
+from doctors.models import Prescription
+from doctors.prescription_pdf import RENDER_JOB
+
+
+class Command(BaseCommand):
+    help = "Queue standard PDFs for prescriptions that do not have one yet (e.g. those issued before rendering existed)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Queue every prescription; unchanged ones are skipped by the job.')
+
+    def handle(self, *args, **options):
+        prescriptions = Prescription.objects.order_by('id')
+        if not options['all']:
+            prescriptions = prescriptions.filter(generated_pdf__isnull=True) | prescriptions.filter(generated_pdf='')
+        queued = 0
+        for pk in prescriptions.values_list('id', flat=True).iterator():
+            enqueue_job(RENDER_JOB, {'pk': pk})
+            queued += 1
+        self.stdout.write(self.style.SUCCESS(f"Queued {queued} prescription PDFs."))
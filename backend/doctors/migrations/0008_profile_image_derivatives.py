@@ -0,0 +1,23 @@
+# Generated by Django 5.2.11 on 2026-10-17 10:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0007_directory_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='doctorprofile',
+            name='profile_image_webp',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='doctor_profiles/derived/'),
+        ),
+        migrations.AddField(
+            model_name='doctorprofile',
+            name='profile_thumbnail',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='doctor_profiles/derived/'),
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.11 on 2026-10-17 10:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def release_duplicate_slots(apps, schema_editor):
+    """
+    Rejected appointments stop holding their slot. Where a slot was double-booked
+    before the constraint existed, the earliest booking keeps it and the others
+    stay as they are but no longer hold the slot.
+    """
+    Appointment = apps.get_model('doctors', 'Appointment')
+    Appointment.objects.filter(status='rejected').update(holds_slot=None)
+
+    duplicates = (
+        Appointment.objects.filter(holds_slot=True)
+        .values('doctor_id', 'appointment_date', 'appointment_time')
+        .annotate(bookings=Count('id'))
+        .filter(bookings__gt=1)
+        .order_by()
+    )
+    for slot in duplicates.iterator():
+        ids = list(
+            Appointment.objects.filter(
+                doctor_id=slot['doctor_id'],
+                appointment_date=slot['appointment_date'],
+                appointment_time=slot['appointment_time'],
+                holds_slot=True,
+            ).order_by('created_at', 'id').values_list('id', flat=True)
+        )
+        Appointment.objects.filter(id__in=ids[1:]).update(holds_slot=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0008_profile_image_derivatives'),
+        ('patients', '0006_patient_search_grams'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DoctorAvailability',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekday', models.PositiveSmallIntegerField(choices=[(0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'), (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday')])),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('slot_minutes', models.PositiveSmallIntegerField(default=30)),
+            ],
+            options={
+                'ordering': ['weekday', 'start_time'],
+            },
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='holds_slot',
+            field=models.BooleanField(default=True, editable=False, null=True),
+        ),
+        migrations.RunPython(release_duplicate_slots, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.UniqueConstraint(fields=('doctor', 'appointment_date', 'appointment_time', 'holds_slot'), name='appointment_slot_unique'),
+        ),
+        migrations.AddField(
+            model_name='doctoravailability',
+            name='doctor',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='availability', to='doctors.doctorprofile'),
+        ),
+        migrations.AddIndex(
+            model_name='doctoravailability',
+            index=models.Index(fields=['doctor', 'weekday'], name='availability_doctor_day_idx'),
+        ),
+    ]
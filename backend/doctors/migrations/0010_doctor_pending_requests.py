@@ -0,0 +1,39 @@
+# Generated by Django 5.2.11 on 2026-10-17 10:54
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_pending_requests(apps, schema_editor):
+    DoctorProfile = apps.get_model('doctors', 'DoctorProfile')
+    ConsultationRequest = apps.get_model('doctors', 'ConsultationRequest')
+    pending = (
+        ConsultationRequest.objects.filter(status='pending')
+        .values('doctor_id')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    for row in pending.iterator():
+        DoctorProfile.objects.filter(pk=row['doctor_id']).update(pending_requests=row['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0009_appointment_slots'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='doctorprofile',
+            name='pending_requests',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_pending_requests, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='doctorprofile',
+            index=models.Index(fields=['department', 'pending_requests', 'id'], name='doctor_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.11 on 2026-10-17 10:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0010_doctor_pending_requests'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='prescription',
+            name='generated_pdf',
+            field=models.FileField(blank=True, editable=False, null=True, upload_to='prescriptions/generated/'),
+        ),
+        migrations.AddField(
+            model_name='prescription',
+            name='pdf_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+    ]
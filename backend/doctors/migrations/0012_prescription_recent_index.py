@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-17 11:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0011_prescription_generated_pdf'),
+        ('patients', '0006_patient_search_grams'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='prescription',
+            index=models.Index(fields=['doctor', 'created_at'], name='prescription_doctor_recent_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-17 11:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctors', '0012_prescription_recent_index'),
+        ('patients', '0006_patient_search_grams'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['created_at', 'id'], name='appointment_created_idx'),
+        ),
+    ]
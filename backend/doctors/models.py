@@ -1,4 +1,5 @@
 from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import models
 
 from patients.models import PatientProfile
@@ -23,11 +24,34 @@ class DoctorProfile(models.Model):
     experience_years = models.PositiveIntegerField(default=0)
     clinic_address = models.TextField(blank=True)
     profile_image = models.ImageField(upload_to='doctor_profiles/', null=True, blank=True)
+    # Derived copies written by telemedicine.images.build_profile_derivatives.
+    profile_thumbnail = models.ImageField(upload_to='doctor_profiles/derived/', null=True, blank=True, editable=False)
+    profile_image_webp = models.ImageField(upload_to='doctor_profiles/derived/', null=True, blank=True, editable=False)
+    # Pending consultation requests, kept by doctors.signals with F() updates (see doctors.assignment).
+    pending_requests = models.IntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['full_name', 'id'], name='doctor_name_idx'),
+            models.Index(fields=['department', 'pending_requests', 'id'], name='doctor_queue_idx'),
+            models.Index(fields=['created_at', 'id'], name='doctor_created_idx'),
+            models.Index(fields=['phone'], name='doctor_phone_idx'),
+        ]
+
     def __str__(self):
         return self.full_name
 
+    def save(self, *args, **kwargs):
+        # pending_requests only changes through F() updates; a full save would write back this
+        # instance's stale copy and undo concurrent increments.
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'pending_requests'
+            ]
+        super().save(*args, **kwargs)
+
 
 class ConsultationRequest(models.Model):
     STATUS_CHOICES = [
@@ -75,12 +99,70 @@ class Appointment(models.Model):
     appointment_date = models.DateField()
     appointment_time = models.TimeField()
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='confirmed')
+    # True while the appointment occupies its slot, NULL once rejected. MySQL has no partial
+    # unique indexes but allows repeated NULLs, so this lets a rejected slot be booked again.
+    holds_slot = models.BooleanField(null=True, default=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            # Also serves the (doctor, appointment_date, appointment_time) lookups of doctors.slots.
+            models.UniqueConstraint(
+                fields=['doctor', 'appointment_date', 'appointment_time', 'holds_slot'],
+                name='appointment_slot_unique',
+            ),
+        ]
+        indexes = [
+            # Keyset pages of the appointment list (consultations.views.appointment_list).
+            models.Index(fields=['created_at', 'id'], name='appointment_created_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.holds_slot = None if self.status == 'rejected' else True
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'status' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'holds_slot'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.patient.full_name} with {self.doctor.full_name}"
 
 
+class DoctorAvailability(models.Model):
+    """A recurring weekly window in which a doctor takes appointments, split into fixed-length slots."""
+
+    WEEKDAY_CHOICES = [
+        (0, 'Monday'),
+        (1, 'Tuesday'),
+        (2, 'Wednesday'),
+        (3, 'Thursday'),
+        (4, 'Friday'),
+        (5, 'Saturday'),
+        (6, 'Sunday'),
+    ]
+
+    doctor = models.ForeignKey(DoctorProfile, on_delete=models.CASCADE, related_name='availability', db_index=False)
+    weekday = models.PositiveSmallIntegerField(choices=WEEKDAY_CHOICES)
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    slot_minutes = models.PositiveSmallIntegerField(default=30)
+
+    class Meta:
+        ordering = ['weekday', 'start_time']
+        indexes = [
+            models.Index(fields=['doctor', 'weekday'], name='availability_doctor_day_idx'),
+        ]
+
+    def clean(self):
+        if self.start_time >= self.end_time:
+            raise ValidationError('start_time must be before end_time.')
+        if not self.slot_minutes:
+            raise ValidationError('slot_minutes must be positive.')
+
+    def __str__(self):
+        return f"{self.doctor.full_name} {self.get_weekday_display()} {self.start_time}-{self.end_time}"
+
+
 class Prescription(models.Model):
     patient = models.ForeignKey(PatientProfile, on_delete=models.CASCADE, related_name='prescriptions')
     doctor = models.ForeignKey(DoctorProfile, on_delete=models.CASCADE, related_name='prescriptions')
@@ -88,7 +170,16 @@ class Prescription(models.Model):
     medicines = models.TextField()
     notes = models.TextField(blank=True)
     pdf = models.FileField(upload_to='prescriptions/', null=True, blank=True)
+    # Standard PDF rendered by doctors.prescription_pdf, stored under the hash of its content.
+    generated_pdf = models.FileField(upload_to='prescriptions/generated/', null=True, blank=True, editable=False)
+    pdf_hash = models.CharField(max_length=64, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # A doctor's latest prescriptions without sorting their whole history.
+            models.Index(fields=['doctor', 'created_at'], name='prescription_doctor_recent_idx'),
+        ]
+
     def __str__(self):
         return f"Prescription for {self.patient.full_name}"
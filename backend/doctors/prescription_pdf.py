@@ -0,0 +1,231 @@
+"""
+Standard prescription PDFs rendered by the backend.
+
+``upload_prescription`` queues ``render_prescription_pdf`` on the background
+job worker in the same transaction that creates the prescription, so the
+doctor's request never waits for rendering. The job renders the PDF on a
+process pool, because layout is CPU bound and would otherwise hold the GIL.
+The file is stored under the SHA-256 of its inputs, so re-rendering
+unchanged content reuses the stored file. Every PDF carries a verification
+code, an HMAC of the prescription id and content hash. ``verify_code``
+checks it against the hash stored with the generated PDF.
+
+The PDF writer is deliberately minimal: text in the standard Helvetica
+fonts (nothing embedded) and rules, A4, multiple pages when needed.
+"""
+
+import hashlib
+import json
+import logging
+import textwrap
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core import signing
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils.crypto import constant_time_compare
+
+from .models import Prescription
+
+logger = logging.getLogger(__name__)
+
+RENDER_JOB = 'doctors.prescription_pdf.render_prescription_pdf'
+SIGNATURE_SALT = 'doctors.prescription-pdf'
+STORAGE_DIR = 'prescriptions/generated'
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+MARGIN = 50
+WRAP_COLUMNS = 92  # Helvetica 10pt across the text width
+
+
+# --- content ---------------------------------------------------------------
+
+def prescription_content(prescription):
+    """The fields printed on the PDF (``prescription`` with doctor and patient loaded)."""
+    doctor = prescription.doctor
+    return {
+        'id': prescription.id,
+        'issued_at': prescription.created_at.strftime('%d %b %Y %H:%M UTC'),
+        'doctor_name': doctor.full_name,
+        'specialization': doctor.specialization,
+        'license_no': doctor.license_no,
+        'clinic_address': doctor.clinic_address,
+        'doctor_phone': doctor.phone,
+        'patient_name': prescription.patient.full_name,
+        'diagnosis': prescription.diagnosis,
+        'medicines': prescription.medicines,
+        'notes': prescription.notes,
+    }
+
+
+def content_hash(content):
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def verification_code(prescription_id, digest):
+    signature = signing.Signer(salt=SIGNATURE_SALT).signature(f'{prescription_id}:{digest}')
+    return signature[:16]
+
+
+def verify_code(prescription, code):
+    """True when ``code`` matches the one printed on the prescription's generated PDF."""
+    if not prescription.pdf_hash:
+        return False
+    return constant_time_compare(verification_code(prescription.id, prescription.pdf_hash), (code or '').strip())
+
+
+# --- PDF writer ------------------------------------------------------------
+
+def _escape(text):
+    text = text.encode('cp1252', 'replace').decode('cp1252')
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+class _Layout:
+    """Lays out lines top to bottom and starts a new page when one is full."""
+
+    def __init__(self):
+        self.pages = []
+        self._new_page()
+
+    def _new_page(self):
+        self.ops = []
+        self.pages.append(self.ops)
+        self.y = PAGE_HEIGHT - MARGIN
+
+    def _room(self, height):
+        if self.y - height < MARGIN + 40:
+            self._new_page()
+
+    def text(self, value, size=10, bold=False, gap=4):
+        self._room(size + gap)
+        self.y -= size + gap
+        font = 'F2' if bold else 'F1'
+        self.ops.append(f'BT /{font} {size} Tf {MARGIN} {self.y} Td ({_escape(value)}) Tj ET')
+
+    def paragraph(self, value, size=10):
+        for raw_line in (value or '-').splitlines() or ['-']:
+            for line in textwrap.wrap(raw_line, WRAP_COLUMNS) or ['']:
+                self.text(line, size)
+
+    def rule(self, gap=8):
+        self._room(gap * 2)
+        self.y -= gap
+        self.ops.append(f'0.5 w {MARGIN} {self.y} m {PAGE_WIDTH - MARGIN} {self.y} l S')
+        self.y -= gap
+
+    def footer(self, value):
+        for number, ops in enumerate(self.pages, start=1):
+            line = f'{value}    Page {number} of {len(self.pages)}'
+            ops.append(f'BT /F1 8 Tf {MARGIN} {MARGIN} Td ({_escape(line)}) Tj ET')
+
+
+def _pdf_document(pages):
+    """Serialize page content streams into a PDF file."""
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        None,  # page tree, filled in below
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>',
+    ]
+    kids = []
+    for ops in pages:
+        stream = '\n'.join(ops).encode('cp1252')
+        objects.append(b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream))
+        objects.append(
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] '
+            b'/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>'
+            % (PAGE_WIDTH, PAGE_HEIGHT, len(objects))
+        )
+        kids.append(b'%d 0 R' % len(objects))
+    objects[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (b' '.join(kids), len(kids))
+
+    output = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+    xref = len(output)
+    output += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    output += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    output += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return bytes(output)
+
+
+def render_pdf(content, code):
+    """Render ``content`` (see ``prescription_content``) to PDF bytes. Runs in the pool."""
+    layout = _Layout()
+    layout.text('PRESCRIPTION', size=18, bold=True)
+    layout.text(f"Dr. {content['doctor_name']}", size=12, bold=True, gap=10)
+    layout.text(f"{content['specialization']}    Reg. No. {content['license_no']}")
+    if content['clinic_address']:
+        layout.paragraph(content['clinic_address'])
+    if content['doctor_phone']:
+        layout.text(f"Phone: {content['doctor_phone']}")
+    layout.rule()
+    layout.text(f"Patient: {content['patient_name']}", bold=True)
+    layout.text(f"Date: {content['issued_at']}    Rx No. {content['id']}")
+    layout.rule()
+    layout.text('Diagnosis', size=11, bold=True, gap=8)
+    layout.paragraph(content['diagnosis'])
+    layout.text('Medicines', size=11, bold=True, gap=12)
+    layout.paragraph(content['medicines'])
+    if content['notes']:
+        layout.text('Notes', size=11, bold=True, gap=12)
+        layout.paragraph(content['notes'])
+    layout.rule(gap=14)
+    layout.text(f"Electronically issued by Dr. {content['doctor_name']}.", size=9)
+    layout.footer(f"Verification code {code}")
+    return _pdf_document(layout.pages)
+
+
+# --- job -------------------------------------------------------------------
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _render(content, code):
+    """``render_pdf`` on the process pool (inline when PRESCRIPTION_PDF_PROCESSES is 0)."""
+    global _pool
+    processes = getattr(settings, 'PRESCRIPTION_PDF_PROCESSES', 2)
+    if not processes:
+        return render_pdf(content, code)
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=processes)
+    return _pool.submit(render_pdf, content, code).result(
+        timeout=getattr(settings, 'PRESCRIPTION_PDF_TIMEOUT', 60),
+    )
+
+
+def queue_render(prescription):
+    """Queue the PDF for ``prescription``; call inside the transaction that saved it."""
+    from accounts.jobs import enqueue_job
+
+    enqueue_job(RENDER_JOB, {'pk': prescription.pk})
+
+
+def render_prescription_pdf(payload):
+    """Background job: render (or reuse) the PDF for one prescription and attach it."""
+    prescription = (
+        Prescription.objects.select_related('doctor', 'patient').filter(pk=payload['pk']).first()
+    )
+    if prescription is None:
+        return {'skipped': 'prescription deleted'}
+
+    content = prescription_content(prescription)
+    digest = content_hash(content)
+    if prescription.pdf_hash == digest and prescription.generated_pdf:
+        return {'skipped': 'up to date'}
+
+    name = f'{STORAGE_DIR}/{digest[:32]}.pdf'
+    if not default_storage.exists(name):
+        data = _render(content, verification_code(prescription.pk, digest))
+        name = default_storage.save(name, ContentFile(data))
+
+    Prescription.objects.filter(pk=prescription.pk).update(generated_pdf=name, pdf_hash=digest)
+    return {'pdf': name, 'hash': digest}
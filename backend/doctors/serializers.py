@@ -1,18 +1,22 @@
 from rest_framework import serializers
 
 from patients.models import PatientProfile
-from .models import Appointment, ConsultationRequest, DoctorProfile, Prescription
+from telemedicine.media import media_url
+from .models import Appointment, ConsultationRequest, DoctorAvailability, DoctorProfile, Prescription
 
 
 class DoctorProfileSerializer(serializers.ModelSerializer):
     email = serializers.EmailField(source='user.email', read_only=True)
     department_name = serializers.SerializerMethodField()
     profile_image = serializers.SerializerMethodField()
+    profile_image_thumbnail = serializers.SerializerMethodField()
+    profile_image_webp = serializers.SerializerMethodField()
 
     class Meta:
         model = DoctorProfile
         fields = ['id', 'full_name', 'email', 'specialization', 'department', 'department_name', 
-                  'license_no', 'phone', 'experience_years', 'clinic_address', 'profile_image', 'created_at']
+                  'license_no', 'phone', 'experience_years', 'clinic_address', 'profile_image',
+                  'profile_image_thumbnail', 'profile_image_webp', 'created_at']
 
     def get_department_name(self, obj):
         return obj.department.name if obj.department else ''
@@ -22,6 +26,12 @@ class DoctorProfileSerializer(serializers.ModelSerializer):
             return obj.profile_image.url
         return None
 
+    def get_profile_image_thumbnail(self, obj):
+        return obj.profile_thumbnail.url if obj.profile_thumbnail else None
+
+    def get_profile_image_webp(self, obj):
+        return obj.profile_image_webp.url if obj.profile_image_webp else None
+
 
 class PatientSummarySerializer(serializers.ModelSerializer):
     email = serializers.EmailField(source='user.email', read_only=True)
@@ -91,6 +101,9 @@ class AppointmentSerializer(serializers.ModelSerializer):
 class PrescriptionSerializer(serializers.ModelSerializer):
     patient_name = serializers.CharField(source='patient.full_name', read_only=True)
     date_issued = serializers.DateTimeField(source='created_at', read_only=True)
+    pdf = serializers.SerializerMethodField()
+    generated_pdf = serializers.SerializerMethodField()
+    pdf_status = serializers.SerializerMethodField()
 
     class Meta:
         model = Prescription
@@ -103,5 +116,32 @@ class PrescriptionSerializer(serializers.ModelSerializer):
             'medicines',
             'notes',
             'pdf',
+            'generated_pdf',
+            'pdf_status',
             'date_issued',
         ]
+
+    def get_pdf(self, obj):
+        return media_url(obj.pdf)
+
+    def get_generated_pdf(self, obj):
+        return media_url(obj.generated_pdf)
+
+    def get_pdf_status(self, obj):
+        return 'ready' if obj.generated_pdf else 'pending'
+
+
+class DoctorAvailabilitySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DoctorAvailability
+        fields = ['id', 'weekday', 'start_time', 'end_time', 'slot_minutes']
+
+    def validate_slot_minutes(self, value):
+        if not 5 <= value <= 240:
+            raise serializers.ValidationError('slot_minutes must be between 5 and 240.')
+        return value
+
+    def validate(self, attrs):
+        if attrs['start_time'] >= attrs['end_time']:
+            raise serializers.ValidationError('start_time must be before end_time.')
+        return attrs
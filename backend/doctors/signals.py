@@ -0,0 +1,72 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .directory import bump_version
+from .models import ConsultationRequest, Department, DoctorProfile
+
+# DoctorProfile.pending_requests follows each request's pending status and doctor.
+# queryset.update() bypasses these signals; callers using it adjust the counters
+# themselves (``adjust_pending``) and ``rebuild_pending_counts`` corrects drift.
+
+
+def adjust_pending(doctor_id, delta):
+    if doctor_id and delta:
+        DoctorProfile.objects.filter(pk=doctor_id).update(
+            pending_requests=F('pending_requests') + delta,
+        )
+
+
+def _queue_slot(instance):
+    """The doctor whose queue ``instance`` counts towards, or ``None`` if not pending."""
+    values = instance.__dict__
+    if values.get('status') != 'pending':
+        return None
+    return values.get('doctor_id')
+
+
+@receiver(post_init, sender=ConsultationRequest)
+def _request_loaded(sender, instance, **kwargs):
+    # Read from __dict__ so deferred fields do not trigger a query.
+    instance._queue_state = _queue_slot(instance) if instance.pk else None
+    instance._queue_tracked = not instance.pk or {'status', 'doctor_id'} <= instance.__dict__.keys()
+
+
+@receiver(post_save, sender=ConsultationRequest)
+def _request_saved(sender, instance, created, raw=False, **kwargs):
+    if raw or not instance._queue_tracked or not {'status', 'doctor_id'} <= instance.__dict__.keys():
+        return
+    previous, current = instance._queue_state, _queue_slot(instance)
+    instance._queue_state = current
+    if created and getattr(instance, '_queue_claimed', False):
+        # claim_doctor already took the queue place.
+        return
+    if previous != current:
+        adjust_pending(previous, -1)
+        adjust_pending(current, 1)
+
+
+@receiver(post_delete, sender=ConsultationRequest)
+def _request_deleted(sender, instance, **kwargs):
+    adjust_pending(instance._queue_state, -1)
+
+
+# Any change to a department or doctor profile invalidates the directory snapshot.
+def _directory_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_version()
+
+
+for _model in (Department, DoctorProfile):
+    post_save.connect(_directory_changed, sender=_model, dispatch_uid=f'directory-save-{_model._meta.label}')
+    post_delete.connect(_directory_changed, sender=_model, dispatch_uid=f'directory-delete-{_model._meta.label}')
+
+
+@receiver(post_save, sender=get_user_model())
+def _doctor_user_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    # Doctor cards show the account email; last_login updates and the like are ignored.
+    if raw or created or instance.role != 'doctor':
+        return
+    if update_fields is None or 'email' in update_fields:
+        bump_version()
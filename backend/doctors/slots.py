@@ -0,0 +1,112 @@
+"""
+Appointment slots from doctors' weekly availability.
+
+``DoctorAvailability`` rows are expanded lazily into slot start times for the
+requested date range; nothing is stored per slot. Booked slots are read with
+one query over the ``appointment_slot_unique`` index and subtracted, so a
+range of any number of doctors costs two queries. The unique constraint is
+what actually prevents a slot being booked twice: ``book_appointment`` turns
+the losing insert of a race into ``SlotTaken``.
+"""
+
+import datetime
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Appointment, DoctorAvailability
+
+
+class SlotTaken(Exception):
+    """Raised when the requested slot already has an appointment."""
+
+
+def max_range_days():
+    return getattr(settings, 'APPOINTMENT_SLOT_MAX_DAYS', 31)
+
+
+def _slot_times(rule):
+    """Start times of the slots in one availability window."""
+    step = datetime.timedelta(minutes=rule.slot_minutes)
+    start = datetime.datetime.combine(datetime.date.min, rule.start_time)
+    end = datetime.datetime.combine(datetime.date.min, rule.end_time)
+    times = []
+    while start + step <= end:
+        times.append(start.time())
+        start += step
+    return times
+
+
+def _dates(start, end):
+    day = start
+    while day <= end:
+        yield day
+        day += datetime.timedelta(days=1)
+
+
+def availability_by_doctor(doctor_ids):
+    """``{doctor_id: {weekday: [slot start times]}}`` for doctors with availability defined."""
+    rules = defaultdict(lambda: defaultdict(list))
+    for rule in DoctorAvailability.objects.filter(doctor_id__in=doctor_ids):
+        rules[rule.doctor_id][rule.weekday].extend(_slot_times(rule))
+    return rules
+
+
+def booked_slots(doctor_ids, start, end):
+    """Set of ``(doctor_id, date, time)`` already taken between ``start`` and ``end``."""
+    return set(
+        Appointment.objects.filter(
+            doctor_id__in=doctor_ids,
+            appointment_date__range=(start, end),
+            holds_slot=True,
+        ).values_list('doctor_id', 'appointment_date', 'appointment_time')
+    )
+
+
+def free_slots(doctor_ids, start, end):
+    """
+    ``{doctor_id: [(date, time), ...]}`` of free slots from ``start`` to ``end``
+    (inclusive), in order. Slots that have already started today are left out.
+    """
+    doctor_ids = list(doctor_ids)
+    rules = availability_by_doctor(doctor_ids)
+    if not rules:
+        return {}
+    taken = booked_slots(list(rules), start, end)
+    now = timezone.localtime()
+    now = (now.date(), now.time())
+
+    result = {}
+    for doctor_id, weekly in rules.items():
+        slots = []
+        for day in _dates(start, end):
+            for time in sorted(set(weekly.get(day.weekday(), ()))):
+                if (day, time) > now and (doctor_id, day, time) not in taken:
+                    slots.append((day, time))
+        result[doctor_id] = slots
+    return result
+
+
+def book_appointment(**fields):
+    """Create an ``Appointment``; raises ``SlotTaken`` if the doctor's slot is already booked."""
+    try:
+        # Savepoint so the failed insert does not break the caller's transaction.
+        with transaction.atomic():
+            return Appointment.objects.create(**fields)
+    except IntegrityError as exc:
+        if Appointment.objects.filter(
+            doctor=fields.get('doctor') or fields.get('doctor_id'),
+            appointment_date=fields['appointment_date'],
+            appointment_time=fields['appointment_time'],
+            holds_slot=True,
+        ).exists():
+            raise SlotTaken('That slot is already booked.') from exc
+        raise
+
+
+def suggest_slots(doctor_id, after, count=5, days=7):
+    """The next ``count`` free slots for ``doctor_id`` starting on ``after``."""
+    slots = free_slots([doctor_id], after, after + datetime.timedelta(days=days)).get(doctor_id, [])
+    return slots[:count]
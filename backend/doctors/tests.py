@@ -0,0 +1,130 @@
+import datetime
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.auth import issue_token
+from accounts.models import User
+from patients.models import PatientProfile
+
+from .decisions import APPROVE, REJECT, decide_requests
+from .models import Appointment, ConsultationRequest, DoctorProfile
+from .slots import SlotTaken, book_appointment
+
+DAY = datetime.date(2030, 1, 7)
+
+
+class DecisionTestCase(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(email='doc@example.com', password='pw', role='doctor')
+        self.doctor = DoctorProfile.objects.create(
+            user=user, full_name='Doc', specialization='GP', license_no='L-1', phone='1',
+        )
+        patient_user = User.objects.create_user(email='pat@example.com', password='pw', role='patient')
+        self.patient = PatientProfile.objects.create(user=patient_user, full_name='Pat', phone='2')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + issue_token(user, self.doctor.id))
+
+    def consultation(self, hour):
+        return ConsultationRequest.objects.create(
+            patient=self.patient,
+            doctor=self.doctor,
+            symptoms='cough',
+            preferred_date=DAY,
+            preferred_time=datetime.time(hour),
+        )
+
+    def pending_count(self):
+        return DoctorProfile.objects.values_list('pending_requests', flat=True).get(pk=self.doctor.pk)
+
+
+class BulkDecisionTests(DecisionTestCase):
+    def test_retry_does_not_duplicate_appointments(self):
+        ids = [self.consultation(9).id, self.consultation(10).id]
+        self.assertEqual(self.pending_count(), 2)
+
+        first = decide_requests(self.doctor.id, ids, APPROVE)
+        self.assertEqual(first['approved'], ids)
+        self.assertEqual(Appointment.objects.count(), 2)
+        self.assertEqual(self.pending_count(), 0)
+
+        retry = decide_requests(self.doctor.id, ids, APPROVE)
+        self.assertEqual(retry['approved'], [])
+        self.assertEqual(retry['already_processed'], [{'id': pk, 'status': 'approved'} for pk in ids])
+        self.assertEqual(Appointment.objects.count(), 2)
+        self.assertEqual(self.pending_count(), 0)
+
+    def test_reject_after_approve_is_already_processed(self):
+        consultation = self.consultation(9)
+        decide_requests(self.doctor.id, [consultation.id], APPROVE)
+        result = decide_requests(self.doctor.id, [consultation.id], REJECT)
+        self.assertEqual(result['rejected'], [])
+        self.assertEqual(result['already_processed'], [{'id': consultation.id, 'status': 'approved'}])
+
+    def test_same_slot_in_one_batch_conflicts(self):
+        first, second = self.consultation(9), self.consultation(9)
+        result = decide_requests(self.doctor.id, [first.id, second.id], APPROVE)
+        self.assertEqual(result['approved'], [first.id])
+        self.assertEqual([conflict['id'] for conflict in result['conflicts']], [second.id])
+        self.assertEqual(ConsultationRequest.objects.get(pk=second.pk).status, 'pending')
+        self.assertEqual(Appointment.objects.count(), 1)
+
+    def test_other_doctors_requests_are_not_found(self):
+        other_user = User.objects.create_user(email='other@example.com', password='pw', role='doctor')
+        other = DoctorProfile.objects.create(user=other_user, full_name='O', specialization='GP', license_no='L-2', phone='3')
+        consultation = self.consultation(9)
+        result = decide_requests(other.id, [consultation.id, 999], APPROVE)
+        self.assertEqual(result['not_found'], [consultation.id, 999])
+        self.assertEqual(Appointment.objects.count(), 0)
+
+    def test_endpoint_retry(self):
+        ids = [self.consultation(9).id]
+        for _ in range(2):
+            response = self.client.post('/api/doctors/consultation-requests/bulk/', {'ids': ids, 'action': 'approve'}, format='json')
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['already_processed'], [{'id': ids[0], 'status': 'approved'}])
+        self.assertEqual(Appointment.objects.count(), 1)
+
+
+class SingleDecisionTests(DecisionTestCase):
+    def test_repeat_approve_is_a_no_op(self):
+        consultation = self.consultation(9)
+        for _ in range(2):
+            response = self.client.post(f'/api/doctors/approve-request/{consultation.id}/')
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(Appointment.objects.count(), 1)
+
+        response = self.client.post(f'/api/doctors/reject-request/{consultation.id}/')
+        self.assertEqual(response.status_code, 409)
+
+    def test_taken_slot_returns_409_with_suggestions(self):
+        book_appointment(patient=self.patient, doctor=self.doctor, appointment_date=DAY, appointment_time=datetime.time(9))
+        consultation = self.consultation(9)
+        response = self.client.post(f'/api/doctors/approve-request/{consultation.id}/')
+        self.assertEqual(response.status_code, 409)
+        self.assertIn('suggested_slots', response.data)
+        # The whole approval rolled back.
+        self.assertEqual(ConsultationRequest.objects.get(pk=consultation.pk).status, 'pending')
+        self.assertEqual(Appointment.objects.count(), 1)
+
+
+class SlotTakenTests(DecisionTestCase):
+    def book(self, hour=9):
+        return book_appointment(
+            patient=self.patient, doctor=self.doctor, appointment_date=DAY, appointment_time=datetime.time(hour),
+        )
+
+    def test_double_booking_raises_slot_taken(self):
+        self.book()
+        with self.assertRaises(SlotTaken):
+            self.book()
+        self.assertEqual(Appointment.objects.count(), 1)
+        # The failed insert ran in a savepoint; the surrounding transaction is still usable.
+        self.book(10)
+
+    def test_rejected_appointment_frees_its_slot(self):
+        appointment = self.book()
+        appointment.status = 'rejected'
+        appointment.save(update_fields=['status'])
+        self.book()
+        self.assertEqual(Appointment.objects.filter(holds_slot=True).count(), 1)
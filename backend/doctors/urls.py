@@ -2,32 +2,48 @@ from django.urls import path
 
 from .views import (
     approve_request,
+    available_slots,
+    bulk_decide_requests,
     confirmed_appointments,
     consultation_requests,
+    dashboard,
     department_list,
+    directory,
     doctors_by_department,
+    doctor_availability,
     doctor_profile,
     doctor_profile_detail,
     doctor_profile_list,
     doctor_profile_update,
+    doctor_profile_image,
     prescription_history,
     reject_request,
     search_patient,
+    patient_timeline,
     upload_prescription,
+    verify_prescription,
 )
 
 urlpatterns = [
     path('profiles/', doctor_profile_list, name='doctor-profile-list'),
     path('profiles/<int:pk>/', doctor_profile_detail, name='doctor-profile-detail'),
+    path('directory/', directory, name='doctor-directory'),
     path('departments/', department_list, name='department-list'),
     path('departments/doctors/', doctors_by_department, name='doctors-by-department'),
     path('profile/', doctor_profile, name='doctor-profile'),
     path('profile/update/', doctor_profile_update, name='doctor-profile-update'),
+    path('profile/image/', doctor_profile_image, name='doctor-profile-image'),
+    path('availability/', doctor_availability, name='doctor-availability'),
+    path('slots/', available_slots, name='doctor-available-slots'),
+    path('dashboard/', dashboard, name='doctor-dashboard'),
     path('confirmed-appointments/', confirmed_appointments, name='doctor-confirmed-appointments'),
     path('consultation-requests/', consultation_requests, name='doctor-consultation-requests'),
     path('approve-request/<int:pk>/', approve_request, name='doctor-approve-request'),
+    path('consultation-requests/bulk/', bulk_decide_requests, name='doctor-bulk-decide-requests'),
     path('reject-request/<int:pk>/', reject_request, name='doctor-reject-request'),
     path('search-patient/', search_patient, name='doctor-search-patient'),
+    path('patients/<int:patient_id>/timeline/', patient_timeline, name='doctor-patient-timeline'),
     path('upload-prescription/', upload_prescription, name='doctor-upload-prescription'),
+    path('prescriptions/<int:pk>/verify/', verify_prescription, name='doctor-verify-prescription'),
     path('prescription-history/', prescription_history, name='doctor-prescription-history'),
 ]
@@ -1,34 +1,93 @@
-from django.db.models import Count
+import datetime
+
+from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_time
+from django.utils.http import parse_etags
 from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
+from accounts.auth import forget_identity, resolve_identity, revoke_tokens
+from telemedicine.events import publish_on_commit
+from telemedicine.pagination import CursorError, paginate_request, wants_page
+from telemedicine.images import (
+    ImageRejected,
+    apply_profile_image,
+    clear_profile_image,
+    limit_uploads,
+    read_profile_image,
+    save_profile_image,
+)
 from patients.models import PatientProfile
-from .models import Appointment, ConsultationRequest, DoctorProfile, Department, Prescription
+from patients.search import search_patients
+from patients.views import timeline_response
+from .models import Appointment, ConsultationRequest, DoctorAvailability, DoctorProfile, Department, Prescription
+from .dashboard import dashboard_limit, doctor_dashboard
+from .decisions import ACTIONS, appointment_slot, decide_requests, decision_channels, parse_request_ids
+from .prescription_pdf import queue_render, verify_code
+from .directory import department_doctors, get_snapshot, public_directory
+from .slots import SlotTaken, book_appointment, free_slots, max_range_days, suggest_slots
 from .serializers import (
     AppointmentSerializer,
     ConsultationRequestSerializer,
+    DoctorAvailabilitySerializer,
     DoctorProfileSerializer,
     PatientSummarySerializer,
     PrescriptionSerializer,
 )
 
 
-def _get_doctor_profile(request):
+def _get_doctor_id(request):
+    """Resolve the calling doctor's profile id from the access token (or legacy email)."""
     email = request.GET.get('email') or request.data.get('email') or request.data.get('doctor_email')
-    if not email:
+    identity = resolve_identity(request, email)
+    if not identity or identity.role != 'doctor':
+        return None
+    return identity.profile_id
+
+
+def _get_doctor_profile(request):
+    doctor_id = _get_doctor_id(request)
+    if not doctor_id:
         return None
-    return DoctorProfile.objects.select_related('user', 'department').filter(user__email=email).first()
+    return DoctorProfile.objects.select_related('user', 'department').filter(pk=doctor_id).first()
+
+
+def _directory_response(request, snapshot, data):
+    """``data`` from the directory snapshot, or 304 if the client already has this version."""
+    etag = snapshot['etag']
+    if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(data)
+    response['ETag'] = etag
+    response['Cache-Control'] = f"public, max-age={settings.DIRECTORY_CACHE_MAX_AGE}"
+    return response
+
+
+@api_view(['GET'])
+def directory(request):
+    """Departments, doctor cards and counts as one versioned snapshot (supports If-None-Match)."""
+    snapshot = get_snapshot()
+    return _directory_response(request, snapshot, public_directory(snapshot))
 
 
 @api_view(['GET', 'POST'])
 def doctor_profile_list(request):
     """List or create doctor profiles."""
     if request.method == 'GET':
-        profiles = DoctorProfile.objects.all()
-        serializer = DoctorProfileSerializer(profiles, many=True)
-        return Response(serializer.data)
+        if not wants_page(request):
+            snapshot = get_snapshot()
+            return _directory_response(request, snapshot, snapshot['profiles'])
+
+        profiles = DoctorProfile.objects.select_related('user', 'department')
+        try:
+            page, page_info = paginate_request(request, profiles, ('id',))
+        except CursorError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'results': DoctorProfileSerializer(page, many=True).data, **page_info})
 
     serializer = DoctorProfileSerializer(data=request.data)
     if serializer.is_valid():
@@ -56,22 +115,15 @@ def doctor_profile_detail(request, pk):
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    forget_identity(profile.user.email)
     profile.delete()
     return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 @api_view(['GET'])
 def department_list(request):
-    departments = Department.objects.annotate(doctor_count=Count('doctors')).order_by('name')
-    data = [
-        {
-            'id': dept.id,
-            'name': dept.name,
-            'doctor_count': dept.doctor_count,
-        }
-        for dept in departments
-    ]
-    return Response(data)
+    snapshot = get_snapshot()
+    return _directory_response(request, snapshot, snapshot['departments'])
 
 
 @api_view(['GET'])
@@ -82,34 +134,18 @@ def doctors_by_department(request):
     
     if not department_id and not department_name:
         return Response({'detail': 'department_id or department_name is required.'}, status=status.HTTP_400_BAD_REQUEST)
-    
-    filters = {}
-    if department_id:
-        filters['department_id'] = department_id
-    if department_name:
-        filters['department__name__iexact'] = department_name
-    
-    doctors = DoctorProfile.objects.filter(**filters).select_related('department').order_by('full_name')
-    data = [
-        {
-            'id': doctor.id,
-            'full_name': doctor.full_name,
-            'specialization': doctor.specialization,
-            'experience_years': doctor.experience_years,
-            'phone': doctor.phone,
-        }
-        for doctor in doctors
-    ]
-    return Response(data)
+
+    snapshot = get_snapshot()
+    return _directory_response(request, snapshot, department_doctors(snapshot, department_id, department_name))
 
 
 @api_view(['GET'])
 def confirmed_appointments(request):
-    doctor = _get_doctor_profile(request)
-    if not doctor:
+    doctor_id = _get_doctor_id(request)
+    if not doctor_id:
         return Response({'detail': 'Doctor email is required.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    appointments = Appointment.objects.filter(doctor=doctor, status='confirmed').select_related(
+    appointments = Appointment.objects.filter(doctor_id=doctor_id, status='confirmed').select_related(
         'patient', 'department'
     )
     serializer = AppointmentSerializer(appointments, many=True)
@@ -118,75 +154,277 @@ def confirmed_appointments(request):
 
 @api_view(['GET'])
 def consultation_requests(request):
-    doctor = _get_doctor_profile(request)
-    if not doctor:
+    doctor_id = _get_doctor_id(request)
+    if not doctor_id:
         return Response({'detail': 'Doctor email is required.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    requests = ConsultationRequest.objects.filter(doctor=doctor, status='pending').select_related('patient')
+    requests = ConsultationRequest.objects.filter(doctor_id=doctor_id, status='pending').select_related('patient')
     serializer = ConsultationRequestSerializer(requests, many=True)
     return Response(serializer.data)
 
 
-@api_view(['POST'])
-def approve_request(request, pk):
+@api_view(['GET'])
+def dashboard(request):
+    """
+    Pending request count, today's and upcoming confirmed appointment counts, and the
+    next/latest ``limit`` appointments and prescriptions (default DOCTOR_DASHBOARD_ITEMS).
+    """
+    doctor_id = _get_doctor_id(request)
+    if not doctor_id:
+        return Response({'detail': 'Doctor email is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
     try:
-        consultation = ConsultationRequest.objects.select_related('doctor', 'patient', 'doctor__department').get(pk=pk)
-    except ConsultationRequest.DoesNotExist:
-        return Response({'detail': 'Request not found.'}, status=status.HTTP_404_NOT_FOUND)
+        limit = dashboard_limit(request.GET.get('limit'))
+    except ValueError:
+        return Response({'detail': 'limit must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    consultation.status = 'approved'
-    consultation.save(update_fields=['status'])
+    data = doctor_dashboard(doctor_id, limit)
+    if data is None:
+        return Response({'detail': 'Doctor profile not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+    return Response({
+        **data['counts'],
+        'next_appointments': AppointmentSerializer(data['next_appointments'], many=True).data,
+        'recent_prescriptions': PrescriptionSerializer(data['recent_prescriptions'], many=True).data,
+    })
+
+
+def _slot_data(slots):
+    return [{'date': day.isoformat(), 'time': time.strftime('%H:%M')} for day, time in slots]
 
-    # Use preferred date/time if provided, otherwise fall back to requested_at
-    if consultation.preferred_date:
-        appointment_date = consultation.preferred_date
-    else:
-        appointment_date = consultation.requested_at.date() if consultation.requested_at else timezone.now().date()
-    
-    if consultation.preferred_time:
-        appointment_time = consultation.preferred_time
-    else:
-        appointment_time = consultation.requested_at.time() if consultation.requested_at else timezone.now().time()
-
-    Appointment.objects.create(
-        patient=consultation.patient,
-        doctor=consultation.doctor,
-        department=consultation.doctor.department,
-        appointment_date=appointment_date,
-        appointment_time=appointment_time,
-        status='confirmed',
-    )
+
+def _already_decided(consultation, target):
+    """Response for a request that is no longer pending: a repeat of the same decision is a no-op."""
+    if consultation.status == target:
+        return Response({'detail': f'Request already {target}.'}, status=status.HTTP_200_OK)
+    return Response({'detail': f'Request was already {consultation.status}.'}, status=status.HTTP_409_CONFLICT)
+
+
+@api_view(['POST'])
+def approve_request(request, pk):
+    """
+    Approve a consultation and book its appointment. The doctor may pass
+    ``appointment_date``/``appointment_time`` to book a different slot than the
+    patient's preferred one. Returns 409 with suggested free slots if the slot is taken.
+    Approving an already approved request is a no-op.
+    """
+    appointment_date = parse_date(str(request.data.get('appointment_date') or ''))
+    appointment_time = parse_time(str(request.data.get('appointment_time') or ''))
+    if request.data.get('appointment_date') and not appointment_date:
+        return Response({'detail': 'appointment_date must be YYYY-MM-DD.'}, status=status.HTTP_400_BAD_REQUEST)
+    if request.data.get('appointment_time') and not appointment_time:
+        return Response({'detail': 'appointment_time must be HH:MM.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        with transaction.atomic():
+            try:
+                consultation = ConsultationRequest.objects.select_for_update().get(pk=pk)
+            except ConsultationRequest.DoesNotExist:
+                return Response({'detail': 'Request not found.'}, status=status.HTTP_404_NOT_FOUND)
+            if consultation.status != 'pending':
+                return _already_decided(consultation, 'approved')
+
+            appointment_date, appointment_time = appointment_slot(consultation, appointment_date, appointment_time)
+            consultation.status = 'approved'
+            consultation.save(update_fields=['status'])
+            doctor = DoctorProfile.objects.only('id', 'department_id').get(pk=consultation.doctor_id)
+            book_appointment(
+                patient_id=consultation.patient_id,
+                doctor=doctor,
+                department_id=doctor.department_id,
+                appointment_date=appointment_date,
+                appointment_time=appointment_time,
+                status='confirmed',
+            )
+            publish_on_commit(decision_channels(consultation), 'consultation.approved', {
+                'id': consultation.id,
+                'status': 'approved',
+                'appointment_date': appointment_date,
+                'appointment_time': appointment_time,
+            })
+    except SlotTaken as exc:
+        return Response(
+            {
+                'detail': str(exc),
+                'suggested_slots': _slot_data(suggest_slots(consultation.doctor_id, appointment_date)),
+            },
+            status=status.HTTP_409_CONFLICT,
+        )
 
     return Response({'detail': 'Request approved.'}, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
 def reject_request(request, pk):
+    with transaction.atomic():
+        try:
+            consultation = ConsultationRequest.objects.select_for_update().get(pk=pk)
+        except ConsultationRequest.DoesNotExist:
+            return Response({'detail': 'Request not found.'}, status=status.HTTP_404_NOT_FOUND)
+        if consultation.status != 'pending':
+            return _already_decided(consultation, 'rejected')
+
+        consultation.status = 'rejected'
+        consultation.save(update_fields=['status'])
+        publish_on_commit(decision_channels(consultation), 'consultation.rejected', {'id': consultation.id, 'status': 'rejected'})
+    return Response({'detail': 'Request rejected.'}, status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+def bulk_decide_requests(request):
+    """
+    Approve or reject many of the doctor's pending requests at once:
+    ``{"ids": [...], "action": "approve" | "reject"}``. Requests that are no longer
+    pending are reported under ``already_processed`` and left untouched.
+    """
+    doctor_id = _get_doctor_id(request)
+    if not doctor_id:
+        return Response({'detail': 'Doctor email is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    action = request.data.get('action')
+    if action not in ACTIONS:
+        return Response({'detail': 'action must be "approve" or "reject".'}, status=status.HTTP_400_BAD_REQUEST)
+    ids, error = parse_request_ids(request.data.get('ids'))
+    if error:
+        return Response({'detail': error}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        result = decide_requests(doctor_id, ids, action)
+    except SlotTaken as exc:
+        return Response({'detail': str(exc)}, status=status.HTTP_409_CONFLICT)
+    return Response(result)
+
+
+@api_view(['GET', 'PUT'])
+def doctor_availability(request):
+    """
+    The calling doctor's recurring weekly availability. PUT replaces the whole
+    schedule with a list of ``{weekday, start_time, end_time, slot_minutes}``.
+    """
+    doctor_id = _get_doctor_id(request)
+    if not doctor_id:
+        return Response({'detail': 'Doctor email is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    if request.method == 'GET':
+        serializer = DoctorAvailabilitySerializer(DoctorAvailability.objects.filter(doctor_id=doctor_id), many=True)
+        return Response(serializer.data)
+
+    windows = request.data.get('availability') if isinstance(request.data, dict) else request.data
+    serializer = DoctorAvailabilitySerializer(data=windows or [], many=True)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    rules = [DoctorAvailability(doctor_id=doctor_id, **window) for window in serializer.validated_data]
+    by_day = {}
+    for rule in sorted(rules, key=lambda rule: (rule.weekday, rule.start_time)):
+        previous = by_day.get(rule.weekday)
+        if previous and rule.start_time < previous.end_time:
+            return Response(
+                {'detail': f"Overlapping availability on {rule.get_weekday_display()}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        by_day[rule.weekday] = rule
+
+    with transaction.atomic():
+        DoctorAvailability.objects.filter(doctor_id=doctor_id).delete()
+        DoctorAvailability.objects.bulk_create(rules)
+
+    serializer = DoctorAvailabilitySerializer(DoctorAvailability.objects.filter(doctor_id=doctor_id), many=True)
+    return Response(serializer.data)
+
+
+@api_view(['GET'])
+def available_slots(request):
+    """
+    Free appointment slots for one doctor (``doctor_id``) or a whole department
+    (``department_id``/``department_name``) from ``start`` (default today) for
+    ``days`` days (default 7). Doctors without availability are left out.
+    """
+    doctor_id = request.GET.get('doctor_id')
+    department_id = request.GET.get('department_id')
+    department_name = request.GET.get('department_name')
+    if not (doctor_id or department_id or department_name):
+        return Response(
+            {'detail': 'doctor_id, department_id or department_name is required.'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    start = parse_date(request.GET.get('start') or '') if request.GET.get('start') else timezone.localdate()
+    if start is None:
+        return Response({'detail': 'start must be YYYY-MM-DD.'}, status=status.HTTP_400_BAD_REQUEST)
     try:
-        consultation = ConsultationRequest.objects.get(pk=pk)
-    except ConsultationRequest.DoesNotExist:
-        return Response({'detail': 'Request not found.'}, status=status.HTTP_404_NOT_FOUND)
+        days = int(request.GET.get('days') or 7)
+    except ValueError:
+        return Response({'detail': 'days must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+    if not 1 <= days <= max_range_days():
+        return Response({'detail': f"days must be between 1 and {max_range_days()}."}, status=status.HTTP_400_BAD_REQUEST)
+    end = start + datetime.timedelta(days=days - 1)
+
+    doctors = DoctorProfile.objects.all()
+    if doctor_id:
+        doctors = doctors.filter(pk=doctor_id)
+    if department_id:
+        doctors = doctors.filter(department_id=department_id)
+    if department_name:
+        doctors = doctors.filter(department__name__iexact=department_name)
+    names = dict(doctors.values_list('id', 'full_name'))
+
+    slots = free_slots(names, start, end)
+    data = [
+        {
+            'doctor_id': doctor,
+            'doctor_name': names[doctor],
+            'slots': _slot_data(slots[doctor]),
+        }
+        for doctor in sorted(slots, key=lambda doctor: (names[doctor], doctor))
+    ]
+    return Response(data)
 
-    consultation.status = 'rejected'
-    consultation.save(update_fields=['status'])
-    return Response({'detail': 'Request rejected.'}, status=status.HTTP_200_OK)
+
+# A doctor's chart view of a patient leaves out their payments.
+CHART_TIMELINE_KINDS = ('consultation_request', 'appointment', 'prescription', 'order')
+
+
+@api_view(['GET'])
+def patient_timeline(request, patient_id):
+    """Cursor-paginated history of a patient this doctor has consulted or prescribed for."""
+    doctor_id = _get_doctor_id(request)
+    if not doctor_id:
+        return Response({'detail': 'Doctor email is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    has_relationship = (
+        ConsultationRequest.objects.filter(doctor_id=doctor_id, patient_id=patient_id).exists()
+        or Prescription.objects.filter(doctor_id=doctor_id, patient_id=patient_id).exists()
+    )
+    if not has_relationship:
+        return Response({'detail': 'Patient not found.'}, status=status.HTTP_404_NOT_FOUND)
+    return timeline_response(request, patient_id, allowed_kinds=CHART_TIMELINE_KINDS)
 
 
 @api_view(['GET'])
 def search_patient(request):
-    name = request.GET.get('name', '').strip()
-    if not name:
+    """
+    Ranked, typo-tolerant patient lookup by name, phone or email (``name`` or ``q``).
+    Returns at most ``limit`` patients (default PATIENT_SEARCH_LIMIT).
+    """
+    term = (request.GET.get('q') or request.GET.get('name') or '').strip()
+    if not term:
         return Response([], status=status.HTTP_200_OK)
 
-    patients = PatientProfile.objects.filter(full_name__icontains=name).select_related('user')
+    try:
+        limit = min(int(request.GET.get('limit') or 0) or settings.PATIENT_SEARCH_LIMIT, settings.PATIENT_SEARCH_MAX_LIMIT)
+    except ValueError:
+        return Response({'detail': 'limit must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    patients = search_patients(term, limit=max(limit, 1))
     serializer = PatientSummarySerializer(patients, many=True)
     return Response(serializer.data)
 
 
 @api_view(['POST'])
 def upload_prescription(request):
-    doctor = _get_doctor_profile(request)
-    if not doctor:
+    doctor_id = _get_doctor_id(request)
+    if not doctor_id:
         return Response({'detail': 'Doctor email is required.'}, status=status.HTTP_400_BAD_REQUEST)
 
     patient_id = request.data.get('patient_id')
@@ -198,28 +436,52 @@ def upload_prescription(request):
     except PatientProfile.DoesNotExist:
         return Response({'detail': 'Patient not found.'}, status=status.HTTP_404_NOT_FOUND)
 
-    prescription = Prescription.objects.create(
-        patient=patient,
-        doctor=doctor,
-        diagnosis=request.data.get('diagnosis', ''),
-        medicines=request.data.get('medicines', ''),
-        notes=request.data.get('notes', ''),
-        pdf=request.FILES.get('pdf'),
-    )
+    with transaction.atomic():
+        prescription = Prescription.objects.create(
+            patient=patient,
+            doctor_id=doctor_id,
+            diagnosis=request.data.get('diagnosis', ''),
+            medicines=request.data.get('medicines', ''),
+            notes=request.data.get('notes', ''),
+            pdf=request.FILES.get('pdf'),
+        )
+        # The standard PDF is rendered by the job worker; pdf_status reads 'pending' until then.
+        queue_render(prescription)
 
     serializer = PrescriptionSerializer(prescription)
     return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
+@api_view(['GET'])
+def verify_prescription(request, pk):
+    """Check the verification code printed on a generated prescription PDF."""
+    prescription = Prescription.objects.select_related('doctor', 'patient').filter(pk=pk).first()
+    if not prescription or not verify_code(prescription, request.GET.get('code')):
+        return Response({'valid': False}, status=status.HTTP_404_NOT_FOUND)
+    return Response({
+        'valid': True,
+        'id': prescription.id,
+        'doctor_name': prescription.doctor.full_name,
+        'date_issued': prescription.created_at,
+    })
+
+
 @api_view(['GET'])
 def prescription_history(request):
-    doctor = _get_doctor_profile(request)
-    if not doctor:
+    doctor_id = _get_doctor_id(request)
+    if not doctor_id:
         return Response({'detail': 'Doctor email is required.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    prescriptions = Prescription.objects.filter(doctor=doctor).select_related('patient').order_by('-created_at')
-    serializer = PrescriptionSerializer(prescriptions, many=True)
-    return Response(serializer.data)
+    prescriptions = Prescription.objects.filter(doctor_id=doctor_id).select_related('patient')
+    if not wants_page(request):
+        serializer = PrescriptionSerializer(prescriptions.order_by('-created_at'), many=True)
+        return Response(serializer.data)
+
+    try:
+        page, page_info = paginate_request(request, prescriptions, ('-created_at', '-id'))
+    except CursorError as e:
+        return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({'results': PrescriptionSerializer(page, many=True).data, **page_info})
 
 
 @api_view(['GET'])
@@ -234,11 +496,23 @@ def doctor_profile(request):
 
 @api_view(['PUT'])
 def doctor_profile_update(request):
+    try:
+        upload_limit = limit_uploads(request)
+    except ImageRejected as exc:
+        return Response({'detail': str(exc)}, status=exc.status_code)
+
     doctor = _get_doctor_profile(request)
     if not doctor:
         return Response({'detail': 'Doctor email is required.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    data = request.data.copy()
+    data = request.data
+
+    if upload_limit.exceeded:
+        return Response({'detail': 'Image is too large.'}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+    try:
+        image = read_profile_image(request.data.get('profile_image'))
+    except ImageRejected as exc:
+        return Response({'detail': str(exc)}, status=exc.status_code)
 
     department_name = data.get('department') or data.get('department_name')
     if department_name:
@@ -249,43 +523,54 @@ def doctor_profile_update(request):
     doctor.specialization = data.get('specialization') or doctor.specialization
     doctor.phone = data.get('phone') or data.get('phone_number') or doctor.phone
 
-    if data.get('email'):
+    if data.get('email') and data.get('email') != doctor.user.email:
+        forget_identity(doctor.user.email)
         doctor.user.email = data.get('email')
         doctor.user.save(update_fields=['email'])
 
     password = data.get('password')
     if password:
         doctor.user.set_password(password)
-        doctor.user.save()
-
-    # Handle image upload
-    image_data = request.data.get('profile_image')
-    if image_data is not None:
-        if image_data and image_data != 'null' and image_data != '':
-            if isinstance(image_data, str) and image_data.startswith('data:image'):
-                # Extract base64 string and create file
-                import base64
-                from django.core.files.base import ContentFile
-                
-                try:
-                    format_part, imgstr = image_data.split(';base64,')
-                    ext = format_part.split('/')[-1]
-                    decoded_data = base64.b64decode(imgstr)
-                    from django.utils.text import slugify
-                    file_name = f"doctor_{doctor.id}_{slugify(doctor.full_name)}.{ext}"
-                    doctor.profile_image.save(file_name, ContentFile(decoded_data), save=False)
-                except Exception as e:
-                    return Response({'detail': f'Error processing image: {str(e)}'}, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                # Handle file upload
-                doctor.profile_image = image_data
-        else:
-            # Remove image if empty/null
-            if doctor.profile_image:
-                doctor.profile_image.delete()
-            doctor.profile_image = None
-
-    doctor.save()
+        doctor.user.save(update_fields=['password'])
+        revoke_tokens([doctor.user.id])
+
+    with transaction.atomic():
+        doctor.save()
+        apply_profile_image(doctor, image, 'doctor')
+
+    serializer = DoctorProfileSerializer(doctor)
+    return Response(serializer.data)
+
+
+@api_view(['POST', 'DELETE'])
+def doctor_profile_image(request):
+    """
+    Upload (multipart field ``image``) or remove the doctor's profile image. The file is
+    streamed to disk with a size limit; thumbnail and WebP copies are built in the background.
+    """
+    try:
+        upload_limit = limit_uploads(request)
+    except ImageRejected as exc:
+        return Response({'detail': str(exc)}, status=exc.status_code)
+
+    doctor = _get_doctor_profile(request)
+    if not doctor:
+        return Response({'detail': 'Doctor email is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    if request.method == 'DELETE':
+        with transaction.atomic():
+            clear_profile_image(doctor)
+    else:
+        upload = request.FILES.get('image')
+        if upload_limit.exceeded:
+            return Response({'detail': 'Image is too large.'}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        if upload is None:
+            return Response({'detail': 'image file is required.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            with transaction.atomic():
+                save_profile_image(doctor, upload, 'doctor')
+        except ImageRejected as exc:
+            return Response({'detail': str(exc)}, status=exc.status_code)
 
     serializer = DoctorProfileSerializer(doctor)
     return Response(serializer.data)
@@ -1,9 +1,14 @@
 from django.contrib import admin
 
-from .models import PatientProfile
+from .models import PatientProfile, PatientSummary
 
 
 @admin.register(PatientProfile)
 class PatientProfileAdmin(admin.ModelAdmin):
     list_display = ('full_name', 'phone', 'city', 'state')
     search_fields = ('full_name', 'phone')
+
+
+@admin.register(PatientSummary)
+class PatientSummaryAdmin(admin.ModelAdmin):
+    list_display = ('patient', 'total_requests', 'confirmed_appointments', 'prescriptions_received', 'active_orders', 'updated_at')
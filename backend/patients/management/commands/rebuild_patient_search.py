@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from patients.models import PatientProfile
+from patients.search import index_patients
+
+
+class Command(BaseCommand):
+    help = "Rebuild the trigram search index for patients. Run once after deploying the index, or to repair it."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Patients per batch.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_id = 0
+        indexed = 0
+        while True:
+            batch = list(
+                PatientProfile.objects.filter(id__gt=last_id).select_related('user').order_by('id')[:batch_size]
+            )
+            if not batch:
+                break
+            index_patients(batch)
+            indexed += len(batch)
+            last_id = batch[-1].id
+            self.stdout.write(f"Indexed {indexed} patients...")
+        self.stdout.write(self.style.SUCCESS(f"Patient search index rebuilt for {indexed} patients."))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from patients.models import PatientProfile
+from patients.summary import rebuild_summary
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute per-patient dashboard summaries from the source tables. "
+        "Run after deploying the summary table or periodically to correct drift."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('patient_ids', nargs='*', type=int, help='Only these patient profile ids (default: all).')
+
+    def handle(self, *args, **options):
+        patient_ids = options['patient_ids']
+        if not patient_ids:
+            patient_ids = PatientProfile.objects.values_list('id', flat=True).order_by('id').iterator()
+        rebuilt = 0
+        for patient_id in patient_ids:
+            rebuild_summary(patient_id)
+            rebuilt += 1
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} patient summaries."))
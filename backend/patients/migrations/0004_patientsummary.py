@@ -0,0 +1,25 @@
+# Generated by Django 5.2.11 on 2026-10-17 10:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0003_directory_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PatientSummary',
+            fields=[
+                ('patient', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='patients.patientprofile')),
+                ('total_requests', models.IntegerField(default=0)),
+                ('confirmed_appointments', models.IntegerField(default=0)),
+                ('prescriptions_received', models.IntegerField(default=0)),
+                ('active_orders', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
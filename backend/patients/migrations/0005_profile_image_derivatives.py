@@ -0,0 +1,23 @@
+# Generated by Django 5.2.11 on 2026-10-17 10:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0004_patientsummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='patientprofile',
+            name='profile_image_webp',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='patient_profiles/derived/'),
+        ),
+        migrations.AddField(
+            model_name='patientprofile',
+            name='profile_thumbnail',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='patient_profiles/derived/'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.11 on 2026-10-17 10:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0005_profile_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PatientSearchGram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gram', models.CharField(max_length=3)),
+                ('patient', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='search_grams', to='patients.patientprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['gram', 'patient'], name='patient_gram_idx'), models.Index(fields=['patient'], name='patient_gram_patient_idx')],
+            },
+        ),
+    ]
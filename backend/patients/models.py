@@ -15,7 +15,47 @@ class PatientProfile(models.Model):
     state = models.CharField(max_length=100, blank=True)
     pincode = models.CharField(max_length=10, blank=True)
     profile_image = models.ImageField(upload_to='patient_profiles/', null=True, blank=True)
+    # Derived copies written by telemedicine.images.build_profile_derivatives.
+    profile_thumbnail = models.ImageField(upload_to='patient_profiles/derived/', null=True, blank=True, editable=False)
+    profile_image_webp = models.ImageField(upload_to='patient_profiles/derived/', null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['full_name', 'id'], name='patient_name_idx'),
+            models.Index(fields=['created_at', 'id'], name='patient_created_idx'),
+            models.Index(fields=['phone'], name='patient_phone_idx'),
+        ]
+
     def __str__(self):
         return self.full_name
+
+
+class PatientSummary(models.Model):
+    """Per-patient dashboard counts, kept current by ``patients.summary`` (read by primary key)."""
+
+    patient = models.OneToOneField(PatientProfile, on_delete=models.CASCADE, primary_key=True, related_name='summary')
+    total_requests = models.IntegerField(default=0)
+    confirmed_appointments = models.IntegerField(default=0)
+    prescriptions_received = models.IntegerField(default=0)
+    active_orders = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Summary for patient {self.patient_id}"
+
+
+class PatientSearchGram(models.Model):
+    """Trigram of a patient's name, phone or email, used by ``patients.search``."""
+
+    patient = models.ForeignKey(PatientProfile, on_delete=models.CASCADE, related_name='search_grams', db_index=False)
+    gram = models.CharField(max_length=3)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['gram', 'patient'], name='patient_gram_idx'),
+            models.Index(fields=['patient'], name='patient_gram_patient_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.gram!r} -> {self.patient_id}"
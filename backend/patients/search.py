@@ -0,0 +1,160 @@
+"""
+Typo-tolerant patient search for doctors.
+
+Every patient's name, phone and email are broken into trigrams stored in
+``PatientSearchGram`` with an index on ``(gram, patient)``. A query looks up
+its own trigrams, keeps the patients sharing enough of them, and ranks those
+candidates by trigram similarity with a boost for prefix matches. Prefix
+matches on the indexed name/phone/email columns are merged in so the first
+one or two typed characters already autocomplete.
+
+Only the query's rarest trigrams are aggregated. Each gram's document
+frequency is counted with a scan capped at PATIENT_SEARCH_GRAM_CAP rows and
+cached for a while. Grams that reach the cap (``  a``, ``an ``) are dropped and
+at most PATIENT_SEARCH_MAX_GRAMS of the rest are used, so a search reads at
+most MAX_GRAMS x GRAM_CAP postings however large the patient table grows.
+"""
+
+import math
+import re
+import unicodedata
+
+from django.conf import settings
+from django.db.models import Count, Q
+
+from accounts.caching import TTLCache
+
+from .models import PatientProfile, PatientSearchGram
+
+_NON_WORD = re.compile(r'[^0-9a-z]+')
+
+# gram -> number of patients having it, counted up to PATIENT_SEARCH_GRAM_CAP.
+_gram_frequency = TTLCache(maxsize=50000, ttl=getattr(settings, 'PATIENT_SEARCH_GRAM_CACHE_TTL', 600))
+
+
+def normalize(text):
+    """Lowercase, strip accents and collapse everything but letters/digits to single spaces."""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return _NON_WORD.sub(' ', text.lower()).strip()
+
+
+def trigrams(text):
+    """Trigrams of each word, padded like pg_trgm so word starts weigh more."""
+    grams = set()
+    for word in normalize(text).split():
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _patient_terms(full_name, phone, email):
+    digits = re.sub(r'\D', '', phone or '')
+    return [full_name or '', digits, (email or '').split('@')[0]]
+
+
+def patient_grams(full_name, phone, email):
+    grams = set()
+    for term in _patient_terms(full_name, phone, email):
+        grams |= trigrams(term)
+    return grams
+
+
+def index_patients(patients):
+    """(Re)build the trigram rows for ``patients`` (profiles with ``user`` loaded)."""
+    patients = list(patients)
+    if not patients:
+        return
+    PatientSearchGram.objects.filter(patient__in=patients).delete()
+    PatientSearchGram.objects.bulk_create(
+        [
+            PatientSearchGram(patient_id=patient.id, gram=gram)
+            for patient in patients
+            for gram in patient_grams(patient.full_name, patient.phone, patient.user.email)
+        ],
+        batch_size=1000,
+    )
+
+
+def index_patient(patient):
+    index_patients([patient])
+
+
+def _similarity(query_grams, text):
+    text_grams = trigrams(text)
+    if not query_grams or not text_grams:
+        return 0.0
+    return len(query_grams & text_grams) / len(query_grams | text_grams)
+
+
+def _score(query, query_grams, patient):
+    best = 0.0
+    for term in _patient_terms(patient.full_name, patient.phone, patient.user.email):
+        normalized = normalize(term)
+        if not normalized:
+            continue
+        score = _similarity(query_grams, normalized)
+        if normalized == query:
+            score += 2
+        elif normalized.startswith(query) or any(word.startswith(query) for word in normalized.split()):
+            score += 1
+        best = max(best, score)
+    return best
+
+
+def gram_frequency(gram, cap):
+    """Patients having ``gram``, counted with an index range scan that stops at ``cap``."""
+    frequency = _gram_frequency.get(gram)
+    if frequency is None:
+        frequency = PatientSearchGram.objects.filter(gram=gram).values('id')[:cap].count()
+        if frequency:  # an unseen gram is cheap to recount and may belong to the next new patient
+            _gram_frequency.set(gram, frequency)
+    return frequency
+
+
+def selective_grams(query_grams):
+    """The query's rarest grams, leaving out the ones too common to narrow the search."""
+    cap = getattr(settings, 'PATIENT_SEARCH_GRAM_CAP', 2000)
+    frequencies = {gram: gram_frequency(gram, cap) for gram in query_grams}
+    # Grams no patient has (typos) cannot match anything either.
+    rare = sorted((gram for gram, frequency in frequencies.items() if 0 < frequency < cap), key=lambda gram: (frequencies[gram], gram))
+    return rare[:getattr(settings, 'PATIENT_SEARCH_MAX_GRAMS', 8)]
+
+
+def search_patients(term, limit=None):
+    """Return up to ``limit`` patient profiles best matching ``term``, best first."""
+    limit = limit or getattr(settings, 'PATIENT_SEARCH_LIMIT', 10)
+    query = normalize(term)
+    if not query:
+        return []
+
+    raw = term.strip()
+    digits = re.sub(r'\D', '', raw)
+    # Separate prefix queries so each one is a range scan on its own index.
+    prefix_filters = [Q(full_name__istartswith=raw), Q(user__email__istartswith=raw)]
+    if digits and len(digits) == len(re.sub(r'\s', '', raw)):
+        prefix_filters.append(Q(phone__startswith=digits))
+    candidate_ids = []
+    for prefix in prefix_filters:
+        candidate_ids.extend(
+            PatientProfile.objects.filter(prefix).order_by().values_list('id', flat=True)[:limit]
+        )
+
+    query_grams = trigrams(query)
+    grams = selective_grams(query_grams) if len(query) >= 3 else []
+    if grams:
+        # Require a share of the grams so one of them alone does not pull in every patient having it.
+        needed = max(1, math.ceil(len(grams) * getattr(settings, 'PATIENT_SEARCH_MIN_OVERLAP', 0.4)))
+        matches = (
+            PatientSearchGram.objects.filter(gram__in=grams)
+            .values('patient_id')
+            .annotate(hits=Count('id'))
+            .filter(hits__gte=needed)
+            .order_by('-hits', 'patient_id')
+            .values_list('patient_id', flat=True)[:getattr(settings, 'PATIENT_SEARCH_CANDIDATES', 200)]
+        )
+        candidate_ids.extend(matches)
+
+    candidates = PatientProfile.objects.filter(id__in=set(candidate_ids)).select_related('user')
+    ranked = sorted(candidates, key=lambda patient: (-_score(query, query_grams, patient), patient.full_name, patient.id))
+    return ranked[:limit]
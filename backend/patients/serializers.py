@@ -1,27 +1,34 @@
 from rest_framework import serializers
 import base64
 from django.core.files.base import ContentFile
+from telemedicine.media import media_url
 from .models import PatientProfile
 
 
 class PatientProfileSerializer(serializers.ModelSerializer):
     email = serializers.SerializerMethodField()
     profile_image = serializers.SerializerMethodField()
+    profile_image_thumbnail = serializers.SerializerMethodField()
+    profile_image_webp = serializers.SerializerMethodField()
     
     class Meta:
         model = PatientProfile
-        fields = ('id', 'full_name', 'email', 'phone', 'gender', 'age', 'address', 'city', 'state', 'pincode', 'profile_image', 'created_at')
+        fields = ('id', 'full_name', 'email', 'phone', 'gender', 'age', 'address', 'city', 'state', 'pincode', 'profile_image',
+                  'profile_image_thumbnail', 'profile_image_webp', 'created_at')
         read_only_fields = ('email', 'created_at', 'id')
     
     def get_email(self, obj):
         return obj.user.email
     
     def get_profile_image(self, obj):
-        if obj.profile_image:
-            # Return just the relative URL path, not the absolute URL
-            # This allows the frontend to use it correctly
-            return obj.profile_image.url
-        return None
+        # A relative, signed URL: the frontend prefixes the host, and <img> requests carry no token.
+        return media_url(obj.profile_image)
+
+    def get_profile_image_thumbnail(self, obj):
+        return media_url(obj.profile_thumbnail)
+
+    def get_profile_image_webp(self, obj):
+        return media_url(obj.profile_image_webp)
     
     def create(self, validated_data):
         return PatientProfile.objects.create(**validated_data)
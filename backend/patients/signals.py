@@ -0,0 +1,111 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from django.contrib.auth import get_user_model
+
+from doctors.models import Appointment, ConsultationRequest, Prescription
+from pharmacy.models import MedicineOrder
+
+from .models import PatientProfile
+from .search import index_patient
+from .summary import adjust
+
+SEARCH_FIELDS = {'full_name', 'phone'}
+
+
+def _remember(instance, field):
+    # Stored value of ``field`` so a save can detect a transition; __dict__ avoids loading a deferred field.
+    instance._summary_state = instance.__dict__.get(field) if instance.pk else ''
+
+
+def _transition(instance, field, counts):
+    """+1/-1/0 for ``counts(value)`` between the remembered and current value of ``field``."""
+    previous = getattr(instance, '_summary_state', None)
+    if previous is None or field not in instance.__dict__:
+        return 0
+    instance._summary_state = instance.__dict__[field]
+    return int(counts(instance.__dict__[field])) - int(bool(previous) and counts(previous))
+
+
+@receiver(post_save, sender=ConsultationRequest)
+def _request_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        adjust(instance.patient_id, total_requests=1)
+
+
+@receiver(post_delete, sender=ConsultationRequest)
+def _request_deleted(sender, instance, **kwargs):
+    adjust(instance.patient_id, total_requests=-1)
+
+
+@receiver(post_save, sender=Prescription)
+def _prescription_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        adjust(instance.patient_id, prescriptions_received=1)
+
+
+@receiver(post_delete, sender=Prescription)
+def _prescription_deleted(sender, instance, **kwargs):
+    adjust(instance.patient_id, prescriptions_received=-1)
+
+
+def _is_confirmed(value):
+    return value == 'confirmed'
+
+
+@receiver(post_init, sender=Appointment)
+def _appointment_loaded(sender, instance, **kwargs):
+    _remember(instance, 'status')
+
+
+@receiver(post_save, sender=Appointment)
+def _appointment_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        adjust(instance.patient_id, confirmed_appointments=_transition(instance, 'status', _is_confirmed))
+
+
+@receiver(post_delete, sender=Appointment)
+def _appointment_deleted(sender, instance, **kwargs):
+    if _is_confirmed(instance.__dict__.get('status')):
+        adjust(instance.patient_id, confirmed_appointments=-1)
+
+
+def _is_active(value):
+    return value != 'Delivered'
+
+
+@receiver(post_init, sender=MedicineOrder)
+def _order_loaded(sender, instance, **kwargs):
+    _remember(instance, 'delivery_status')
+
+
+@receiver(post_save, sender=MedicineOrder)
+def _order_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        adjust(instance.patient_id, active_orders=_transition(instance, 'delivery_status', _is_active))
+
+
+@receiver(post_delete, sender=MedicineOrder)
+def _order_deleted(sender, instance, **kwargs):
+    if instance.__dict__.get('delivery_status') not in (None, 'Delivered'):
+        adjust(instance.patient_id, active_orders=-1)
+
+
+@receiver(post_save, sender=PatientProfile)
+def _patient_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and not SEARCH_FIELDS & set(update_fields)):
+        return
+    index_patient(instance)
+
+
+@receiver(post_save, sender=get_user_model())
+def _user_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    # Only an email change affects the search index; new users have no profile yet.
+    if raw or created or instance.role != 'patient':
+        return
+    if update_fields is not None and 'email' not in update_fields:
+        return
+    profile = PatientProfile.objects.filter(user=instance).only('id', 'full_name', 'phone').first()
+    if profile:
+        profile.user = instance
+        index_patient(profile)
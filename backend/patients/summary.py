@@ -0,0 +1,94 @@
+"""
+Per-patient dashboard summary.
+
+Each patient has one ``PatientSummary`` row holding the four dashboard counts.
+The signal handlers in ``patients.signals`` adjust it with ``F()`` updates when
+consultation requests, appointments, prescriptions and medicine orders are
+created, change status or are deleted; paths that use ``bulk_create`` call
+``adjust`` themselves. Reads go through the Django cache and fall back to one
+primary-key query; a missing row is built from the source tables on first read.
+
+Cache entries are dropped when the surrounding transaction commits. With
+several worker processes use a shared cache backend (PATIENT_SUMMARY_CACHE_ALIAS)
+so every process sees the invalidation; the TTL bounds staleness otherwise.
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import PatientSummary
+
+SUMMARY_FIELDS = ('total_requests', 'confirmed_appointments', 'prescriptions_received', 'active_orders')
+
+
+def _cache():
+    return caches[getattr(settings, 'PATIENT_SUMMARY_CACHE_ALIAS', 'default')]
+
+
+def _cache_key(patient_id):
+    return f'patient-summary:{patient_id}'
+
+
+def invalidate(patient_id):
+    """Drop the cached summary once the current transaction commits."""
+    key = _cache_key(patient_id)
+    transaction.on_commit(lambda: _cache().delete(key))
+
+
+def adjust(patient_id, **deltas):
+    """
+    Apply ``field=delta`` changes to a patient's summary row. A patient without a
+    row yet is skipped; their row is computed in full on the next read.
+    """
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not patient_id or not deltas:
+        return
+    PatientSummary.objects.filter(pk=patient_id).update(
+        updated_at=timezone.now(),
+        **{field: F(field) + delta for field, delta in deltas.items()},
+    )
+    invalidate(patient_id)
+
+
+def compute_summary(patient_id):
+    """Exact counts from the source tables."""
+    from doctors.models import Appointment, ConsultationRequest, Prescription
+    from pharmacy.models import MedicineOrder
+
+    return {
+        'total_requests': ConsultationRequest.objects.filter(patient_id=patient_id).count(),
+        'confirmed_appointments': Appointment.objects.filter(patient_id=patient_id, status='confirmed').count(),
+        'prescriptions_received': Prescription.objects.filter(patient_id=patient_id).count(),
+        'active_orders': MedicineOrder.objects.filter(patient_id=patient_id).exclude(delivery_status='Delivered').count(),
+    }
+
+
+def rebuild_summary(patient_id):
+    values = compute_summary(patient_id)
+    PatientSummary.objects.update_or_create(patient_id=patient_id, defaults=values)
+    invalidate(patient_id)
+    return values
+
+
+def get_summary(patient_id):
+    """Return the summary dict for ``patient_id`` (cache, then one PK query)."""
+    cache = _cache()
+    key = _cache_key(patient_id)
+    summary = cache.get(key)
+    if summary is not None:
+        return summary
+
+    summary = PatientSummary.objects.filter(pk=patient_id).values(*SUMMARY_FIELDS).first()
+    if summary is None:
+        summary = compute_summary(patient_id)
+        try:
+            with transaction.atomic():
+                PatientSummary.objects.create(patient_id=patient_id, **summary)
+        except IntegrityError:
+            # Created concurrently (or the patient is gone); serve the computed counts.
+            pass
+    cache.set(key, summary, getattr(settings, 'PATIENT_SUMMARY_CACHE_TTL', 60))
+    return summary
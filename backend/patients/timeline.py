@@ -0,0 +1,167 @@
+"""
+A patient's history as one feed.
+
+Consultation requests, appointments, prescriptions, medicine orders and
+payments are projected onto the same columns and combined with ``UNION ALL``,
+ordered newest first by ``(occurred_at, kind, item_id)``. Pages are fetched
+with a keyset cursor applied inside every branch, so each page is one query
+whatever the depth.
+"""
+
+import datetime
+
+from django.db.models import CharField, DateField, DateTimeField, DecimalField, F, Q, Value
+from django.db.models.functions import Cast
+from django.utils.dateparse import parse_datetime
+
+from doctors.models import Appointment, ConsultationRequest, Prescription
+from payments.models import Payment
+from pharmacy.models import MedicineOrder
+from telemedicine.pagination import decode_cursor, encode_cursor
+
+TIMELINE_ORDERING = ('-occurred_at', '-kind', '-item_id')
+TIMELINE_KINDS = ('consultation_request', 'appointment', 'prescription', 'order', 'payment')
+# Annotation names avoid clashing with model fields (status, amount) in the branches.
+COLUMNS = ('kind', 'item_id', 'occurred_at', 'doctor_name', 'summary', 'status_value', 'amount_value', 'scheduled_date')
+
+
+def _null(output_field):
+    return Value(None, output_field=output_field)
+
+
+def _branch(queryset, kind, **columns):
+    return queryset.order_by().annotate(kind=Value(kind, output_field=CharField()), **columns)
+
+
+def _branches(patient_id):
+    return {
+        'consultation_request': _branch(
+            ConsultationRequest.objects.filter(patient_id=patient_id),
+            'consultation_request',
+            item_id=F('id'),
+            occurred_at=F('requested_at'),
+            doctor_name=F('doctor__full_name'),
+            summary=F('symptoms'),
+            status_value=F('status'),
+            amount_value=F('consultation_fee'),
+            scheduled_date=F('preferred_date'),
+        ),
+        'appointment': _branch(
+            Appointment.objects.filter(patient_id=patient_id),
+            'appointment',
+            item_id=F('id'),
+            occurred_at=F('created_at'),
+            doctor_name=F('doctor__full_name'),
+            summary=F('department__name'),
+            status_value=F('status'),
+            amount_value=_null(DecimalField()),
+            scheduled_date=F('appointment_date'),
+        ),
+        'prescription': _branch(
+            Prescription.objects.filter(patient_id=patient_id),
+            'prescription',
+            item_id=F('id'),
+            occurred_at=F('created_at'),
+            doctor_name=F('doctor__full_name'),
+            summary=F('diagnosis'),
+            status_value=Value('issued', output_field=CharField()),
+            amount_value=_null(DecimalField()),
+            scheduled_date=_null(DateField()),
+        ),
+        'order': _branch(
+            MedicineOrder.objects.filter(patient_id=patient_id),
+            'order',
+            item_id=F('id'),
+            occurred_at=Cast('order_date', DateTimeField()),
+            doctor_name=_null(CharField()),
+            summary=F('medicine_name'),
+            status_value=F('delivery_status'),
+            amount_value=F('total_price'),
+            scheduled_date=_null(DateField()),
+        ),
+        'payment': _branch(
+            Payment.objects.filter(patient__patient_profile__id=patient_id),
+            'payment',
+            item_id=F('id'),
+            occurred_at=F('created_at'),
+            doctor_name=_null(CharField()),
+            summary=F('description'),
+            status_value=F('status'),
+            amount_value=F('amount'),
+            scheduled_date=_null(DateField()),
+        ),
+    }
+
+
+def _time_filters(kind, occurred_at):
+    """``(before, equal)`` Q objects comparing a branch's timestamp with the cursor's."""
+    if kind != 'order':
+        return Q(occurred_at__lt=occurred_at), Q(occurred_at=occurred_at)
+    # Orders only carry a date (projected as midnight UTC); comparing order_date keeps
+    # the (patient, order_date) index usable.
+    occurred_at = occurred_at.astimezone(datetime.timezone.utc)
+    day = occurred_at.date()
+    if occurred_at.time() == datetime.time.min:
+        return Q(order_date__lt=day), Q(order_date=day)
+    return Q(order_date__lte=day), Q(pk__in=[])
+
+
+def _after(queryset, kind, cursor_values):
+    """Rows of one branch that sort after the cursor; ``kind`` is constant within a branch."""
+    occurred_at, cursor_kind, cursor_id = cursor_values
+    before, equal = _time_filters(kind, parse_datetime(occurred_at))
+    if kind < cursor_kind:
+        return queryset.filter(before | equal)
+    if kind > cursor_kind:
+        return queryset.filter(before)
+    return queryset.filter(before | (equal & Q(item_id__lt=cursor_id)))
+
+
+def parse_kinds(raw, allowed=TIMELINE_KINDS):
+    """
+    ``'order,payment'`` -> ``('order', 'payment')``; raises ValueError for kinds outside
+    ``allowed``. Without ``raw`` every allowed kind is returned.
+    """
+    if not raw:
+        return tuple(allowed)
+    kinds = tuple(kind.strip() for kind in raw.split(',') if kind.strip())
+    unknown = [kind for kind in kinds if kind not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown timeline kinds: {', '.join(unknown)}")
+    return kinds
+
+
+def timeline_page(patient_id, cursor=None, limit=25, kinds=None):
+    """Return ``(rows, next_cursor)`` for one page of ``patient_id``'s timeline."""
+    cursor_values = decode_cursor(cursor, TIMELINE_ORDERING) if cursor else None
+    parts = []
+    for kind, queryset in _branches(patient_id).items():
+        if kinds and kind not in kinds:
+            continue
+        if cursor_values:
+            queryset = _after(queryset, kind, cursor_values)
+        parts.append(queryset.values(*COLUMNS))
+
+    first, *rest = parts
+    feed = first.union(*rest, all=True) if rest else first
+    rows = list(feed.order_by(*TIMELINE_ORDERING)[:limit + 1])
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(TIMELINE_ORDERING, [last['occurred_at'], last['kind'], last['item_id']])
+
+    return [
+        {
+            'kind': row['kind'],
+            'id': row['item_id'],
+            'occurred_at': row['occurred_at'],
+            'doctor_name': row['doctor_name'] or '',
+            'summary': row['summary'] or '',
+            'status': row['status_value'],
+            'amount': float(row['amount_value']) if row['amount_value'] is not None else None,
+            'scheduled_date': row['scheduled_date'],
+        }
+        for row in rows
+    ], next_cursor
@@ -10,8 +10,11 @@ from .views import (
     patient_profile_detail,
     patient_profile_list,
     patient_profile_update,
+    patient_profile_image,
     place_order,
+    prescription_cart,
     prescriptions,
+    timeline,
 )
 
 urlpatterns = [
@@ -22,9 +25,12 @@ urlpatterns = [
     path('consultation-requests/', consultation_requests_list, name='patient-consultation-requests-list'),
     path('confirmed-appointments/', confirmed_appointments, name='patient-confirmed-appointments'),
     path('prescriptions/', prescriptions, name='patient-prescriptions'),
+    path('prescriptions/<int:pk>/cart/', prescription_cart, name='patient-prescription-cart'),
+    path('timeline/', timeline, name='patient-timeline'),
     path('place-order/', place_order, name='patient-place-order'),
     path('my-orders/', my_orders, name='patient-my-orders'),
     path('orders/', my_orders, name='patient-orders'),
     path('profile/', patient_profile, name='patient-profile'),
     path('profile/update/', patient_profile_update, name='patient-profile-update'),
+    path('profile/image/', patient_profile_image, name='patient-profile-image'),
 ]
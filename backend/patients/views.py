@@ -2,29 +2,63 @@ from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
+from django.db import transaction
 from django.utils import timezone
+from accounts.auth import forget_identity, resolve_identity
+from telemedicine.events import ADMIN_CHANNEL, doctor_channel, publish_on_commit
+from telemedicine.media import media_url
+from telemedicine.pagination import CursorError, page_params, paginate_request, wants_page
+from telemedicine.images import (
+    ImageRejected,
+    apply_profile_image,
+    clear_profile_image,
+    limit_uploads,
+    read_profile_image,
+    save_profile_image,
+)
+from doctors.assignment import claim_doctor
 from doctors.models import Appointment, ConsultationRequest, Department, DoctorProfile, Prescription
 from pharmacy.models import MedicineOrder, MedicineStock
+from pharmacy.prescription_cart import build_cart
 from .models import PatientProfile
 from .serializers import PatientProfileSerializer
+from .timeline import TIMELINE_KINDS, parse_kinds, timeline_page
+from .summary import adjust as adjust_summary, get_summary
 from decimal import Decimal
+import uuid
 
 DEFAULT_CONSULTATION_FEE = Decimal('300')
 
-def _get_patient_profile(request):
+def _get_patient_id(request):
+    """Resolve the calling patient's profile id from the access token (or legacy email)."""
     email = request.GET.get('email') or request.data.get('email')
-    if not email:
+    identity = resolve_identity(request, email)
+    if not identity or identity.role != 'patient':
+        return None
+    return identity.profile_id
+
+
+def _get_patient_profile(request):
+    patient_id = _get_patient_id(request)
+    if not patient_id:
         return None
-    return PatientProfile.objects.select_related('user').filter(user__email=email).first()
+    return PatientProfile.objects.select_related('user').filter(pk=patient_id).first()
 
 
 @api_view(['GET', 'POST'])
 def patient_profile_list(request):
     """List or create patient profiles."""
     if request.method == 'GET':
-        profiles = PatientProfile.objects.all()
-        serializer = PatientProfileSerializer(profiles, many=True)
-        return Response(serializer.data)
+        profiles = PatientProfile.objects.select_related('user')
+        if not wants_page(request):
+            serializer = PatientProfileSerializer(profiles, many=True)
+            return Response(serializer.data)
+
+        try:
+            page, page_info = paginate_request(request, profiles, ('id',))
+        except CursorError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'results': PatientProfileSerializer(page, many=True).data, **page_info})
 
     serializer = PatientProfileSerializer(data=request.data)
     if serializer.is_valid():
@@ -52,36 +86,24 @@ def patient_profile_detail(request, pk):
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    forget_identity(profile.user.email)
     profile.delete()
     return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 @api_view(['GET'])
 def dashboard_summary(request):
-    patient = _get_patient_profile(request)
-    if not patient:
+    patient_id = _get_patient_id(request)
+    if not patient_id:
         return Response({'detail': 'Patient email is required.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    total_requests = ConsultationRequest.objects.filter(patient=patient).count()
-    confirmed_appointments = Appointment.objects.filter(patient=patient, status='confirmed').count()
-    prescriptions_received = Prescription.objects.filter(patient=patient).count()
-
-    active_orders = MedicineOrder.objects.filter(patient_name__iexact=patient.full_name).exclude(
-        delivery_status='Delivered'
-    ).count()
-
-    return Response({
-        'total_requests': total_requests,
-        'confirmed_appointments': confirmed_appointments,
-        'prescriptions_received': prescriptions_received,
-        'active_orders': active_orders,
-    })
+    return Response(get_summary(patient_id))
 
 
 @api_view(['POST'])
 def consultation_request(request):
-    patient = _get_patient_profile(request)
-    if not patient:
+    patient_id = _get_patient_id(request)
+    if not patient_id:
         return Response({'detail': 'Patient email is required.'}, status=status.HTTP_400_BAD_REQUEST)
 
     department_name = request.data.get('department')
@@ -98,26 +120,13 @@ def consultation_request(request):
     if not department:
         return Response({'detail': 'Department not found.'}, status=status.HTTP_404_NOT_FOUND)
 
-    # If doctor_id is provided, use it; otherwise get the first available doctor
-    if doctor_id:
-        try:
-            doctor = DoctorProfile.objects.get(id=doctor_id, department=department)
-        except DoctorProfile.DoesNotExist:
-            return Response({'detail': 'Doctor not found in the selected department.'}, status=status.HTTP_404_NOT_FOUND)
-    else:
-        doctor = DoctorProfile.objects.filter(department=department).first()
-
-    if not doctor:
-        return Response({'detail': 'No doctor available for this department.'}, status=status.HTTP_404_NOT_FOUND)
-
     try:
         consultation_fee = Decimal(str(fee)) if fee is not None else DEFAULT_CONSULTATION_FEE
     except (ValueError, TypeError):
         consultation_fee = DEFAULT_CONSULTATION_FEE
 
-    request_obj = ConsultationRequest.objects.create(
-        patient=patient,
-        doctor=doctor,
+    request_obj = ConsultationRequest(
+        patient_id=patient_id,
         symptoms=symptoms,
         preferred_date=preferred_date or None,
         preferred_time=preferred_time or None,
@@ -126,9 +135,39 @@ def consultation_request(request):
         payment_status='Pending',
     )
 
+    # If doctor_id is provided, use it; otherwise assign the least-loaded doctor of the department
+    if doctor_id:
+        if not DoctorProfile.objects.filter(id=doctor_id, department=department).exists():
+            return Response({'detail': 'Doctor not found in the selected department.'}, status=status.HTTP_404_NOT_FOUND)
+        request_obj.doctor_id = doctor_id
+        request_obj.save()
+    else:
+        with transaction.atomic():
+            request_obj.doctor_id = claim_doctor(department)
+            if not request_obj.doctor_id:
+                return Response({'detail': 'No doctor available for this department.'}, status=status.HTTP_404_NOT_FOUND)
+            request_obj._queue_claimed = True
+            request_obj.save()
+
+    publish_on_commit(
+        [doctor_channel(request_obj.doctor_id), ADMIN_CHANNEL],
+        'consultation.requested',
+        {
+            'id': request_obj.id,
+            'patient_id': patient_id,
+            'doctor_id': request_obj.doctor_id,
+            'department': department.name,
+            'symptoms': request_obj.symptoms,
+            'preferred_date': request_obj.preferred_date,
+            'preferred_time': request_obj.preferred_time,
+            'status': request_obj.status,
+            'consultation_fee': str(request_obj.consultation_fee),
+        },
+    )
     return Response(
         {
             'id': request_obj.id,
+            'doctor_id': request_obj.doctor_id,
             'status': request_obj.status,
             'consultation_fee': str(request_obj.consultation_fee),
             'payment_status': request_obj.payment_status,
@@ -139,11 +178,11 @@ def consultation_request(request):
 
 @api_view(['GET'])
 def confirmed_appointments(request):
-    patient = _get_patient_profile(request)
-    if not patient:
+    patient_id = _get_patient_id(request)
+    if not patient_id:
         return Response({'detail': 'Patient email is required.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    appointments = Appointment.objects.filter(patient=patient, status='confirmed').select_related(
+    appointments = Appointment.objects.filter(patient_id=patient_id, status='confirmed').select_related(
         'doctor', 'department'
     )
     data = [
@@ -162,11 +201,11 @@ def confirmed_appointments(request):
 
 @api_view(['GET'])
 def consultation_requests_list(request):
-    patient = _get_patient_profile(request)
-    if not patient:
+    patient_id = _get_patient_id(request)
+    if not patient_id:
         return Response({'detail': 'Patient email is required.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    requests = ConsultationRequest.objects.filter(patient=patient).select_related('doctor', 'doctor__department').order_by('-requested_at')
+    requests = ConsultationRequest.objects.filter(patient_id=patient_id).select_related('doctor', 'doctor__department').order_by('-requested_at')
     data = [
         {
             'id': req.id,
@@ -185,13 +224,62 @@ def consultation_requests_list(request):
     return Response(data)
 
 
+def timeline_response(request, patient_id, allowed_kinds=TIMELINE_KINDS):
+    """
+    Shared by the patient's own timeline and a doctor's view of a patient's chart.
+    ``kinds`` outside ``allowed_kinds`` are rejected, so a caller cannot widen its view.
+    """
+    try:
+        kinds = parse_kinds(request.GET.get('kinds'), allowed_kinds)
+        cursor, limit = page_params(request)
+        rows, next_cursor = timeline_page(patient_id, cursor=cursor, limit=limit, kinds=kinds)
+    except (CursorError, ValueError) as exc:
+        return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({'results': rows, 'next_cursor': next_cursor, 'limit': limit})
+
+
+@api_view(['GET'])
+def timeline(request):
+    """
+    The patient's requests, appointments, prescriptions, orders and payments, newest
+    first, one page per call. Pass ``next_cursor`` back as ``cursor``; ``kinds``
+    (comma-separated) narrows the feed.
+    """
+    patient_id = _get_patient_id(request)
+    if not patient_id:
+        return Response({'detail': 'Patient email is required.'}, status=status.HTTP_400_BAD_REQUEST)
+    return timeline_response(request, patient_id)
+
+
+@api_view(['GET'])
+def prescription_cart(request, pk):
+    """
+    The patient's prescription resolved against pharmacy stock: one priced line per
+    medicine (ready to post to ``place-order/``) plus the lines that matched nothing.
+    """
+    patient_id = _get_patient_id(request)
+    if not patient_id:
+        return Response({'detail': 'Patient email is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    prescription = Prescription.objects.filter(pk=pk, patient_id=patient_id).only('id', 'medicines').first()
+    if not prescription:
+        return Response({'detail': 'Prescription not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+    cart = build_cart(prescription.medicines)
+    return Response({'prescription_id': prescription.id, **cart})
+
+
+def _prescription_pdf_url(prescription):
+    return media_url(prescription.pdf or prescription.generated_pdf) or ''
+
+
 @api_view(['GET'])
 def prescriptions(request):
-    patient = _get_patient_profile(request)
-    if not patient:
+    patient_id = _get_patient_id(request)
+    if not patient_id:
         return Response({'detail': 'Patient email is required.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    prescriptions_qs = Prescription.objects.filter(patient=patient).select_related('doctor').order_by('-created_at')
+    prescriptions_qs = Prescription.objects.filter(patient_id=patient_id).select_related('doctor').order_by('-created_at')
     data = [
         {
             'id': prescription.id,
@@ -199,55 +287,121 @@ def prescriptions(request):
             'date_issued': prescription.created_at,
             'medicines': prescription.medicines,
             'notes': prescription.notes,
-            'pdf': prescription.pdf.url if prescription.pdf else '',
+            # The doctor's own upload wins; otherwise the generated PDF once the worker has rendered it.
+            'pdf': _prescription_pdf_url(prescription),
+            'pdf_status': 'ready' if prescription.generated_pdf else 'pending',
         }
         for prescription in prescriptions_qs
     ]
     return Response(data)
 
 
+def _parse_cart(items):
+    """
+    Validate the shape of each cart line. Returns ``(lines, errors)`` where lines are
+    ``(index, medicine_id, quantity)`` tuples and errors are per-item dicts.
+    """
+    lines = []
+    errors = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors.append({'index': index, 'detail': 'Each item must be an object.'})
+            continue
+        medicine_id = item.get('medicine_id')
+        try:
+            medicine_id = int(medicine_id)
+            quantity = int(item.get('quantity', 1))
+        except (TypeError, ValueError):
+            errors.append({'index': index, 'medicine_id': medicine_id, 'detail': 'medicine_id and quantity must be integers.'})
+            continue
+        if quantity < 1:
+            errors.append({'index': index, 'medicine_id': medicine_id, 'detail': 'quantity must be at least 1.'})
+            continue
+        lines.append((index, medicine_id, quantity))
+    return lines, errors
+
+
 @api_view(['POST'])
 def place_order(request):
-    patient = _get_patient_profile(request)
-    if not patient:
+    """
+    Place a cart of medicine orders. All items are validated first (known medicine,
+    enough stock for the cart's total quantity per medicine); if any item fails,
+    nothing is created and the response lists the per-item errors.
+    """
+    patient_id = _get_patient_id(request)
+    if not patient_id:
         return Response({'detail': 'Patient email is required.'}, status=status.HTTP_400_BAD_REQUEST)
 
     items = request.data.get('items', [])
     if not isinstance(items, list) or not items:
         return Response({'detail': 'items list is required.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    created_orders = []
-    for item in items:
-        medicine_id = item.get('medicine_id')
-        quantity = int(item.get('quantity', 1))
-
-        try:
-            medicine = MedicineStock.objects.get(pk=medicine_id)
-        except MedicineStock.DoesNotExist:
-            continue
+    lines, errors = _parse_cart(items)
+    patient = PatientProfile.objects.only('id', 'full_name').filter(pk=patient_id).first()
+    if not patient:
+        return Response({'detail': 'Patient profile not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+    with transaction.atomic():
+        # The stock rows stay locked until commit, so the check below still holds when the orders are written.
+        medicines = {
+            medicine.id: medicine
+            for medicine in MedicineStock.objects.select_for_update()
+            .filter(pk__in={medicine_id for _, medicine_id, _ in lines})
+            .order_by('pk')
+        }
 
-        total_price = medicine.price * quantity
-        order = MedicineOrder.objects.create(
-            patient_name=patient.full_name,
-            medicine=medicine,
-            medicine_name=medicine.name,
-            quantity=quantity,
-            total_price=total_price,
-            payment_status='Pending',
-            delivery_status='Pending',
-        )
-        created_orders.append(order.id)
+        requested = {}
+        for _, medicine_id, quantity in lines:
+            requested[medicine_id] = requested.get(medicine_id, 0) + quantity
+        for index, medicine_id, quantity in lines:
+            medicine = medicines.get(medicine_id)
+            if medicine is None:
+                errors.append({'index': index, 'medicine_id': medicine_id, 'detail': 'Medicine not found.'})
+            elif medicine.available_quantity < requested[medicine_id]:
+                errors.append({
+                    'index': index,
+                    'medicine_id': medicine_id,
+                    'detail': f'Insufficient stock for {medicine.name}.',
+                    'available_quantity': medicine.available_quantity,
+                })
+        if errors:
+            errors.sort(key=lambda error: error['index'])
+            return Response({'detail': 'Some items could not be ordered; nothing was placed.', 'errors': errors},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        checkout = uuid.uuid4()
+        orders = MedicineOrder.objects.bulk_create([
+            MedicineOrder(
+                patient=patient,
+                patient_name=patient.full_name,
+                medicine=medicines[medicine_id],
+                medicine_name=medicines[medicine_id].name,
+                quantity=quantity,
+                total_price=medicines[medicine_id].price * quantity,
+                payment_status='Pending',
+                delivery_status='Pending',
+                checkout=checkout,
+            )
+            for _, medicine_id, quantity in lines
+        ])
+        if orders[0].pk is None:
+            # MySQL does not return primary keys from bulk inserts; the checkout key marks this request's rows.
+            created_orders = list(MedicineOrder.objects.filter(checkout=checkout).order_by('id').values_list('id', flat=True))
+        else:
+            created_orders = [order.pk for order in orders]
+        # bulk_create skips post_save, so the dashboard summary is adjusted here.
+        adjust_summary(patient.id, active_orders=len(orders))
 
     return Response({'orders': created_orders}, status=status.HTTP_201_CREATED)
 
 
 @api_view(['GET'])
 def my_orders(request):
-    patient = _get_patient_profile(request)
-    if not patient:
+    patient_id = _get_patient_id(request)
+    if not patient_id:
         return Response({'detail': 'Patient email is required.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    orders = MedicineOrder.objects.filter(patient_name__iexact=patient.full_name).order_by('-order_date')
+    orders = MedicineOrder.objects.filter(patient_id=patient_id).order_by('-order_date', '-id')
     data = [
         {
             'id': order.id,
@@ -275,13 +429,22 @@ def patient_profile(request):
 
 @api_view(['POST'])
 def patient_profile_update(request):
+    try:
+        upload_limit = limit_uploads(request)
+    except ImageRejected as exc:
+        return Response({'detail': str(exc)}, status=exc.status_code)
+
     patient = _get_patient_profile(request)
     if not patient:
         return Response({'detail': 'Patient email is required.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Get the image data if provided
-    image_data = request.data.get('profile_image')
-    
+    if upload_limit.exceeded:
+        return Response({'detail': 'Image is too large.'}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+    try:
+        image = read_profile_image(request.data.get('profile_image'))
+    except ImageRejected as exc:
+        return Response({'detail': str(exc)}, status=exc.status_code)
+
     # Only update profile fields that are provided, don't touch name/phone etc if not changing
     if 'name' in request.data:
         patient.full_name = request.data.get('name')
@@ -291,37 +454,46 @@ def patient_profile_update(request):
         patient.age = request.data.get('age')
     if 'gender' in request.data:
         patient.gender = request.data.get('gender')
-    
-    # Handle image upload
-    if image_data is not None:  # Check if image_data is in the request
-        if image_data and image_data != 'null' and image_data != '':
-            # Check if it's a base64 string
-            if isinstance(image_data, str) and image_data.startswith('data:image'):
-                # Extract base64 string and create file
-                import base64
-                from django.core.files.base import ContentFile
-                
-                try:
-                    format_part, imgstr = image_data.split(';base64,')
-                    ext = format_part.split('/')[-1]
-                    decoded_data = base64.b64decode(imgstr)
-                    from django.utils.text import slugify
-                    file_name = f"patient_{patient.id}_{slugify(patient.full_name)}.{ext}"
-                    patient.profile_image.save(file_name, ContentFile(decoded_data), save=False)
-                except Exception as e:
-                    return Response({'detail': f'Error processing image: {str(e)}'}, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                # Handle file upload
-                patient.profile_image = image_data
-        else:
-            # Remove image if empty/null
-            if patient.profile_image:
-                patient.profile_image.delete()
-            patient.profile_image = None
-    
-    patient.save()
+
+    with transaction.atomic():
+        patient.save()
+        apply_profile_image(patient, image, 'patient')
 
     # Return updated profile with image URL
     serializer = PatientProfileSerializer(patient, context={'request': request})
     return Response(serializer.data)
 
+
+@api_view(['POST', 'DELETE'])
+def patient_profile_image(request):
+    """
+    Upload (multipart field ``image``) or remove the patient's profile image. The file is
+    streamed to disk with a size limit; thumbnail and WebP copies are built in the background.
+    """
+    try:
+        upload_limit = limit_uploads(request)
+    except ImageRejected as exc:
+        return Response({'detail': str(exc)}, status=exc.status_code)
+
+    patient = _get_patient_profile(request)
+    if not patient:
+        return Response({'detail': 'Patient email is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    if request.method == 'DELETE':
+        with transaction.atomic():
+            clear_profile_image(patient)
+    else:
+        upload = request.FILES.get('image')
+        if upload_limit.exceeded:
+            return Response({'detail': 'Image is too large.'}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        if upload is None:
+            return Response({'detail': 'image file is required.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            with transaction.atomic():
+                save_profile_image(patient, upload, 'patient')
+        except ImageRejected as exc:
+            return Response({'detail': str(exc)}, status=exc.status_code)
+
+    serializer = PatientProfileSerializer(patient, context={'request': request})
+    return Response(serializer.data)
+
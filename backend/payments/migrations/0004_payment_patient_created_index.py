@@ -0,0 +1,26 @@
+# Generated by Django 5.2.11 on 2026-10-17 11:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0003_payment_description_payment_related_id'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Add the covering index before dropping the FK's own: MySQL needs one on the column.
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['patient', 'created_at', 'id'], name='payment_patient_created_idx'),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='patient',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='payments', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -13,7 +13,12 @@ class Payment(models.Model):
 		('failed', 'Failed'),
 	]
 
-	patient = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='payments')
+	patient = models.ForeignKey(
+		settings.AUTH_USER_MODEL,
+		on_delete=models.CASCADE,
+		related_name='payments',
+		db_index=False,  # covered by payment_patient_created_idx
+	)
 	payment_type = models.CharField(max_length=20, choices=PAYMENT_TYPE_CHOICES)
 	amount = models.DecimalField(max_digits=10, decimal_places=2)
 	status = models.CharField(max_length=10, choices=STATUS_CHOICES)
@@ -23,5 +28,11 @@ class Payment(models.Model):
 	description = models.TextField(blank=True)
 	created_at = models.DateTimeField(auto_now_add=True)
 
+	class Meta:
+		indexes = [
+			# A patient's payments newest first, in keyset pages (payments_list).
+			models.Index(fields=['patient', 'created_at', 'id'], name='payment_patient_created_idx'),
+		]
+
 	def __str__(self):
 		return f"{self.patient} - {self.payment_type} - {self.amount}"
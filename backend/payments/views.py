@@ -1,29 +1,29 @@
 from decimal import Decimal
 
-import razorpay
 import logging
 from django.conf import settings
-from django.contrib.auth import get_user_model
 from django.db import transaction
 from django.db.models import Sum
 from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
+from accounts.auth import resolve_identity
+from accounts.outbox import enqueue_email
 from doctors.models import ConsultationRequest
 from patients.models import PatientProfile
 from pharmacy.models import MedicineOrder, MedicineStock
+from telemedicine.events import ADMIN_CHANNEL, PHARMACY_CHANNEL, doctor_channel, patient_channel, publish_on_commit
+from telemedicine.pagination import CursorError, paginate_request, wants_page
 from .models import Payment
 
-User = get_user_model()
 logger = logging.getLogger(__name__)
 
 
 def _get_patient_user(request):
+	"""Resolve the paying user's identity (id, role, email) from the access token or legacy email."""
 	email = request.data.get('email') or request.data.get('patient_email') or request.GET.get('email')
-	if not email:
-		return None
-	return User.objects.filter(email=email).first()
+	return resolve_identity(request, email)
 
 
 def _get_razorpay_client():
@@ -31,17 +31,15 @@ def _get_razorpay_client():
 	key_secret = getattr(settings, 'RAZORPAY_KEY_SECRET', None)
 	if not key_id or not key_secret:
 		return None
+	# Imported on first use: the SDK pulls in requests/urllib3 and is only needed for checkout.
+	import razorpay
 	return razorpay.Client(auth=(key_id, key_secret))
 
 
 def _send_payment_notification_email(payment_id, consultation_id):
 	"""
-	Send payment notification email to admin when consultation payment is successful.
+	Queue payment notification email to admin when consultation payment is successful.
 	"""
-	from django.core.mail import EmailMessage
-	import logging
-	
-	logger = logging.getLogger(__name__)
 	
 	try:
 		payment = Payment.objects.filter(id=payment_id).first()
@@ -94,30 +92,24 @@ def _send_payment_notification_email(payment_id, consultation_id):
 			f"Smart Telemedicine System"
 		)
 		
-		email = EmailMessage(
+		queued = enqueue_email(
 			subject=subject,
 			body=message,
 			from_email=from_email,
 			to=[admin_email],
 			reply_to=[from_email],
 		)
-		
-		sent = email.send(fail_silently=False)
-		logger.info(f"Payment notification email sent to {admin_email}: {sent}")
+		logger.info(f"Payment notification email to {admin_email} queued as outbox message {queued.id}")
 		return True
 	except Exception as e:
-		logger.error(f"Failed to send payment notification email: {str(e)}", exc_info=True)
+		logger.error(f"Failed to queue payment notification email: {str(e)}", exc_info=True)
 		return False
 
 
 def _send_pharmacy_order_notification_email(payment_id, order_ids):
 	"""
-	Send payment notification email to admin when pharmacy order payment is successful.
+	Queue payment notification email to admin when pharmacy order payment is successful.
 	"""
-	from django.core.mail import EmailMessage
-	import logging
-	
-	logger = logging.getLogger(__name__)
 	
 	try:
 		logger.info(f"Starting pharmacy order email: payment_id={payment_id}, order_ids={order_ids}")
@@ -183,21 +175,17 @@ def _send_pharmacy_order_notification_email(payment_id, order_ids):
 			f"Smart Telemedicine System"
 		)
 		
-		logger.info(f"About to send email to {admin_email}")
-		
-		email = EmailMessage(
+		queued = enqueue_email(
 			subject=subject,
 			body=message,
 			from_email=from_email,
 			to=[admin_email],
 			reply_to=[from_email],
 		)
-		
-		sent = email.send(fail_silently=False)
-		logger.info(f"Pharmacy order notification email sent to {admin_email} with result: {sent}")
+		logger.info(f"Pharmacy order notification email to {admin_email} queued as outbox message {queued.id}")
 		return True
 	except Exception as e:
-		logger.error(f"Failed to send pharmacy order notification email: {str(e)}", exc_info=True)
+		logger.error(f"Failed to queue pharmacy order notification email: {str(e)}", exc_info=True)
 		return False
 
 
@@ -225,28 +213,35 @@ def payments_summary(request):
 	})
 
 
+def _payment_row(payment):
+	return {
+		'id': payment.id,
+		'payment_type': payment.payment_type,
+		'amount': float(payment.amount),
+		'status': payment.status,
+		'razorpay_order_id': payment.razorpay_order_id,
+		'razorpay_payment_id': payment.razorpay_payment_id,
+		'related_id': payment.related_id,
+		'description': payment.description,
+		'created_at': payment.created_at,
+	}
+
+
 @api_view(['GET'])
 def payments_list(request):
 	user = _get_patient_user(request)
 	if not user:
 		return Response({'detail': 'Patient email is required.'}, status=status.HTTP_400_BAD_REQUEST)
 
-	payments = Payment.objects.filter(patient=user).order_by('-created_at')
-	data = [
-		{
-			'id': payment.id,
-			'payment_type': payment.payment_type,
-			'amount': float(payment.amount),
-			'status': payment.status,
-			'razorpay_order_id': payment.razorpay_order_id,
-			'razorpay_payment_id': payment.razorpay_payment_id,
-			'related_id': payment.related_id,
-			'description': payment.description,
-			'created_at': payment.created_at,
-		}
-		for payment in payments
-	]
-	return Response(data)
+	payments = Payment.objects.filter(patient_id=user.user_id)
+	if not wants_page(request):
+		return Response([_payment_row(payment) for payment in payments.order_by('-created_at')])
+
+	try:
+		page, page_info = paginate_request(request, payments, ('-created_at', '-id'))
+	except CursorError as e:
+		return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+	return Response({'results': [_payment_row(payment) for payment in page], **page_info})
 
 
 @api_view(['POST'])
@@ -356,7 +351,7 @@ def verify_payment(request):
 			description = f"Medicine Order Payment"
 
 		payment = Payment.objects.create(
-			patient=user,
+			patient_id=user.user_id,
 			payment_type=payment_type,
 			amount=amount_decimal,
 			status=status_value,
@@ -379,6 +374,11 @@ def verify_payment(request):
 			consultation.payment_status = 'Paid'
 			consultation.save(update_fields=['payment_status'])
 			payment_id_to_notify = payment.id
+			publish_on_commit(
+				[patient_channel(consultation.patient_id), doctor_channel(consultation.doctor_id), ADMIN_CHANNEL],
+				'consultation.paid',
+				{'id': consultation.id, 'payment_status': 'Paid', 'payment_id': payment.id, 'amount': str(payment.amount)},
+			)
 
 		else:  # pharmacy payment
 			items = request.data.get('items')
@@ -391,7 +391,7 @@ def verify_payment(request):
 					return Response({'detail': 'related_id (medicine id) is required.'}, status=status.HTTP_400_BAD_REQUEST)
 				items = [{'medicine_id': medicine_id, 'quantity': quantity}]
 
-			patient_profile = PatientProfile.objects.filter(user=user).first()
+			patient_profile = PatientProfile.objects.filter(user_id=user.user_id).only('id', 'full_name').first()
 			patient_name = patient_profile.full_name if patient_profile else user.email
 
 			for item in items:
@@ -410,6 +410,7 @@ def verify_payment(request):
 
 				total_price = medicine.price * quantity
 				order = MedicineOrder.objects.create(
+					patient=patient_profile,
 					patient_name=patient_name,
 					medicine=medicine,
 					medicine_name=medicine.name,
@@ -420,15 +421,19 @@ def verify_payment(request):
 				)
 				created_orders.append(order.id)
 
-	# Send payment notification email OUTSIDE the transaction to avoid breaking the payment if email fails
-	if payment_type == 'consultation' and payment_id_to_notify and related_id:
-		logger.info(f"Sending consultation email for payment {payment_id_to_notify}")
-		_send_payment_notification_email(payment_id_to_notify, related_id)
-	elif payment_type == 'pharmacy' and payment and created_orders:
-		logger.info(f"Sending pharmacy email: payment_type={payment_type}, payment={payment}, created_orders={created_orders}")
-		_send_pharmacy_order_notification_email(payment.id, created_orders)
-	else:
-		logger.info(f"No email to send: payment_type={payment_type}, payment={payment}, payment_id_to_notify={payment_id_to_notify}, created_orders={created_orders}")
+			publish_on_commit(
+				[PHARMACY_CHANNEL, ADMIN_CHANNEL, patient_profile and patient_channel(patient_profile.id)],
+				'order.created',
+				{'orders': created_orders, 'payment_id': payment.id, 'patient_name': patient_name, 'amount': str(payment.amount)},
+			)
+
+		# Notification emails are queued in the same transaction and sent by the outbox worker.
+		if payment_type == 'consultation' and payment_id_to_notify and related_id:
+			logger.info(f"Queueing consultation email for payment {payment_id_to_notify}")
+			_send_payment_notification_email(payment_id_to_notify, related_id)
+		elif payment_type == 'pharmacy' and created_orders:
+			logger.info(f"Queueing pharmacy email: payment={payment.id}, created_orders={created_orders}")
+			_send_pharmacy_order_notification_email(payment.id, created_orders)
 
 	# Return appropriate response based on payment type
 	if payment_type == 'consultation':
@@ -0,0 +1,223 @@
+"""
+In-memory search index over ``MedicineStock`` names.
+
+Names are normalized into tokens (``"Paracetamol 500 mg Tab."`` ->
+``paracetamol 500mg tab``). Each token maps to the medicines containing it,
+and a sorted token list serves prefix lookups. A query token matches an
+index token exactly, as a prefix, or within a small edit distance, so
+``paracetmol`` still finds Paracetamol.
+
+The index lives in each process. ``pharmacy.signals`` applies saves and
+deletes from this process immediately. ``refresh`` picks up rows added or
+renamed elsewhere with one query on ``updated_at``. Rows deleted by another
+process are dropped when pricing finds they no longer exist (``discard``).
+Only ids and names are indexed; prices and stock are always read from the
+database.
+"""
+
+import bisect
+import re
+import threading
+import unicodedata
+from dataclasses import dataclass, field
+
+from .models import MedicineStock
+
+_STRENGTH = re.compile(r'(\d+(?:\.\d+)?)\s*(mg|mcg|g|ml|iu|%)\b')
+_NON_WORD = re.compile(r'[^0-9a-z%.]+')
+
+# Dosage-form words that appear in stock names but say nothing about the drug.
+FORM_WORDS = frozenset({
+	'tab', 'tabs', 'tablet', 'tablets', 'cap', 'caps', 'capsule', 'capsules', 'syp', 'syrup',
+	'inj', 'injection', 'susp', 'suspension', 'oint', 'ointment', 'cream', 'gel', 'drops', 'sol', 'solution',
+})
+
+
+def normalize(text):
+	"""Lowercase ASCII with strengths joined to their unit (``500 mg`` -> ``500mg``)."""
+	text = unicodedata.normalize('NFKD', text or '')
+	text = ''.join(char for char in text if not unicodedata.combining(char)).lower()
+	text = _STRENGTH.sub(lambda match: f'{match.group(1)}{match.group(2)}', text)
+	return ' '.join(word.strip('.') for word in _NON_WORD.sub(' ', text).split() if word.strip('.'))
+
+
+def strengths(text):
+	"""Normalized strengths in ``text``, e.g. ``{'500mg'}``."""
+	return {f'{number}{unit}' for number, unit in _STRENGTH.findall(normalize(text))}
+
+
+def name_tokens(text):
+	"""Tokens that identify the drug: no strengths, numbers or dosage-form words."""
+	return [
+		token for token in normalize(text).split()
+		if token not in FORM_WORDS and not _STRENGTH.fullmatch(token) and not token.replace('.', '').isdigit()
+	]
+
+
+def edit_distance(a, b, limit):
+	"""Levenshtein distance between ``a`` and ``b``, or ``limit + 1`` once it exceeds ``limit``."""
+	if abs(len(a) - len(b)) > limit:
+		return limit + 1
+	previous = list(range(len(b) + 1))
+	for i, char_a in enumerate(a, start=1):
+		current = [i]
+		for j, char_b in enumerate(b, start=1):
+			current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+		if min(current) > limit:
+			return limit + 1
+		previous = current
+	return previous[-1]
+
+
+def _max_typos(token):
+	if len(token) >= 8:
+		return 2
+	return 1 if len(token) >= 4 else 0
+
+
+@dataclass
+class Match:
+	medicine_id: int
+	name: str
+	score: float
+
+
+@dataclass
+class _Entry:
+	name: str
+	tokens: tuple
+	strengths: frozenset = field(default_factory=frozenset)
+
+
+class MedicineIndex:
+	# Weight of a query token matched exactly, as a prefix of a name token, or with typos.
+	EXACT, PREFIX, FUZZY = 1.0, 0.8, 0.6
+
+	def __init__(self):
+		self._lock = threading.RLock()
+		self._entries = {}
+		self._postings = {}
+		self._sorted_tokens = []
+		self._watermark = None
+		self._loaded = False
+
+	# --- maintenance ---
+
+	def _add(self, medicine_id, name):
+		self._remove(medicine_id)
+		entry = _Entry(name=name, tokens=tuple(dict.fromkeys(name_tokens(name))), strengths=frozenset(strengths(name)))
+		self._entries[medicine_id] = entry
+		for token in entry.tokens:
+			ids = self._postings.get(token)
+			if ids is None:
+				ids = self._postings[token] = set()
+				bisect.insort(self._sorted_tokens, token)
+			ids.add(medicine_id)
+
+	def _remove(self, medicine_id):
+		entry = self._entries.pop(medicine_id, None)
+		if entry is None:
+			return
+		for token in entry.tokens:
+			ids = self._postings.get(token)
+			if ids is None:
+				continue
+			ids.discard(medicine_id)
+			if not ids:
+				del self._postings[token]
+				position = bisect.bisect_left(self._sorted_tokens, token)
+				if position < len(self._sorted_tokens) and self._sorted_tokens[position] == token:
+					del self._sorted_tokens[position]
+
+	def _apply(self, rows):
+		for medicine_id, name, updated_at in rows:
+			self._add(medicine_id, name)
+			if updated_at and (self._watermark is None or updated_at > self._watermark):
+				self._watermark = updated_at
+
+	def refresh(self):
+		"""Load the index on first use, then apply rows changed since the last refresh."""
+		with self._lock:
+			rows = MedicineStock.objects.values_list('id', 'name', 'updated_at')
+			if self._loaded and self._watermark is not None:
+				# >= so rows sharing the watermark timestamp are not missed; re-adding is idempotent.
+				rows = rows.filter(updated_at__gte=self._watermark)
+			elif not self._loaded:
+				self._entries, self._postings, self._sorted_tokens = {}, {}, []
+			self._apply(rows.order_by())
+			self._loaded = True
+
+	def upsert(self, medicine_id, name, updated_at=None):
+		with self._lock:
+			if self._loaded:
+				self._apply([(medicine_id, name, updated_at)])
+
+	def discard(self, medicine_id):
+		with self._lock:
+			self._remove(medicine_id)
+
+	def clear(self):
+		with self._lock:
+			self._entries, self._postings, self._sorted_tokens = {}, {}, []
+			self._watermark = None
+			self._loaded = False
+
+	def __len__(self):
+		return len(self._entries)
+
+	# --- lookup ---
+
+	def _prefixed(self, token):
+		position = bisect.bisect_left(self._sorted_tokens, token)
+		while position < len(self._sorted_tokens) and self._sorted_tokens[position].startswith(token):
+			yield self._sorted_tokens[position]
+			position += 1
+
+	def _token_hits(self, token):
+		"""``{medicine_id: weight}`` for one query token."""
+		hits = {}
+
+		def credit(ids, weight):
+			for medicine_id in ids:
+				if weight > hits.get(medicine_id, 0):
+					hits[medicine_id] = weight
+
+		credit(self._postings.get(token, ()), self.EXACT)
+		if len(token) >= 3:
+			for indexed in self._prefixed(token):
+				if indexed != token:
+					credit(self._postings[indexed], self.PREFIX)
+		limit = _max_typos(token)
+		if limit and not hits:
+			# Only tokens sharing the first letter are compared, which keeps this cheap.
+			for indexed in self._prefixed(token[0]):
+				if edit_distance(token, indexed, limit) <= limit:
+					credit(self._postings[indexed], self.FUZZY)
+		return hits
+
+	def search(self, text, limit=3, min_score=0.5):
+		"""Best matches for ``text`` as ``Match`` objects, best first."""
+		query_tokens = list(dict.fromkeys(name_tokens(text)))
+		if not query_tokens:
+			return []
+		query_strengths = strengths(text)
+		with self._lock:
+			totals = {}
+			for token in query_tokens:
+				for medicine_id, weight in self._token_hits(token).items():
+					totals[medicine_id] = totals.get(medicine_id, 0) + weight
+
+			matches = []
+			for medicine_id, total in totals.items():
+				entry = self._entries[medicine_id]
+				# Share of the query that matched, discounted for name tokens the query does not mention.
+				score = total / len(query_tokens) * (len(query_tokens) / max(len(entry.tokens), len(query_tokens))) ** 0.5
+				if query_strengths and entry.strengths:
+					score += 0.2 if query_strengths & entry.strengths else -0.2
+				if score >= min_score:
+					matches.append((score, Match(medicine_id, entry.name, round(min(score, 1.0), 3))))
+		matches.sort(key=lambda item: (-item[0], item[1].name, item[1].medicine_id))
+		return [match for _, match in matches[:limit]]
+
+
+medicine_index = MedicineIndex()
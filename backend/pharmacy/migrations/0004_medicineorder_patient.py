@@ -0,0 +1,24 @@
+# Generated by Django 5.2.11 on 2026-10-17 10:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0003_directory_indexes'),
+        ('pharmacy', '0003_medicinestock_category_medicinestock_expiry_date_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='medicineorder',
+            name='patient',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='medicine_orders', to='patients.patientprofile'),
+        ),
+        migrations.AddIndex(
+            model_name='medicineorder',
+            index=models.Index(fields=['patient', 'order_date'], name='order_patient_date_idx'),
+        ),
+    ]
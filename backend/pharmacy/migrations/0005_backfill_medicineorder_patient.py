@@ -0,0 +1,54 @@
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+
+def backfill_order_patients(apps, schema_editor):
+    """
+    Link existing orders to patients by the stored name. Names shared by more
+    than one patient are ambiguous and those orders are left unlinked.
+    """
+    PatientProfile = apps.get_model('patients', 'PatientProfile')
+    MedicineOrder = apps.get_model('pharmacy', 'MedicineOrder')
+
+    patient_ids = {}
+    ambiguous = set()
+    for patient_id, full_name in PatientProfile.objects.values_list('id', 'full_name').iterator():
+        key = full_name.strip().lower()
+        if key in patient_ids and patient_ids[key] != patient_id:
+            ambiguous.add(key)
+        patient_ids[key] = patient_id
+    for key in ambiguous:
+        del patient_ids[key]
+
+    last_id = 0
+    while True:
+        batch = list(
+            MedicineOrder.objects.filter(id__gt=last_id, patient__isnull=True)
+            .order_by('id')
+            .values_list('id', 'patient_name')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        last_id = batch[-1][0]
+
+        order_ids_by_patient = {}
+        for order_id, patient_name in batch:
+            patient_id = patient_ids.get(patient_name.strip().lower())
+            if patient_id:
+                order_ids_by_patient.setdefault(patient_id, []).append(order_id)
+        for patient_id, order_ids in order_ids_by_patient.items():
+            MedicineOrder.objects.filter(id__in=order_ids).update(patient_id=patient_id)
+
+
+class Migration(migrations.Migration):
+    # Each batch commits on its own so a large table is not backfilled in one transaction.
+    atomic = False
+
+    dependencies = [
+        ('pharmacy', '0004_medicineorder_patient'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_order_patients, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.11 on 2026-10-17 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pharmacy', '0005_backfill_medicineorder_patient'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='medicinestock',
+            index=models.Index(fields=['updated_at'], name='stock_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.11 on 2026-10-17 11:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0006_patient_search_grams'),
+        ('pharmacy', '0006_stock_updated_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='medicineorder',
+            index=models.Index(fields=['order_date', 'id'], name='order_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='medicinestock',
+            index=models.Index(fields=['name', 'id'], name='stock_name_idx'),
+        ),
+    ]
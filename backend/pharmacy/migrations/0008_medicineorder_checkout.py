@@ -0,0 +1,23 @@
+# Generated by Django 5.2.11 on 2026-10-17 11:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0006_patient_search_grams'),
+        ('pharmacy', '0007_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='medicineorder',
+            name='checkout',
+            field=models.UUIDField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='medicineorder',
+            index=models.Index(fields=['checkout'], name='order_checkout_idx'),
+        ),
+    ]
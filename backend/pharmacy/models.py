@@ -23,6 +23,14 @@ class MedicineStock(models.Model):
 	expiry_date = models.DateField(null=True, blank=True)
 	updated_at = models.DateTimeField(auto_now=True)
 
+	class Meta:
+		indexes = [
+			# pharmacy.medicine_index picks up added/renamed rows by updated_at.
+			models.Index(fields=['updated_at'], name='stock_updated_idx'),
+			# Keyset pages of stock_list, ordered by name.
+			models.Index(fields=['name', 'id'], name='stock_name_idx'),
+		]
+
 	def __str__(self):
 		return self.name
 
@@ -40,6 +48,16 @@ class MedicineOrder(models.Model):
 		('Delivered', 'Delivered'),
 	]
 
+	# patient_name is kept as the name at order time for the pharmacy views; lookups use the FK.
+	# SET_NULL keeps the pharmacy's order history when a patient account is removed.
+	patient = models.ForeignKey(
+		'patients.PatientProfile',
+		on_delete=models.SET_NULL,
+		null=True,
+		blank=True,
+		related_name='medicine_orders',
+		db_index=False,  # covered by order_patient_date_idx
+	)
 	patient_name = models.CharField(max_length=150)
 	medicine = models.ForeignKey(MedicineStock, on_delete=models.SET_NULL, null=True, blank=True)
 	medicine_name = models.CharField(max_length=200)
@@ -48,6 +66,16 @@ class MedicineOrder(models.Model):
 	payment_status = models.CharField(max_length=20, choices=PAYMENT_STATUS_CHOICES, default='Pending')
 	delivery_status = models.CharField(max_length=30, choices=DELIVERY_STATUS_CHOICES, default='Pending')
 	total_price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+	# Shared by the orders of one place_order cart, so their ids can be read back after a bulk insert.
+	checkout = models.UUIDField(null=True, blank=True, editable=False)
+
+	class Meta:
+		indexes = [
+			models.Index(fields=['patient', 'order_date'], name='order_patient_date_idx'),
+			models.Index(fields=['checkout'], name='order_checkout_idx'),
+			# Keyset pages of order_list, newest first.
+			models.Index(fields=['order_date', 'id'], name='order_date_idx'),
+		]
 
 	def __str__(self):
 		return f"{self.patient_name} - {self.medicine_name}"
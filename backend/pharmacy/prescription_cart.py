@@ -0,0 +1,167 @@
+"""
+Turn a prescription's free-text medicines into a priced cart.
+
+``parse_medicines`` splits the text into lines and reads the medicine name,
+strength and quantity from each. The quantity is taken from an explicit
+count (``x10``, ``qty 10``, or ``10 tabs`` on its own) or else from the
+schedule and duration: ``1-0-1 for 5 days`` -> 10, ``1 tab twice daily for 3
+days`` -> 6, ``TDS x 5 days`` -> 15, ``once a week for 8 weeks`` -> 8. A count
+of tablets next to a frequency is the size of one dose. ``build_cart`` matches every line
+against ``medicine_index`` and prices the matches with one query. Its
+``items`` can be posted to ``patients/place-order/`` as they are.
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from decimal import Decimal
+from fractions import Fraction
+
+from .medicine_index import medicine_index, normalize, strengths
+from .models import MedicineStock
+
+_SPLIT = re.compile(r'[\n;]+|,(?!\d)')
+_LEADER = re.compile(r'^\s*(?:\d+[.)]\s*|[-*•]+\s*|rx[:.]?\s+)', re.IGNORECASE)
+_EXPLICIT_QUANTITY = [
+	re.compile(r'\b(?:qty|quantity)\s*[:=]?\s*(\d+)', re.IGNORECASE),
+	# ``x 10`` but not the duration in ``TDS x 5 days``.
+	re.compile(r'(?:^|\s)[x×]\s*(\d+)\b(?!\s*(?:days?|weeks?|months?)\b)', re.IGNORECASE),
+	re.compile(r'#\s*(\d+)'),
+]
+# A total on its own (``10 tabs``); the size of one dose when a schedule is given (``1 tab twice daily``).
+_UNIT_COUNT = re.compile(r'\b(\d+)\s*(?:tabs?|tablets?|caps?|capsules?|strips?|bottles?|units?|nos?)\b', re.IGNORECASE)
+_DOSE_PATTERN = re.compile(r'\b([0-2](?:\.5)?)-([0-2](?:\.5)?)-([0-2](?:\.5)?)\b')
+# Doses per day. Weekly schedules come first: ``once a week`` must not read as ``once`` a day.
+_FREQUENCIES = [
+	(re.compile(r'\b(?:once\s+(?:a|per|every)\s+week|weekly)\b', re.IGNORECASE), Fraction(1, 7)),
+	(re.compile(r'\btwice\s+(?:a|per|every)\s+week\b', re.IGNORECASE), Fraction(2, 7)),
+	(re.compile(r'\b(?:thrice|three times)\s+(?:a|per|every)\s+week\b', re.IGNORECASE), Fraction(3, 7)),
+	(re.compile(r'\b(?:qid|four times)\b', re.IGNORECASE), 4),
+	(re.compile(r'\b(?:tds|tid|thrice|three times)\b', re.IGNORECASE), 3),
+	(re.compile(r'\b(?:bd|bid|twice)\b', re.IGNORECASE), 2),
+	(re.compile(r'\b(?:od|once|daily|hs|at night)\b', re.IGNORECASE), 1),
+]
+_DURATION = re.compile(r'\b(?:for|x)?\s*(\d+)\s*(day|week|month)s?\b', re.IGNORECASE)
+_DURATION_DAYS = {'day': 1, 'week': 7, 'month': 30}
+# Where instructions start; the medicine name is the text before this.
+_INSTRUCTIONS = re.compile(
+	r'\b(?:\d+(?:\.\d+)?\s*(?:mg|mcg|g|ml|iu|%)|[0-2](?:\.5)?-[0-2](?:\.5)?-[0-2](?:\.5)?|qty|quantity|x\s*\d|#|'
+	r'\d+\s*(?:tabs?|tablets?|caps?|capsules?)|once|twice|thrice|daily|weekly|bd|bid|tds|tid|qid|od|hs|for\s+\d|after|before|'
+	r'with|morning|night)\b',
+	re.IGNORECASE,
+)
+
+
+@dataclass
+class PrescriptionLine:
+	raw: str
+	medicine: str
+	strength: str
+	quantity: int
+	quantity_inferred: bool
+
+
+def _quantity(text):
+	"""``(quantity, inferred)``: an explicit count, else dose x doses per day x days, else 1."""
+	for pattern in _EXPLICIT_QUANTITY:
+		match = pattern.search(text)
+		if match and int(match.group(1)) > 0:
+			return int(match.group(1)), False
+
+	units = _UNIT_COUNT.search(text)
+	dose_size = int(units.group(1)) if units and int(units.group(1)) > 0 else None
+	per_day = None
+	dose = _DOSE_PATTERN.search(text)
+	if dose:
+		# The pattern already counts units per dose.
+		per_day = sum(Fraction(part) for part in dose.groups())
+		dose_size = 1
+	else:
+		for pattern, count in _FREQUENCIES:
+			if pattern.search(text):
+				per_day = count
+				break
+	if not per_day:
+		return (dose_size, False) if dose_size else (1, True)
+
+	duration = _DURATION.search(text)
+	if duration:
+		days = int(duration.group(1)) * _DURATION_DAYS[duration.group(2).lower()]
+		return max(1, math.ceil((dose_size or 1) * per_day * days)), True
+	return dose_size or 1, True
+
+
+def parse_line(raw):
+	text = _LEADER.sub('', raw).strip()
+	if not text:
+		return None
+	cut = _INSTRUCTIONS.search(text)
+	medicine = (text[:cut.start()] if cut and cut.start() else text).strip(' -:,.')
+	if not medicine:
+		return None
+	quantity, inferred = _quantity(text)
+	return PrescriptionLine(
+		raw=raw.strip(),
+		medicine=medicine,
+		strength=' '.join(sorted(strengths(text))),
+		quantity=quantity,
+		quantity_inferred=inferred,
+	)
+
+
+def parse_medicines(text):
+	"""Parse free-text medicines into ``PrescriptionLine`` objects, one per medicine."""
+	lines = []
+	for raw in _SPLIT.split(text or ''):
+		if normalize(raw):
+			line = parse_line(raw)
+			if line:
+				lines.append(line)
+	return lines
+
+
+def build_cart(medicines_text):
+	"""
+	Match and price ``medicines_text``. Returns ``{'items', 'unmatched', 'total'}``;
+	each item carries the parsed line, the matched stock row, its price and stock,
+	and up to two alternatives.
+	"""
+	lines = parse_medicines(medicines_text)
+	medicine_index.refresh()
+	matched = [(line, medicine_index.search(f'{line.medicine} {line.strength}')) for line in lines]
+
+	stock = MedicineStock.objects.in_bulk({match.medicine_id for _, matches in matched for match in matches})
+	items, unmatched = [], []
+	total = Decimal('0')
+	for line, matches in matched:
+		# Rows deleted by another process are still in this process's index until now.
+		for gone in [match for match in matches if match.medicine_id not in stock]:
+			medicine_index.discard(gone.medicine_id)
+		matches = [match for match in matches if match.medicine_id in stock]
+		if not matches:
+			unmatched.append({'line': line.raw, 'medicine': line.medicine, 'strength': line.strength})
+			continue
+
+		best = stock[matches[0].medicine_id]
+		line_total = best.price * line.quantity
+		in_stock = best.available_quantity >= line.quantity
+		if in_stock:
+			total += line_total
+		items.append({
+			'line': line.raw,
+			'medicine_id': best.id,
+			'name': best.name,
+			'strength': line.strength,
+			'quantity': line.quantity,
+			'quantity_inferred': line.quantity_inferred,
+			'unit_price': float(best.price),
+			'line_total': float(line_total),
+			'available_quantity': best.available_quantity,
+			'in_stock': in_stock,
+			'match_score': matches[0].score,
+			'alternatives': [
+				{'medicine_id': match.medicine_id, 'name': stock[match.medicine_id].name, 'match_score': match.score}
+				for match in matches[1:]
+			],
+		})
+	return {'items': items, 'unmatched': unmatched, 'total': float(total)}
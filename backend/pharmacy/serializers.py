@@ -30,6 +30,7 @@ class MedicineOrderSerializer(serializers.ModelSerializer):
 		model = MedicineOrder
 		fields = [
 			'id',
+			'patient',
 			'patient_name',
 			'medicine',
 			'medicine_name',
@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .medicine_index import medicine_index
+from .models import MedicineStock
+
+
+@receiver(post_save, sender=MedicineStock)
+def _stock_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+	# Quantity-only saves (orders, restocking) do not change what the index holds.
+	if raw or (update_fields is not None and 'name' not in update_fields):
+		return
+	medicine_index.upsert(instance.pk, instance.name, instance.updated_at)
+
+
+@receiver(post_delete, sender=MedicineStock)
+def _stock_deleted(sender, instance, **kwargs):
+	medicine_index.discard(instance.pk)
@@ -0,0 +1,41 @@
+from django.test import SimpleTestCase
+
+from .prescription_cart import parse_line, parse_medicines
+
+
+class PrescriptionQuantityTests(SimpleTestCase):
+	def assertQuantity(self, raw, quantity, inferred):
+		line = parse_line(raw)
+		self.assertEqual((line.quantity, line.quantity_inferred), (quantity, inferred), raw)
+
+	def test_explicit_counts(self):
+		self.assertQuantity('Paracetamol 500 mg x10', 10, False)
+		self.assertQuantity('Paracetamol 500 mg qty: 12', 12, False)
+		self.assertQuantity('Paracetamol 500 mg #15', 15, False)
+		self.assertQuantity('Paracetamol 500 mg 10 tabs', 10, False)
+
+	def test_dose_pattern(self):
+		self.assertQuantity('Metformin 500 mg 1-0-1 for 5 days', 10, True)
+		self.assertQuantity('Metformin 500 mg 0.5-0-0.5 for 3 days', 3, True)
+
+	def test_tablets_per_dose_with_frequency(self):
+		self.assertQuantity('Crocin 650 mg 1 tab twice daily for 3 days', 6, True)
+		self.assertQuantity('Crocin 650 mg 2 tabs TDS for 2 days', 12, True)
+
+	def test_times_duration_is_not_a_count(self):
+		self.assertQuantity('Amoxicillin 250 mg TDS x 5 days', 15, True)
+		self.assertQuantity('Amoxicillin 250 mg TDS x5days', 15, True)
+
+	def test_weekly_frequency(self):
+		self.assertQuantity('Methotrexate 7.5 mg once a week for 8 weeks', 8, True)
+		self.assertQuantity('Vitamin D3 60000 IU weekly for 6 weeks', 6, True)
+		self.assertQuantity('Alendronate 70 mg twice a week for 4 weeks', 8, True)
+
+	def test_no_schedule(self):
+		self.assertQuantity('Crocin 650 mg', 1, True)
+		self.assertQuantity('Crocin 650 mg twice daily', 1, True)
+
+	def test_medicine_name_and_strength(self):
+		line = parse_line('1. Crocin 650 mg 1 tab twice daily for 3 days')
+		self.assertEqual((line.medicine, line.strength), ('Crocin', '650mg'))
+		self.assertEqual([line.medicine for line in parse_medicines('Crocin 650 mg; Amoxicillin 250 mg TDS x 5 days')], ['Crocin', 'Amoxicillin'])
@@ -6,6 +6,8 @@ from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
+from telemedicine.events import PHARMACY_CHANNEL, patient_channel, publish_on_commit
+from telemedicine.pagination import CursorError, paginate_request, wants_page
 from .models import MedicineOrder, MedicineStock, PharmacyProfile
 from .serializers import MedicineOrderSerializer, MedicineStockSerializer, PharmacyProfileSerializer
 
@@ -62,7 +64,7 @@ def dashboard_summary(request):
 
 @api_view(['GET'])
 def order_list(request):
-	orders = MedicineOrder.objects.all().order_by('-order_date')
+	orders = MedicineOrder.objects.all()
 
 	date = request.GET.get('date')
 	patient = request.GET.get('patient')
@@ -75,8 +77,15 @@ def order_list(request):
 	if status_filter:
 		orders = orders.filter(delivery_status=status_filter)
 
-	serializer = MedicineOrderSerializer(orders, many=True)
-	return Response(serializer.data)
+	if not wants_page(request):
+		serializer = MedicineOrderSerializer(orders.order_by('-order_date'), many=True)
+		return Response(serializer.data)
+
+	try:
+		page, page_info = paginate_request(request, orders, ('-order_date', '-id'))
+	except CursorError as e:
+		return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+	return Response({'results': MedicineOrderSerializer(page, many=True).data, **page_info})
 
 
 @api_view(['PUT'])
@@ -92,6 +101,11 @@ def update_order(request, pk):
 
 	order.delivery_status = status_value
 	order.save(update_fields=['delivery_status'])
+	publish_on_commit(
+		[PHARMACY_CHANNEL, order.patient_id and patient_channel(order.patient_id)],
+		'order.updated',
+		{'id': order.id, 'delivery_status': order.delivery_status},
+	)
 	return Response(MedicineOrderSerializer(order).data)
 
 
@@ -166,7 +180,7 @@ def payments_summary(request):
 
 @api_view(['GET'])
 def stock_list(request):
-	stocks = MedicineStock.objects.order_by('name')
+	stocks = MedicineStock.objects.all()
 	
 	# Search filter
 	search = request.GET.get('search', '').strip()
@@ -183,8 +197,15 @@ def stock_list(request):
 	if low_stock == 'true':
 		stocks = stocks.filter(available_quantity__lte=F('low_stock_threshold'))
 	
-	serializer = MedicineStockSerializer(stocks, many=True)
-	return Response(serializer.data)
+	if not wants_page(request):
+		serializer = MedicineStockSerializer(stocks.order_by('name'), many=True)
+		return Response(serializer.data)
+
+	try:
+		page, page_info = paginate_request(request, stocks, ('name', 'id'))
+	except CursorError as e:
+		return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+	return Response({'results': MedicineStockSerializer(page, many=True).data, **page_info})
 
 
 @api_view(['POST'])
@@ -0,0 +1,241 @@
+"""
+Real-time updates pushed to clients as server-sent events.
+
+Views call ``publish_on_commit`` once a consultation, appointment, payment or
+order changes. The broker receives the event only after the transaction
+commits, so clients never see a change that was rolled back. Each caller
+listens on ``/api/events/`` (``EventSource('/api/events/?token=...')`` or a
+fetch with the bearer header) and gets the events for its channels:
+
+- ``patient:<profile id>``
+- ``doctor:<profile id>``
+- ``pharmacy``
+- ``admin``
+
+Events carry ids. A client that reconnects sends ``Last-Event-ID`` and
+receives what it missed from the broker's recent history. When the history
+no longer reaches back that far, it receives a ``resync`` event and should
+refetch its lists once.
+
+The default ``InProcessBroker`` fans events out inside one process. That is
+enough for a single ASGI worker (for example ``gunicorn -k
+uvicorn.workers.UvicornWorker -w 1 telemedicine.asgi:application``). To run
+several workers, point EVENTS_BROKER at a class with the same ``publish`` /
+``subscribe`` / ``unsubscribe`` methods backed by a shared bus such as Redis
+pub/sub. The stream needs ASGI; under WSGI the endpoint answers 501.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+PHARMACY_CHANNEL = 'pharmacy'
+ADMIN_CHANNEL = 'admin'
+RESYNC = 'resync'
+
+
+def patient_channel(patient_id):
+    return f'patient:{patient_id}'
+
+
+def doctor_channel(doctor_id):
+    return f'doctor:{doctor_id}'
+
+
+def channels_for(identity):
+    """The channels a caller may listen on."""
+    if identity.role == 'patient' and identity.profile_id:
+        return [patient_channel(identity.profile_id)]
+    if identity.role == 'doctor' and identity.profile_id:
+        return [doctor_channel(identity.profile_id)]
+    if identity.role == 'pharmacy':
+        return [PHARMACY_CHANNEL]
+    if identity.role == 'admin':
+        return [ADMIN_CHANNEL]
+    return []
+
+
+@dataclass(frozen=True)
+class Event:
+    id: str
+    channel: str
+    type: str
+    data: dict
+
+
+class Subscription:
+    """One listener's queue. ``deliver`` may be called from any thread."""
+
+    def __init__(self, channels, backlog=(), max_queue=100):
+        self.channels = frozenset(channels)
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=max_queue)
+        self._backlog = deque(backlog)
+        self.overflowed = False
+
+    def deliver(self, event):
+        self._loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # The client cannot keep up; end its stream so it reconnects and replays from history.
+            self.overflowed = True
+
+    @property
+    def closed(self):
+        return self.overflowed and not self._backlog and self._queue.empty()
+
+    async def next(self, timeout):
+        """The next event, or None after ``timeout`` seconds without one."""
+        if self._backlog:
+            return self._backlog.popleft()
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class InProcessBroker:
+    """Fans events out to the subscriptions of this process and keeps a short replay history."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = {}
+        self._history = deque(maxlen=getattr(settings, 'EVENTS_HISTORY', 500))
+        self._epoch = os.urandom(4).hex()  # ids from before a restart are not comparable
+        self._sequence = 0
+
+    def publish(self, channel, event_type, data):
+        with self._lock:
+            self._sequence += 1
+            event = Event(f'{self._epoch}-{self._sequence}', channel, event_type, data)
+            self._history.append((self._sequence, event))
+            listeners = list(self._subscriptions.get(channel, ()))
+        for subscription in listeners:
+            subscription.deliver(event)
+        return event
+
+    def _replay(self, channels, last_event_id):
+        epoch, _, sequence = (last_event_id or '').partition('-')
+        if not last_event_id:
+            return []
+        oldest = self._history[0][0] if self._history else self._sequence + 1
+        if epoch != self._epoch or not sequence.isdigit() or int(sequence) + 1 < oldest:
+            return [Event(f'{self._epoch}-{self._sequence}', '', RESYNC, {})]
+        return [event for number, event in self._history if number > int(sequence) and event.channel in channels]
+
+    def subscribe(self, channels, last_event_id=None):
+        with self._lock:
+            subscription = Subscription(
+                channels,
+                self._replay(set(channels), last_event_id),
+                getattr(settings, 'EVENTS_QUEUE_SIZE', 100),
+            )
+            for channel in subscription.channels:
+                self._subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                listeners = self._subscriptions.get(channel)
+                if listeners is not None:
+                    listeners.discard(subscription)
+                    if not listeners:
+                        del self._subscriptions[channel]
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(getattr(settings, 'EVENTS_BROKER', 'telemedicine.events.InProcessBroker'))()
+    return _broker
+
+
+def publish(channels, event_type, data):
+    broker = get_broker()
+    for channel in channels:
+        broker.publish(channel, event_type, data)
+
+
+def publish_on_commit(channels, event_type, data):
+    """Publish ``event_type`` to ``channels`` once the current transaction commits (now if there is none)."""
+    channels = [channel for channel in channels if channel]
+    if channels:
+        # robust: a broker failure is logged instead of failing a request whose changes are committed.
+        transaction.on_commit(partial(publish, channels, event_type, data), robust=True)
+
+
+# --- stream ----------------------------------------------------------------
+
+def _format(event):
+    payload = json.dumps(event.data, cls=DjangoJSONEncoder, separators=(',', ':'))
+    return f'id: {event.id}\nevent: {event.type}\ndata: {payload}\n\n'
+
+
+async def _stream(broker, subscription):
+    heartbeat = getattr(settings, 'EVENTS_HEARTBEAT_SECONDS', 15)
+    # Streams end periodically so a revoked or expired token stops receiving events.
+    deadline = time.monotonic() + getattr(settings, 'EVENTS_STREAM_SECONDS', 600)
+    try:
+        yield f'retry: {getattr(settings, "EVENTS_RETRY_MS", 3000)}\n\n'
+        while not subscription.closed:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            event = await subscription.next(min(heartbeat, remaining))
+            yield _format(event) if event is not None else ': keepalive\n\n'
+    finally:
+        broker.unsubscribe(subscription)
+
+
+async def event_stream(request):
+    """Server-sent events for the caller's channels (token in ``Authorization`` or ``?token=``)."""
+    from accounts.auth import identity_from_token
+
+    if request.method != 'GET':
+        return JsonResponse({'detail': 'Method not allowed.'}, status=405)
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'detail': 'Event streaming requires the ASGI server.'}, status=501)
+
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    raw_token = token.strip() if scheme.lower() == 'bearer' else request.GET.get('token')
+    # The token check may read the user's row.
+    identity = await sync_to_async(identity_from_token)(raw_token)
+    if identity is None:
+        return JsonResponse({'detail': 'A valid access token is required.'}, status=401)
+    channels = channels_for(identity)
+    if not channels:
+        return JsonResponse({'detail': 'No event channels for this account.'}, status=403)
+
+    broker = get_broker()
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    subscription = broker.subscribe(channels, last_event_id)
+    response = StreamingHttpResponse(_stream(broker, subscription), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx would otherwise buffer the stream
+    return response
@@ -0,0 +1,280 @@
+"""
+Profile image uploads and their derived sizes.
+
+Uploads are streamed to a temporary file by ``LimitedUploadHandler`` and
+rejected as soon as they pass PROFILE_IMAGE_MAX_BYTES, so a large upload never
+sits in memory. ``save_profile_image`` stores the original under a content
+hash and queues ``build_profile_derivatives`` on the background job worker,
+which writes a fixed-size JPEG thumbnail and a bounded WebP copy that list
+endpoints serve instead of the original.
+"""
+
+import base64
+import binascii
+import hashlib
+import io
+import logging
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import StopUpload, TemporaryFileUploadHandler
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVES_JOB = 'telemedicine.images.build_profile_derivatives'
+
+# Pillow format name -> stored file extension
+ALLOWED_FORMATS = {'JPEG': 'jpg', 'PNG': 'png', 'WEBP': 'webp', 'GIF': 'gif'}
+ALLOWED_CONTENT_TYPES = {'image/jpeg', 'image/jpg', 'image/png', 'image/webp', 'image/gif'}
+
+# Multipart framing or JSON syntax (boundaries, headers, other fields) allowed on top of the image itself.
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class ImageRejected(ValueError):
+    """Raised for an upload that is too large, not an allowed image type, or unreadable."""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def max_upload_bytes():
+    return getattr(settings, 'PROFILE_IMAGE_MAX_BYTES', 5 * 1024 * 1024)
+
+
+class LimitedUploadHandler(TemporaryFileUploadHandler):
+    """Spool every uploaded file to disk and stop reading once it exceeds ``max_bytes``."""
+
+    def __init__(self, request=None, max_bytes=None):
+        super().__init__(request)
+        self.max_bytes = max_bytes or max_upload_bytes()
+        self.received = 0
+        self.exceeded = False
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.max_bytes:
+            self.exceeded = True
+            raise StopUpload(connection_reset=False)
+        return super().receive_data_chunk(raw_data, start)
+
+
+def limit_uploads(request):
+    """
+    Install ``LimitedUploadHandler`` on ``request``. Must run before anything reads
+    ``request.data``/``request.FILES``. Raises ``ImageRejected`` (413) when the
+    declared body is already too large. Returns the handler so the caller can
+    check ``handler.exceeded`` after parsing.
+    """
+    try:
+        content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        content_length = 0
+    limit = max_upload_bytes()
+    if not request.META.get('CONTENT_TYPE', '').startswith('multipart/'):
+        # A JSON body carries the image as a base64 data URL, 4/3 the size of the image;
+        # decode_data_url then checks the decoded size itself.
+        limit = (limit + 2) // 3 * 4
+    if content_length > limit + MULTIPART_OVERHEAD:
+        raise ImageRejected('Image is too large.', status_code=413)
+
+    django_request = getattr(request, '_request', request)
+    handler = LimitedUploadHandler(django_request)
+    django_request.upload_handlers = [handler]
+    return handler
+
+
+def _open_image(fileobj):
+    from PIL import Image
+
+    max_pixels = getattr(settings, 'PROFILE_IMAGE_MAX_PIXELS', 40_000_000)
+    try:
+        image = Image.open(fileobj)
+        width, height = image.size
+        if width * height > max_pixels:
+            raise ImageRejected('Image dimensions are too large.')
+        return image
+    except ImageRejected:
+        raise
+    except Exception as exc:
+        raise ImageRejected('File is not a readable image.') from exc
+
+
+def validate_image(upload):
+    """Check size, declared type and actual format of ``upload``. Returns the file extension."""
+    if upload.size > max_upload_bytes():
+        raise ImageRejected('Image is too large.', status_code=413)
+    content_type = (getattr(upload, 'content_type', None) or '').lower()
+    if content_type and content_type not in ALLOWED_CONTENT_TYPES:
+        raise ImageRejected('Only JPEG, PNG, WebP and GIF images are allowed.', status_code=415)
+
+    upload.seek(0)
+    image = _open_image(upload)
+    image_format = image.format
+    upload.seek(0)
+    if image_format not in ALLOWED_FORMATS:
+        raise ImageRejected('Only JPEG, PNG, WebP and GIF images are allowed.', status_code=415)
+    return ALLOWED_FORMATS[image_format]
+
+
+def decode_data_url(data_url):
+    """
+    Decode a legacy ``data:image/...;base64,`` string into a ``ContentFile``,
+    refusing it before decoding if the payload is over the size limit.
+    """
+    try:
+        header, encoded = data_url.split(';base64,', 1)
+    except ValueError as exc:
+        raise ImageRejected('Invalid image data.') from exc
+    if len(encoded) * 3 // 4 > max_upload_bytes():
+        raise ImageRejected('Image is too large.', status_code=413)
+    try:
+        content = ContentFile(base64.b64decode(encoded))
+    except (binascii.Error, ValueError) as exc:
+        raise ImageRejected('Invalid image data.') from exc
+    content.content_type = header[len('data:'):]
+    return content
+
+
+CLEAR_IMAGE = object()
+
+
+def read_profile_image(value):
+    """
+    Interpret the ``profile_image`` value sent to the profile update views and
+    validate it before anything is saved. Returns ``None`` (leave unchanged),
+    ``CLEAR_IMAGE``, or a validated file. Any other string, such as the current
+    image URL echoed back by the client, leaves the image unchanged.
+    """
+    if value is None:
+        return None
+    if not value or value == 'null':
+        return CLEAR_IMAGE
+    if isinstance(value, str):
+        if not value.startswith('data:image'):
+            return None
+        value = decode_data_url(value)
+    elif not hasattr(value, 'read'):
+        raise ImageRejected('profile_image must be an uploaded file.')
+    validate_image(value)
+    return value
+
+
+def apply_profile_image(profile, image, prefix):
+    """Apply the result of ``read_profile_image`` to ``profile``."""
+    if image is None:
+        return
+    if image is CLEAR_IMAGE:
+        clear_profile_image(profile)
+    else:
+        save_profile_image(profile, image, prefix)
+
+
+def _content_hash(fileobj):
+    digest = hashlib.sha256()
+    fileobj.seek(0)
+    for chunk in iter(lambda: fileobj.read(64 * 1024), b''):
+        digest.update(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest()[:16]
+
+
+def _delete_files_on_commit(names):
+    names = [name for name in names if name]
+    if names:
+        transaction.on_commit(lambda: [default_storage.delete(name) for name in names])
+
+
+def save_profile_image(profile, upload, prefix):
+    """
+    Validate and store ``upload`` as ``profile``'s image, clear the stale
+    derivatives and queue new ones. Old files are removed after commit.
+    """
+    from accounts.jobs import enqueue_job
+
+    ext = validate_image(upload)
+    old_names = [profile.profile_image.name, profile.profile_thumbnail.name, profile.profile_image_webp.name]
+
+    file_name = f"{prefix}_{profile.id}_{_content_hash(upload)}.{ext}"
+    profile.profile_image.save(file_name, upload, save=False)
+    profile.profile_thumbnail = None
+    profile.profile_image_webp = None
+    profile.save(update_fields=['profile_image', 'profile_thumbnail', 'profile_image_webp'])
+
+    _delete_files_on_commit(name for name in old_names if name != profile.profile_image.name)
+    enqueue_job(DERIVATIVES_JOB, {
+        'model': profile._meta.label,
+        'pk': profile.pk,
+        'source': profile.profile_image.name,
+    })
+
+
+def clear_profile_image(profile):
+    """Remove ``profile``'s image and derivatives (files are deleted after commit)."""
+    old_names = [profile.profile_image.name, profile.profile_thumbnail.name, profile.profile_image_webp.name]
+    profile.profile_image = None
+    profile.profile_thumbnail = None
+    profile.profile_image_webp = None
+    profile.save(update_fields=['profile_image', 'profile_thumbnail', 'profile_image_webp'])
+    _delete_files_on_commit(old_names)
+
+
+def _render(image, image_format, **options):
+    buffer = io.BytesIO()
+    image.save(buffer, image_format, **options)
+    return ContentFile(buffer.getvalue())
+
+
+def build_profile_derivatives(payload):
+    """
+    Background job: write the thumbnail and WebP copies for one profile image.
+    Skips quietly if the image was replaced or removed since the job was queued.
+    """
+    from PIL import Image, ImageOps
+
+    model = apps.get_model(payload['model'])
+    source = payload['source']
+    profile = model.objects.filter(pk=payload['pk'], profile_image=source).only('id', 'profile_image').first()
+    if profile is None:
+        return {'skipped': 'image changed'}
+
+    thumbnail_size = getattr(settings, 'PROFILE_THUMBNAIL_SIZE', 128)
+    webp_max_size = getattr(settings, 'PROFILE_WEBP_MAX_SIZE', 512)
+    quality = getattr(settings, 'PROFILE_DERIVATIVE_QUALITY', 80)
+
+    with profile.profile_image.open('rb') as fileobj:
+        image = _open_image(fileobj)
+        image = ImageOps.exif_transpose(image)
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+        thumbnail = ImageOps.fit(image, (thumbnail_size, thumbnail_size), Image.Resampling.LANCZOS)
+        thumbnail_file = _render(thumbnail.convert('RGB'), 'JPEG', quality=quality, optimize=True)
+
+        webp = image.copy()
+        webp.thumbnail((webp_max_size, webp_max_size), Image.Resampling.LANCZOS)
+        webp_file = _render(webp, 'WEBP', quality=quality, method=4)
+
+    stem = source.rsplit('/', 1)[-1].rsplit('.', 1)[0]
+    upload_dir = profile.profile_image.field.upload_to.rstrip('/')
+    thumbnail_name = default_storage.save(f"{upload_dir}/derived/{stem}_{thumbnail_size}.jpg", thumbnail_file)
+    webp_name = default_storage.save(f"{upload_dir}/derived/{stem}_{webp_max_size}.webp", webp_file)
+
+    updated = model.objects.filter(pk=profile.pk, profile_image=source).update(
+        profile_thumbnail=thumbnail_name,
+        profile_image_webp=webp_name,
+    )
+    if not updated:
+        # Replaced while we were rendering; the newer upload has its own job.
+        default_storage.delete(thumbnail_name)
+        default_storage.delete(webp_name)
+        return {'skipped': 'image changed'}
+    if payload['model'] == 'doctors.DoctorProfile':
+        # The public directory snapshot carries doctor thumbnails.
+        from doctors.directory import bump_version
+
+        bump_version()
+    return {'thumbnail': thumbnail_name, 'webp': webp_name}
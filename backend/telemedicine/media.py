@@ -0,0 +1,247 @@
+"""
+Serving uploaded media in production.
+
+``serve_media`` is routed at MEDIA_URL whatever DEBUG says. Doctor profile
+images are public because the directory shows them. Patient profile images
+and prescription PDFs are only served to a caller allowed to see them. That
+is either whoever holds a URL signed by ``media_url`` (the API hands these
+out to authenticated users, since <img>/<a> requests carry no bearer
+token) or a bearer-token caller who passes the ownership check.
+
+After the check the file is handed to the web server when one is configured:
+MEDIA_ACCEL_REDIRECT_PREFIX for nginx's X-Accel-Redirect, MEDIA_SENDFILE for
+Apache/lighttpd X-Sendfile. Otherwise it is streamed with ``FileResponse``,
+which uses the server's zero-copy file wrapper, or read in chunks for
+single-range requests. Responses carry a strong ETag and Last-Modified and
+answer conditional requests with 304. Generated PDFs and derived images are
+written under content hashes and never overwritten, so they are cached for a
+year as immutable; everything else is revalidated.
+"""
+
+import mimetypes
+import os
+import re
+import time
+
+from django.conf import settings
+from django.core import signing
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.crypto import constant_time_compare
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+
+SIGNATURE_SALT = 'telemedicine.media'
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+CHUNK_SIZE = 64 * 1024
+
+# Directories the backend itself writes under content hashes; their files are never replaced.
+# Uploaded originals are left out: their names are not content-addressed and may be reused.
+IMMUTABLE_DIRS = ('prescriptions/generated/', 'patient_profiles/derived/', 'doctor_profiles/derived/')
+_HASHED_NAME = re.compile(r'[0-9a-f]{16,}')
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+# --- access rules --------------------------------------------------------
+
+def _patient_image_allowed(identity, name):
+    from doctors.models import ConsultationRequest
+    from patients.models import PatientProfile
+
+    from django.db.models import Q
+
+    patient_id = (
+        PatientProfile.objects.filter(Q(profile_image=name) | Q(profile_thumbnail=name) | Q(profile_image_webp=name))
+        .values_list('id', flat=True)
+        .first()
+    )
+    if patient_id is None:
+        return False
+    if identity.role == 'patient':
+        return identity.profile_id == patient_id
+    if identity.role == 'doctor':
+        return ConsultationRequest.objects.filter(doctor_id=identity.profile_id, patient_id=patient_id).exists()
+    return False
+
+
+def _prescription_allowed(identity, name):
+    from doctors.models import Prescription
+
+    from django.db.models import Q
+
+    owners = Prescription.objects.filter(Q(pdf=name) | Q(generated_pdf=name)).values_list('patient_id', 'doctor_id')
+    if identity.role == 'patient':
+        return any(patient_id == identity.profile_id for patient_id, _ in owners)
+    if identity.role == 'doctor':
+        return any(doctor_id == identity.profile_id for _, doctor_id in owners)
+    return False
+
+
+# Longest prefix first. ``None`` means public.
+ACCESS_RULES = (
+    ('patient_profiles/', _patient_image_allowed),
+    ('prescriptions/', _prescription_allowed),
+    ('doctor_profiles/', None),
+)
+
+
+def _rule(name):
+    for prefix, check in ACCESS_RULES:
+        if name.startswith(prefix):
+            return True, check
+    return False, None
+
+
+def is_protected(name):
+    known, check = _rule(name)
+    return not known or check is not None
+
+
+# --- signed URLs ---------------------------------------------------------
+
+def _signature(name, expires):
+    return signing.Signer(salt=SIGNATURE_SALT).signature(f'{name}:{expires}')
+
+
+def media_url(fieldfile):
+    """
+    URL for a stored file: plain for public media, otherwise signed. The expiry is
+    rounded up to a MEDIA_URL_LIFETIME window so the URL, and the browser's cached
+    copy, stay the same within the window.
+    """
+    if not fieldfile:
+        return None
+    url = fieldfile.url
+    if not is_protected(fieldfile.name):
+        return url
+    lifetime = getattr(settings, 'MEDIA_URL_LIFETIME', 3600)
+    expires = (int(time.time()) // lifetime + 2) * lifetime
+    return f'{url}?exp={expires}&sig={_signature(fieldfile.name, expires)}'
+
+
+def _valid_signature(request, name):
+    try:
+        expires = int(request.GET.get('exp', ''))
+    except ValueError:
+        return False
+    return expires > time.time() and constant_time_compare(_signature(name, expires), request.GET.get('sig', ''))
+
+
+def _allowed(request, name):
+    from accounts.auth import resolve_identity
+
+    known, check = _rule(name)
+    if known and check is None:
+        return True
+    if _valid_signature(request, name):
+        return True
+    identity = resolve_identity(request)
+    if identity is None:
+        return False
+    if identity.role == 'admin':
+        return True
+    return known and check(identity, name)
+
+
+# --- responses -----------------------------------------------------------
+
+def _cache_control(name, protected):
+    scope = 'private' if protected else 'public'
+    if name.startswith(IMMUTABLE_DIRS) and _HASHED_NAME.search(os.path.basename(name)):
+        return f'{scope}, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    return f'{scope}, max-age=0, must-revalidate'
+
+
+def _not_modified(request, etag, mtime):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        return etag in parse_etags(if_none_match) or if_none_match.strip() == '*'
+    since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    return since is not None and int(mtime) <= since
+
+
+def _byte_range(request, size, etag, mtime):
+    """``(start, end)`` for a satisfiable single Range header, ``None`` for a full response, or ``False`` if unsatisfiable."""
+    match = _RANGE.match(request.META.get('HTTP_RANGE', '').strip())
+    if not match or size == 0:
+        return None
+    if_range = request.META.get('HTTP_IF_RANGE', '').strip()
+    if if_range and if_range != etag and parse_http_date_safe(if_range) != int(mtime):
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _read_range(path, start, length):
+    with open(path, 'rb') as fileobj:
+        fileobj.seek(start)
+        while length > 0:
+            chunk = fileobj.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _file_response(request, name, path, stat):
+    etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+    if _not_modified(request, etag, stat.st_mtime):
+        return HttpResponseNotModified(headers={'ETag': etag})
+
+    accel_prefix = getattr(settings, 'MEDIA_ACCEL_REDIRECT_PREFIX', None)
+    if accel_prefix:
+        # nginx serves the file (and Range requests) from an internal location.
+        response = HttpResponse()
+        response['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + name
+        response['Content-Type'] = ''  # let nginx pick it from the extension
+    elif getattr(settings, 'MEDIA_SENDFILE', False):
+        response = HttpResponse()
+        response['X-Sendfile'] = path
+        response['Content-Type'] = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    else:
+        byte_range = _byte_range(request, stat.st_size, etag, stat.st_mtime)
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+        if byte_range:
+            start, end = byte_range
+            response = StreamingHttpResponse(_read_range(path, start, end - start + 1), status=206)
+            response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+            response['Content-Length'] = str(end - start + 1)
+            response['Content-Type'] = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        else:
+            response = FileResponse(open(path, 'rb'))
+        response['Accept-Ranges'] = 'bytes'
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Cache-Control'] = _cache_control(name, is_protected(name))
+    response['X-Content-Type-Options'] = 'nosniff'
+    return response
+
+
+def serve_media(request, path):
+    """Check access to ``path`` (relative to MEDIA_ROOT) and serve it."""
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponse(status=405, headers={'Allow': 'GET, HEAD'})
+    name = os.path.normpath(path).replace(os.sep, '/')
+    if name.startswith(('../', '/')) or name in ('.', '..'):
+        raise Http404
+    # Unknown files and files the caller may not see are indistinguishable.
+    if not _allowed(request, name):
+        raise Http404
+    full_path = os.path.join(settings.MEDIA_ROOT, name)
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    return _file_response(request, name, full_path, stat)
@@ -0,0 +1,152 @@
+"""
+Keyset (cursor) pagination shared by the list endpoints.
+
+A page is fetched with ``WHERE (ordering columns) > (last row's values)`` and a
+``LIMIT``, so the cost of a page does not grow with how deep the client has
+scrolled. Cursors are signed, opaque strings that remember the ordering they
+were issued for.
+"""
+
+import datetime
+import json
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core import signing
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+
+CURSOR_SALT = 'telemedicine.pagination.cursor'
+PAGE_PARAMS = ('cursor', 'limit')
+
+
+class CursorError(ValueError):
+    """Raised for a malformed, tampered or mismatched cursor / limit."""
+
+
+class _CursorEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder truncates datetimes to milliseconds; a cursor needs the exact value."""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class _CursorSerializer:
+    """JSON with dates/decimals encoded as strings; Django parses them back in the lookup."""
+
+    def dumps(self, obj):
+        return _CursorEncoder(separators=(',', ':')).encode(obj).encode('latin-1')
+
+    def loads(self, data):
+        return json.loads(data.decode('latin-1'))
+
+
+def wants_page(request, extra_params=()):
+    """True when the client asked for a paginated response (legacy callers get the full list)."""
+    return any(param in request.GET for param in (*PAGE_PARAMS, *extra_params))
+
+
+def _field_value(obj, path):
+    for part in path.split('__'):
+        obj = getattr(obj, part)
+        if obj is None:
+            return None
+    return obj
+
+
+def _after_filter(ordering, values):
+    """``Q`` matching rows strictly after ``values`` in ``ordering`` (row-value comparison)."""
+    clauses = []
+    for index, field in enumerate(ordering):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        equal = {ordering[i].lstrip('-'): values[i] for i in range(index)}
+        clauses.append(Q(**equal, **{f"{name}__{lookup}": values[index]}))
+    return reduce(or_, clauses)
+
+
+def encode_cursor(ordering, values):
+    return signing.dumps({'o': list(ordering), 'v': list(values)}, salt=CURSOR_SALT, serializer=_CursorSerializer)
+
+
+def decode_cursor(cursor, ordering):
+    try:
+        payload = signing.loads(cursor, salt=CURSOR_SALT, serializer=_CursorSerializer)
+    except signing.BadSignature as exc:
+        raise CursorError('Invalid cursor.') from exc
+    if payload.get('o') != list(ordering) or len(payload.get('v', [])) != len(ordering):
+        raise CursorError('Cursor does not match the requested ordering.')
+    return payload['v']
+
+
+def page_params(request, default_limit=None, max_limit=None):
+    """Read ``cursor`` and ``limit`` from the query string, clamping the limit."""
+    default_limit = default_limit or getattr(settings, 'PAGINATION_DEFAULT_LIMIT', 25)
+    max_limit = max_limit or getattr(settings, 'PAGINATION_MAX_LIMIT', 100)
+    raw_limit = request.GET.get('limit')
+    try:
+        limit = int(raw_limit) if raw_limit else default_limit
+    except (TypeError, ValueError) as exc:
+        raise CursorError('limit must be an integer.') from exc
+    if limit < 1:
+        raise CursorError('limit must be positive.')
+    return request.GET.get('cursor') or None, min(limit, max_limit)
+
+
+def paginate_keyset(queryset, ordering, cursor=None, limit=25):
+    """
+    Return ``(rows, next_cursor)`` for one page of ``queryset``.
+
+    ``ordering`` must end with a unique column (normally ``'id'``/``'-id'``) so
+    the order is total and no row is skipped or repeated between pages.
+    """
+    ordering = tuple(ordering)
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        queryset = queryset.filter(_after_filter(ordering, decode_cursor(cursor, ordering)))
+
+    rows = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(ordering, [_field_value(last, field.lstrip('-')) for field in ordering])
+    return rows, next_cursor
+
+
+def paginate_request(request, queryset, ordering, default_limit=None, max_limit=None):
+    """``paginate_keyset`` driven by the request's ``cursor``/``limit`` parameters."""
+    cursor, limit = page_params(request, default_limit, max_limit)
+    rows, next_cursor = paginate_keyset(queryset, ordering, cursor, limit)
+    return rows, {'next_cursor': next_cursor, 'limit': limit}
+
+
+def approximate_count(queryset, cap=None):
+    """
+    Cheap row count for a listing header. Returns ``(count, is_estimate)``.
+
+    Unfiltered MySQL tables use the table statistics; everything else counts at
+    most ``cap`` rows, so the result reads as "cap+" on very large matches.
+    """
+    cap = cap or getattr(settings, 'PAGINATION_COUNT_CAP', 1000)
+    model = queryset.model
+    connection = connections[queryset.db]
+    if not queryset.query.where and connection.vendor == 'mysql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT TABLE_ROWS FROM INFORMATION_SCHEMA.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                [model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row and row[0] is not None and row[0] > cap:
+            return int(row[0]), True
+
+    count = queryset.order_by()[:cap + 1].count()
+    if count > cap:
+        return cap, True
+    return count, False
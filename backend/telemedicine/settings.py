@@ -119,6 +119,13 @@ STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Profile image uploads (telemedicine.images): size/pixel limits and derived sizes
+PROFILE_IMAGE_MAX_BYTES = int(os.environ.get('PROFILE_IMAGE_MAX_BYTES', 5 * 1024 * 1024))
+PROFILE_IMAGE_MAX_PIXELS = 40_000_000
+PROFILE_THUMBNAIL_SIZE = 128
+PROFILE_WEBP_MAX_SIZE = 512
+PROFILE_DERIVATIVE_QUALITY = 80
+
 # CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOWED_ORIGINS = [
     "https://smart-telemedicine-and-online-medic.vercel.app/"
@@ -129,12 +136,98 @@ AUTH_USER_MODEL = 'accounts.User'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Background jobs (`manage.py run_background_jobs`) and bulk admin operations
+BACKGROUND_JOB_MAX_ATTEMPTS = 3
+BACKGROUND_JOB_LEASE_SECONDS = 600
+ADMIN_BULK_MAX_IDS = 1000
+ADMIN_BULK_DELETE_CHUNK = 100
+ADMIN_BULK_INLINE_CASCADE_LIMIT = int(os.environ.get('ADMIN_BULK_INLINE_CASCADE_LIMIT', 500))
+
+# Keyset pagination for list endpoints (telemedicine.pagination)
+PAGINATION_DEFAULT_LIMIT = 25
+PAGINATION_MAX_LIMIT = 100
+PAGINATION_COUNT_CAP = 1000
+
+# Bulk doctor onboarding (accounts.doctor_import); None = one hashing process per CPU
+BULK_IMPORT_MAX_ROWS = 5000
+BULK_IMPORT_BATCH_SIZE = 500
+BULK_IMPORT_POOL_THRESHOLD = 8
+BULK_IMPORT_HASH_PROCESSES = int(os.environ['BULK_IMPORT_HASH_PROCESSES']) if os.environ.get('BULK_IMPORT_HASH_PROCESSES') else None
+
 # Fixed system users (override via environment variables)
 ADMIN_EMAIL = os.environ.get('ADMIN_EMAIL', 'admin@gmail.com')
 ADMIN_PASSWORD = os.environ.get('ADMIN_PASSWORD', 'admin123')
 PHARMACY_EMAIL = os.environ.get('PHARMACY_EMAIL', 'pharmacy@telemedicine.local')
 PHARMACY_PASSWORD = os.environ.get('PHARMACY_PASSWORD', 'pharmacy123')
 
+# Signed access tokens issued at login, and the in-process caches used to check them and for legacy email lookups
+ACCESS_TOKEN_MAX_AGE = int(os.environ.get('ACCESS_TOKEN_MAX_AGE', 12 * 60 * 60))
+IDENTITY_CACHE_SIZE = int(os.environ.get('IDENTITY_CACHE_SIZE', 4096))
+IDENTITY_CACHE_TTL = int(os.environ.get('IDENTITY_CACHE_TTL', 60))
+# How long a worker trusts its cached (is_active, token_version) check; revocations reach other workers within this
+TOKEN_STATE_CACHE_TTL = int(os.environ.get('TOKEN_STATE_CACHE_TTL', 30))
+
+# Patient dashboard summary cache (patients.summary); point the alias at a shared cache when running several workers
+PATIENT_SUMMARY_CACHE_ALIAS = os.environ.get('PATIENT_SUMMARY_CACHE_ALIAS', 'default')
+PATIENT_SUMMARY_CACHE_TTL = int(os.environ.get('PATIENT_SUMMARY_CACHE_TTL', 60))
+
+# Doctor-facing patient search (patients.search): result limits, trigram overlap and candidate cap
+PATIENT_SEARCH_LIMIT = 10
+PATIENT_SEARCH_MAX_LIMIT = 50
+PATIENT_SEARCH_MIN_OVERLAP = 0.4
+PATIENT_SEARCH_CANDIDATES = 200
+# Trigrams found for this many patients are too common to narrow a search and are skipped
+PATIENT_SEARCH_GRAM_CAP = 2000
+PATIENT_SEARCH_MAX_GRAMS = 8
+PATIENT_SEARCH_GRAM_CACHE_TTL = 600
+
+# Longest date range, in days, that the free appointment slot endpoint expands (doctors.slots)
+APPOINTMENT_SLOT_MAX_DAYS = 31
+# Prescription PDF rendering (doctors.prescription_pdf): pool size (0 renders inline) and per-PDF timeout
+PRESCRIPTION_PDF_PROCESSES = int(os.environ.get('PRESCRIPTION_PDF_PROCESSES', 2))
+PRESCRIPTION_PDF_TIMEOUT = 60
+# Items in each list of the doctor dashboard (doctors.dashboard): default and largest ``limit``
+DOCTOR_DASHBOARD_ITEMS = 5
+DOCTOR_DASHBOARD_MAX_ITEMS = 20
+# Most consultation requests one bulk approve/reject call may name (doctors.decisions)
+BULK_DECISION_MAX_IDS = 500
+
+# Automatic doctor assignment (doctors.assignment): how many least-loaded doctors to consider,
+# compare-and-set retries, and the days of free slots used to weight load (0 = by queue depth only)
+AUTO_ASSIGN_CANDIDATES = 10
+AUTO_ASSIGN_RETRIES = 5
+AUTO_ASSIGN_SLOT_DAYS = int(os.environ.get('AUTO_ASSIGN_SLOT_DAYS', 0))
+
+# Public doctor directory snapshot (doctors.directory): client cache lifetime, and an optional
+# directory that each new version is exported to as static JSON for a CDN
+DIRECTORY_CACHE_MAX_AGE = 60
+DIRECTORY_STATIC_ROOT = os.environ.get('DIRECTORY_STATIC_ROOT') or None
+
+# Protected media (telemedicine.media): lifetime window of signed media URLs, and optional hand-off
+# of the file to the web server: an nginx internal location for X-Accel-Redirect, or X-Sendfile
+MEDIA_URL_LIFETIME = int(os.environ.get('MEDIA_URL_LIFETIME', 3600))
+MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get('MEDIA_ACCEL_REDIRECT_PREFIX') or None
+MEDIA_SENDFILE = os.environ.get('MEDIA_SENDFILE', '').lower() in ('1', 'true', 'yes')
+
+# Server-sent events (telemedicine.events): the broker class (the in-process default reaches one
+# worker only), replay history, per-client queue, keepalive interval and stream lifetime
+EVENTS_BROKER = os.environ.get('EVENTS_BROKER', 'telemedicine.events.InProcessBroker')
+EVENTS_HISTORY = 500
+EVENTS_QUEUE_SIZE = 100
+EVENTS_HEARTBEAT_SECONDS = 15
+EVENTS_STREAM_SECONDS = 600
+
+# Login throttling (sliding window per email and client IP) and the bounded password hashing pool.
+# Set LOGIN_THROTTLE_CACHE_ALIAS to a shared cache (e.g. Redis) to count attempts across workers.
+LOGIN_THROTTLE_WINDOW = int(os.environ.get('LOGIN_THROTTLE_WINDOW', 300))
+LOGIN_THROTTLE_EMAIL_LIMIT = int(os.environ.get('LOGIN_THROTTLE_EMAIL_LIMIT', 10))
+LOGIN_THROTTLE_IP_LIMIT = int(os.environ.get('LOGIN_THROTTLE_IP_LIMIT', 50))
+LOGIN_THROTTLE_CACHE_ALIAS = os.environ.get('LOGIN_THROTTLE_CACHE_ALIAS') or None
+LOGIN_THROTTLE_TRUST_X_FORWARDED_FOR = os.environ.get('LOGIN_THROTTLE_TRUST_X_FORWARDED_FOR', '').lower() in {'1', 'true', 'yes'}
+LOGIN_HASH_WORKERS = int(os.environ.get('LOGIN_HASH_WORKERS', 2))
+LOGIN_HASH_QUEUE = int(os.environ.get('LOGIN_HASH_QUEUE', 8))
+LOGIN_HASH_WAIT_SECONDS = float(os.environ.get('LOGIN_HASH_WAIT_SECONDS', 2))
+
 # Razorpay Test Mode Keys (override via environment variables)
 RAZORPAY_KEY_ID = os.getenv("RAZORPAY_KEY_ID")
 RAZORPAY_KEY_SECRET = os.getenv("RAZORPAY_KEY_SECRET")
@@ -167,3 +260,10 @@ if not EMAIL_HOST_USER or not EMAIL_HOST_PASSWORD:
 
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:5173")
 
+# Email outbox (delivered by `manage.py send_queued_emails`)
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", "50"))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "5"))
+EMAIL_OUTBOX_RETRY_BASE_SECONDS = 60
+EMAIL_OUTBOX_RETRY_MAX_SECONDS = 3600
+EMAIL_OUTBOX_LEASE_SECONDS = 300
+
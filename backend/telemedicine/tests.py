@@ -0,0 +1,64 @@
+import datetime
+
+from django.core import signing
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from pharmacy.models import MedicineOrder, MedicineStock
+
+from .pagination import CURSOR_SALT, CursorError, decode_cursor, encode_cursor, paginate_keyset
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Repeated names so the id tie-breaker decides the order within a name.
+        for name in ['Zinc', 'Amoxicillin', 'Cetirizine', 'Amoxicillin', 'Bisoprolol', 'Cetirizine', 'Amoxicillin']:
+            MedicineStock.objects.create(name=name, price=1, available_quantity=1)
+
+    def walk(self, queryset, ordering, limit):
+        seen, cursor = [], None
+        while True:
+            rows, cursor = paginate_keyset(queryset, ordering, cursor, limit)
+            seen.extend(row.id for row in rows)
+            if cursor is None:
+                return seen
+
+    def test_round_trip_visits_every_row_once(self):
+        expected = list(MedicineStock.objects.order_by('name', 'id').values_list('id', flat=True))
+        for limit in (1, 2, 3, len(expected), len(expected) + 1):
+            self.assertEqual(self.walk(MedicineStock.objects.all(), ('name', 'id'), limit), expected)
+
+    def test_descending_with_dates(self):
+        days = [datetime.date(2030, 1, day) for day in (3, 1, 3, 2, 1)]
+        for day in days:
+            order = MedicineOrder.objects.create(patient_name='P', medicine_name='M')
+            MedicineOrder.objects.filter(pk=order.pk).update(order_date=day)
+        expected = list(MedicineOrder.objects.order_by('-order_date', '-id').values_list('id', flat=True))
+        self.assertEqual(self.walk(MedicineOrder.objects.all(), ('-order_date', '-id'), 2), expected)
+
+    def test_tampered_cursor_is_rejected(self):
+        cursor = encode_cursor(('name', 'id'), ['Amoxicillin', 1])
+        self.assertEqual(decode_cursor(cursor, ('name', 'id')), ['Amoxicillin', 1])
+
+        forged = signing.dumps({'o': ['name', 'id'], 'v': ['Amoxicillin', 1]}, salt='another-salt')
+        for bad in (cursor[:-2] + 'xx', 'garbage', forged):
+            with self.assertRaises(CursorError):
+                decode_cursor(bad, ('name', 'id'))
+
+    def test_cursor_for_another_ordering_is_rejected(self):
+        cursor = signing.dumps({'o': ['id'], 'v': [1]}, salt=CURSOR_SALT)
+        with self.assertRaises(CursorError):
+            decode_cursor(cursor, ('name', 'id'))
+
+    def test_endpoint(self):
+        client = APIClient()
+        first = client.get('/api/pharmacy/stock/', {'limit': 4})
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(len(first.data['results']), 4)
+        second = client.get('/api/pharmacy/stock/', {'limit': 4, 'cursor': first.data['next_cursor']})
+        self.assertEqual(len(second.data['results']), 3)
+        self.assertIsNone(second.data['next_cursor'])
+
+        self.assertEqual(client.get('/api/pharmacy/stock/', {'cursor': 'garbage'}).status_code, 400)
+        self.assertEqual(client.get('/api/pharmacy/stock/', {'limit': 'x'}).status_code, 400)
@@ -1,9 +1,11 @@
 """telemedicine URL Configuration"""
 
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
+
+from .events import event_stream
+from .media import serve_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -13,7 +15,7 @@ urlpatterns = [
     path('api/consultations/', include('consultations.urls')),
     path('api/pharmacy/', include('pharmacy.urls')),
     path('api/payments/', include('payments.urls')),
+    path('api/events/', event_stream, name='event-stream'),
+    # Uploaded media, served with access checks in every environment.
+    re_path(r'^%s(?P<path>.+)$' % settings.MEDIA_URL.lstrip('/'), serve_media),
 ]
-
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
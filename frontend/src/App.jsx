@@ -15,6 +15,7 @@ import HomePage from './pages/HomePage.jsx'
 import PatientLogin from './pages/PatientLogin.jsx'
 import PatientRegister from './pages/PatientRegister.jsx'
 import MessageAdmin from './pages/MessageAdmin.jsx'
+import SetPassword from './pages/SetPassword.jsx'
 import RoleLogin from './auth/RoleLogin.jsx'
 import ConsultationRequest from './patients/ConsultationRequest.jsx'
 import MyAppointments from './patients/MyAppointments.jsx'
@@ -40,6 +41,7 @@ const App = () => {
           <Route path="/patient/register" element={<PatientRegister />} />
           <Route path="/role/login" element={<RoleLogin />} />
           <Route path="/message-admin" element={<MessageAdmin />} />
+          <Route path="/set-password" element={<SetPassword />} />
           <Route path="/role-login" element={<Navigate to="/role/login" replace />} />
           <Route path="/admin" element={<Navigate to="/admin/dashboard" replace />} />
 
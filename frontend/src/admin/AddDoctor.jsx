@@ -33,17 +33,17 @@ const AddDoctor = ({ departments }) => {
             const res = await api.post('accounts/create-doctor/', form)
             
             // Check for email status in response
-            const emailSent = res?.data?.email_sent === true
+            const emailQueued = res?.data?.email_queued === true
             const emailError = res?.data?.email_error
 
-            if (!emailSent) {
+            if (!emailQueued) {
                 const reason = typeof emailError === 'string' && emailError.trim() ? ` Reason: ${emailError}` : ''
                 setWarning(`Doctor added successfully, but email notification could not be sent.${reason}`)
                 setSuccess('')
                 // Keep the detailed reason only in console; avoid exposing server details to users.
                 if (emailError) console.warn('Doctor welcome email failed:', emailError)
             } else {
-                setSuccess('Doctor added successfully. Email sent to doctor.!!')
+                setSuccess('Doctor added successfully. A welcome email with a set-password link is on its way.')
             
             }
 
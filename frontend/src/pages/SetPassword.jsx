@@ -0,0 +1,110 @@
+import { useMemo, useState } from 'react'
+import { useLocation, useNavigate } from 'react-router-dom'
+import api from '../api/axios.js'
+import './MessageAdmin.css'
+
+// Landing page for the one-time link in the doctor welcome email.
+const SetPassword = () => {
+  const location = useLocation()
+  const navigate = useNavigate()
+  const params = useMemo(() => new URLSearchParams(location.search), [location.search])
+  const [password, setPassword] = useState('')
+  const [confirm, setConfirm] = useState('')
+  const [error, setError] = useState('')
+  const [success, setSuccess] = useState('')
+  const [loading, setLoading] = useState(false)
+
+  const handleSubmit = async (event) => {
+    event.preventDefault()
+    setError('')
+    setSuccess('')
+    if (password !== confirm) {
+      setError('Passwords do not match.')
+      return
+    }
+    setLoading(true)
+
+    try {
+      await api.post('accounts/set-password/', {
+        uid: params.get('uid') || '',
+        token: params.get('token') || '',
+        password,
+      })
+      setSuccess('Password set. You can now sign in.')
+      setPassword('')
+      setConfirm('')
+    } catch (err) {
+      const data = err?.response?.data
+      const apiError = data?.detail || data?.password?.join(' ') || 'Could not set the password. Please try again.'
+      setError(apiError)
+    } finally {
+      setLoading(false)
+    }
+  }
+
+  return (
+    <div className="message-admin">
+      <div className="message-admin__container">
+        <div className="message-admin__card">
+          <header className="message-admin__header">
+            <h1 className="message-admin__title">Choose Your Password</h1>
+            <p className="message-admin__subtitle">
+              Set the password you will use to sign in to your account.
+            </p>
+          </header>
+
+          <form className="message-admin__form" onSubmit={handleSubmit}>
+            <div className="message-admin__field">
+              <label htmlFor="new-password" className="message-admin__label">New Password</label>
+              <input
+                id="new-password"
+                type="password"
+                className="message-admin__input"
+                autoComplete="new-password"
+                value={password}
+                onChange={(e) => setPassword(e.target.value)}
+                required
+              />
+            </div>
+
+            <div className="message-admin__field">
+              <label htmlFor="confirm-password" className="message-admin__label">Confirm Password</label>
+              <input
+                id="confirm-password"
+                type="password"
+                className="message-admin__input"
+                autoComplete="new-password"
+                value={confirm}
+                onChange={(e) => setConfirm(e.target.value)}
+                required
+              />
+            </div>
+
+            {error && <div className="message-admin__error">{error}</div>}
+            {success && <div className="message-admin__success">{success}</div>}
+
+            <div className="message-admin__buttons">
+              <button
+                type="button"
+                className="message-admin__button message-admin__button--outline"
+                onClick={() => navigate('/role/login')}
+                disabled={loading}
+              >
+                Go to Sign In
+              </button>
+              <button
+                type="submit"
+                className="message-admin__button message-admin__button--primary"
+                disabled={loading || Boolean(success)}
+              >
+                {loading ? 'Saving...' : 'Set Password'}
+              </button>
+            </div>
+          </form>
+        </div>
+      </div>
+    </div>
+  )
+}
+
+export default SetPassword
@@ -0,0 +1,70 @@
+"""
+Measure worker cold-start cost: importing Django, django.setup() and loading the URLconf.
+
+Each run happens in a fresh interpreter so nothing is cached between samples.
+
+    python scripts/bench_startup.py --runs 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend')
+
+PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import django
+t1 = time.perf_counter()
+django.setup()
+t2 = time.perf_counter()
+from django.conf import settings
+from django.urls import get_resolver
+get_resolver(settings.ROOT_URLCONF).url_patterns
+t3 = time.perf_counter()
+print(json.dumps({
+    'import_django': t1 - t0,
+    'django_setup': t2 - t1,
+    'load_urls': t3 - t2,
+    'total': t3 - t0,
+    'heavy_modules_loaded': sorted(m for m in ('pymysql', 'razorpay') if m in sys.modules),
+}))
+"""
+
+
+def _run_once(env):
+    output = subprocess.run(
+        [sys.executable, '-W', 'ignore', '-c', PROBE],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'telemedicine.settings')
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [BACKEND_DIR, env.get('PYTHONPATH')]))
+
+    samples = [_run_once(env) for _ in range(args.runs)]
+
+    print(f"Startup benchmark ({args.runs} fresh interpreters, settings={env['DJANGO_SETTINGS_MODULE']})")
+    for key in ('import_django', 'django_setup', 'load_urls', 'total'):
+        values = [sample[key] * 1000 for sample in samples]
+        print(f"  {key:<14} median {statistics.median(values):8.1f} ms   min {min(values):8.1f} ms")
+    print(f"  heavy modules loaded at startup: {samples[-1]['heavy_modules_loaded'] or 'none'}")
+
+
+if __name__ == '__main__':
+    main()
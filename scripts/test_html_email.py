@@ -9,6 +9,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '../backend'))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'telemedicine.settings')
 django.setup()
 
+from accounts.outbox import deliver_batch
 from accounts.views import _send_doctor_welcome_email
 from django.conf import settings
 
@@ -26,7 +27,8 @@ def test_send_email():
             to_email=to_email,
             raw_password="testpassword123"
         )
-        print("Email sent successfully!")
+        sent, failed = deliver_batch()
+        print(f"Outbox delivery finished: sent={sent} failed={failed}")
     except Exception as e:
         print(f"Failed to send email: {e}")
         import traceback